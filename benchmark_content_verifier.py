@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+ContentVerifier Scoring Benchmark
+Scores synthetic video titles for every tracked coin with the current
+ContentVerifier and with a baseline revision of modules/content_verification.py
+(by default the one before the compiled title matcher), reports titles per
+second for both and checks that every score is identical. Also times
+ContentVerifier.rank_all picking the top videos for every coin at once.
+
+Example:
+    python benchmark_content_verifier.py --titles 5000
+    python benchmark_content_verifier.py --baseline-rev HEAD~3 --json bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+MODULE_PATH = 'modules/content_verification.py'
+
+TITLE_WORDS = [
+    'price', 'analysis', 'technical analysis', 'news', 'today', 'update', 'explained', 'deep dive',
+    'review', 'guide', 'research', 'official', 'development', 'crypto', 'bitcoin', 'market', 'trading',
+    'shocking', '100x', 'to the moon', 'pump!', '$10 target!', '!!!', 'breaking', 'lawsuit', 'sec',
+    'enterprise', 'council', 'soroban', 'tokenization', 'smart contract', 'proof of stake', '2025'
+]
+
+def git(*args) -> str:
+    try:
+        return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True,
+                              timeout=30).stdout.strip()
+    except Exception:
+        return ''
+
+def default_baseline_rev() -> str:
+    """The revision just before TitleMatcher was added to content_verification.py."""
+    introduced = git('log', '-n', '1', '--format=%H', '-S', 'class TitleMatcher', '--', MODULE_PATH)
+    return f"{introduced}~1" if introduced else ''
+
+def load_module(name: str, source: str):
+    """Import content_verification source as a standalone module."""
+    path = os.path.join(tempfile.mkdtemp(prefix='cv_bench_'), f'{name}.py')
+    with open(path, 'w') as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_videos(count: int, coins: dict, rng: random.Random) -> list:
+    """(video_data, coin_name) pairs with titles mixing coin names, symbols and common title terms."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    videos = []
+    for n in range(count):
+        coin_name = rng.choice(list(coins))
+        words = rng.sample(TITLE_WORDS, rng.randint(2, 6)) + [coins[coin_name], coin_name.title()]
+        rng.shuffle(words)
+        if rng.random() < 0.5:
+            words.append(rng.choice([today, yesterday]))
+        videos.append(({
+            'title': ' '.join(words),
+            'url': f"https://www.youtube.com/watch?v=bench{n:08d}",
+            'video_id': f"bench{n:08d}",
+            'platform': rng.choice(['youtube', 'youtube', 'rumble', 'twitch']),
+            'content_date': rng.choice([today, yesterday, '']),
+        }, coin_name))
+    return videos
+
+def run(module, videos: list, rounds: int) -> tuple:
+    """Best titles/second over rounds, and every (verified, score, reason) from the last round."""
+    verifier = module.ContentVerifier()
+    verifier._save_verification_cache = lambda: None
+
+    async def score_all():
+        return [await verifier.verify_video_content(video, coin_name) for video, coin_name in videos]
+
+    best, results = None, None
+    for _ in range(rounds):
+        verifier.verification_cache = {}
+        started = time.perf_counter()
+        results = asyncio.run(score_all())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(videos) / best, results
+
+def run_ranking(module, videos: list, top_k: int) -> dict:
+    """Milliseconds for ContentVerifier.rank_all over every coin's candidates, cold and cached."""
+    verifier = module.ContentVerifier()
+    verifier.verification_cache = {}
+    candidates_by_coin = {}
+    for video, coin_name in videos:
+        candidates_by_coin.setdefault(coin_name, []).append(video)
+    timings = {'coins': len(candidates_by_coin), 'candidates': len(videos)}
+    for label in ('cold_ms', 'cached_ms'):
+        started = time.perf_counter()
+        verifier.rank_all(candidates_by_coin, top_k=top_k)
+        timings[label] = round((time.perf_counter() - started) * 1000, 2)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ContentVerifier title scoring before and after')
+    parser.add_argument('--titles', type=int, default=5000, help='Synthetic titles to score per round')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds per implementation (best is reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline-rev', default=None,
+                        help='Git revision to compare against (default: the one before the compiled matcher)')
+    parser.add_argument('--rank-candidates', type=int, default=400,
+                        help='Candidates (spread over all coins) for the rank_all timing')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    # Rejected titles log a warning each; keep them out of the measurement
+    logging.getLogger('CryptoBot').setLevel(logging.ERROR)
+    os.chdir(tempfile.mkdtemp(prefix='cv_bench_cwd_'))  # verifier reads content_verification_cache.json from cwd
+
+    with open(os.path.join(REPO_DIR, MODULE_PATH)) as f:
+        current = load_module('content_verification_current', f.read())
+    videos = synthetic_videos(args.titles, current.ContentVerifier.COIN_SYMBOLS, random.Random(args.seed))
+
+    report = {'revision': git('rev-parse', '--short', 'HEAD') or 'unknown', 'titles': args.titles}
+    current_rate, current_results = run(current, videos, args.rounds)
+    report['current_titles_per_second'] = round(current_rate)
+
+    baseline_rev = args.baseline_rev or default_baseline_rev()
+    baseline_source = git('show', f"{baseline_rev}:{MODULE_PATH}") if baseline_rev else ''
+    if baseline_source:
+        baseline_rate, baseline_results = run(load_module('content_verification_baseline', baseline_source),
+                                              videos, args.rounds)
+        report.update({
+            'baseline_revision': git('rev-parse', '--short', baseline_rev),
+            'baseline_titles_per_second': round(baseline_rate),
+            'speedup': round(current_rate / baseline_rate, 2),
+            'scores_identical': baseline_results == current_results
+        })
+    else:
+        print("No baseline revision found; reporting the current implementation only")
+
+    if hasattr(current.ContentVerifier, 'rank_all'):
+        report['rank_all'] = run_ranking(current, videos[:args.rank_candidates], top_k=3)
+
+    verified = sum(1 for result in current_results if result[0])
+    print(f"Scored {args.titles} titles ({verified} verified) at revision {report['revision']}")
+    if 'baseline_titles_per_second' in report:
+        print(f"  baseline {report['baseline_revision']}: {report['baseline_titles_per_second']:>8} titles/s")
+    print(f"  current:          {report['current_titles_per_second']:>8} titles/s")
+    if 'speedup' in report:
+        print(f"  speedup {report['speedup']}x, scores identical: {report['scores_identical']}")
+    if 'rank_all' in report:
+        ranking = report['rank_all']
+        print(f"rank_all over {ranking['coins']} coins / {ranking['candidates']} candidates: "
+              f"{ranking['cold_ms']}ms cold (building matchers, one cache write), {ranking['cached_ms']}ms cached")
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report.get('scores_identical', True) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+X Posting Queue Benchmark
+Drives x_thread_queue with synthetic threads against the local fake X API
+(modules/fake_x_api.py) and reports throughput, reply latency and failover
+behaviour, so posting-engine changes can be compared across commits.
+
+Example:
+    python benchmark_x_queue.py --threads 40 --replies 5 --latency 0.05 --json bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+logger = logging.getLogger('CryptoBot')
+
+def account_prefix(account_num: int) -> str:
+    return 'X' if account_num == 1 else f'X{account_num}'
+
+def configure_environment(base_url: str, accounts: int):
+    """Point every benchmark X account at the fake server and disable real webhooks."""
+    for account_num in range(1, accounts + 1):
+        prefix = account_prefix(account_num)
+        os.environ[f'{prefix}_CONSUMER_KEY'] = f'benchmark-consumer-key-account-{account_num}'
+        os.environ[f'{prefix}_CONSUMER_SECRET'] = f'benchmark-consumer-secret-account-{account_num}'
+        os.environ[f'{prefix}_ACCESS_TOKEN'] = f'{account_num}-benchmark-access-token-account-{account_num:02d}-0000000000'
+        os.environ[f'{prefix}_ACCESS_TOKEN_SECRET'] = f'benchmark-access-secret-account-{account_num}'
+        os.environ[f'{prefix}_BEARER_TOKEN'] = 'benchmark-bearer-token'
+    os.environ['X_API_BASE_URL'] = base_url
+    os.environ.pop('DISCORD_WEBHOOK_URL', None)
+    os.environ.pop('NOTIFICATION_WEBHOOK_URL', None)
+
+def synthetic_threads(count: int, replies: int, duplicate_rate: float, rng: random.Random) -> list:
+    """Build (main_post_text, posts) pairs; a share of main posts repeat earlier ones."""
+    threads = []
+    for t in range(count):
+        if threads and rng.random() < duplicate_rate:
+            main_text = rng.choice(threads)[0]
+        else:
+            main_text = f"📊 Benchmark thread {t} - top movers update #{rng.randrange(10**9)}"
+        posts = [{'text': f"{t}.{i} Coin {i} is up {rng.uniform(-10, 10):.2f}% today", 'coin_name': f'coin{t}.{i}'}
+                 for i in range(replies)]
+        threads.append((main_text, posts))
+    return threads
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+async def run_benchmark(args) -> dict:
+    from modules.fake_x_api import FakeXAPI
+
+    fake_api = FakeXAPI(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                        rate_window=args.rate_window, error_rate=args.error_rate, seed=args.seed)
+    base_url = await fake_api.start()
+    configure_environment(base_url, args.accounts)
+    if args.auth_fail_account:
+        # Every other account's access token is accepted
+        fake_api.valid_tokens = {os.environ[f'{account_prefix(account_num)}_ACCESS_TOKEN']
+                                 for account_num in range(1, args.accounts + 1) if account_num != args.auth_fail_account}
+
+    from modules.rate_limit_manager import rate_manager
+    from modules.x_pacing import reply_pacer
+    from modules.x_verifier import x_post_verifier
+    from modules.x_thread_queue import (x_queue_service, start_x_queue, stop_x_queue, join_x_queue,
+                                        queue_x_thread_async, get_x_queue_status)
+
+    rate_manager.posts_per_15min = args.local_limit
+    reply_pacer.min_gap = args.min_gap
+    x_queue_service.max_pending = args.max_pending
+    x_queue_service.overflow_policy = args.overflow_policy
+    x_post_verifier.min_age = 0.5
+    x_post_verifier.max_wait = 2.0
+
+    rng = random.Random(args.seed)
+    threads = synthetic_threads(args.threads, args.replies, args.duplicate_rate, rng)
+
+    start_x_queue()
+    started = time.monotonic()
+    futures = [await queue_x_thread_async(posts, main_post_text=main_text) for main_text, posts in threads]
+    timed_out = False
+    try:
+        await asyncio.wait_for(join_x_queue(), args.timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    elapsed = time.monotonic() - started
+
+    status = get_x_queue_status()
+    outcomes = {}
+    for future in futures:
+        outcome = future.result()['status'] if future and future.done() and not future.cancelled() else 'unfinished'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    await stop_x_queue()
+    await fake_api.stop()
+    # Read after stop so the verifier's final batch is included
+    verification = x_post_verifier.get_stats()
+
+    completed = outcomes.get('completed', 0)
+    tweets = sum(windows['24h'] for windows in status['posts_per_account'].values())
+    return {
+        'revision': git_revision(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('json', 'verbose', 'keep')},
+        'elapsed_seconds': round(elapsed, 3),
+        'timed_out': timed_out,
+        'outcomes': outcomes,
+        'threads_per_hour': round(completed / elapsed * 3600, 1) if elapsed else 0,
+        'tweets_per_hour': round(tweets / elapsed * 3600, 1) if elapsed else 0,
+        'latency': status['latency'],
+        'pacing': status['pacing'],
+        'posts_per_account': {str(account): windows['24h'] for account, windows in status['posts_per_account'].items()},
+        'counters': status['counters'],
+        'verification': verification,
+        'dedup': status['dedup'],
+        'backpressure': status['backpressure'],
+        'accounts': status['accounts'],
+        'server': dict(fake_api.counters)
+    }
+
+def print_report(result: dict):
+    print("🏁 X QUEUE BENCHMARK")
+    print("=" * 60)
+    print(f"Revision: {result['revision']}")
+    config = result['config']
+    print(f"Threads: {config['threads']} x {config['replies']} replies on {config['accounts']} accounts, latency {config['latency']}s "
+          f"(±{config['jitter']}s), server limit {config['rate_limit'] or 'none'}/{config['rate_window']}s")
+    print(f"Elapsed: {result['elapsed_seconds']}s{' (TIMED OUT)' if result['timed_out'] else ''}")
+    print(f"Outcomes: {result['outcomes']}")
+    print(f"Throughput: {result['threads_per_hour']} threads/hour, {result['tweets_per_hour']} tweets/hour")
+    print("Latency (seconds):")
+    for name, summary in result['latency'].items():
+        if summary.get('count'):
+            print(f"  {name}: p50 {summary['p50']}  p95 {summary['p95']}  p99 {summary['p99']}  "
+                  f"max {summary['max']}  (n={summary['count']})")
+    print(f"Posts per account: {result['posts_per_account']}")
+    print("Account health: " + ", ".join(
+        f"#{account}: {stats['health']}{' (disabled)' if stats['disabled'] else ''}"
+        for account, stats in result['accounts'].items()))
+    counters = result['counters']
+    print(f"Failovers: {counters['failovers']}  Retries: {counters['retries']} {counters['retries_by_reason']}  "
+          f"API errors: {counters['api_errors']}")
+    server = result['server']
+    print(f"Server: {server['created']} created, {server['rate_limited']} rate limited, "
+          f"{server['duplicates']} duplicates, {server['auth_failures']} auth failures, "
+          f"{server['server_errors']} server errors, {server['connections']} connections")
+    print(f"Verification: {result['verification']['verified']} verified, {result['verification']['missing']} missing")
+    dedup = result['dedup']
+    print(f"Dedup: {dedup['checks']} checks, {dedup['duplicates']} duplicates ({dedup['mutated']} mutated, "
+          f"{dedup['rejected']} rejected), avg {dedup['avg_check_microseconds']}µs per check")
+    backpressure = result['backpressure']
+    print(f"Backpressure: max {backpressure['max_pending']} waiting ({backpressure['overflow_policy']}), "
+          f"{backpressure['merged']} merged, {backpressure['dropped']} dropped, "
+          f"{backpressure['rejected']} rejected, {backpressure['blocked']} blocked")
+    print("=" * 60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the X posting queue against a local fake X API')
+    parser.add_argument('--threads', type=int, default=20, help='Synthetic threads to queue')
+    parser.add_argument('--replies', type=int, default=5, help='Replies per thread')
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake API latency per create, seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Random +/- latency, seconds')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Server-side posts per account per window')
+    parser.add_argument('--rate-window', type=float, default=900.0, help='Server-side rate-limit window, seconds')
+    parser.add_argument('--local-limit', type=int, default=1000, help='RateLimitManager posts per 15 minutes')
+    parser.add_argument('--min-gap', type=float, default=0.0, help='Reply pacer minimum gap, seconds')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0, help='Fraction of threads repeating a main post')
+    parser.add_argument('--accounts', type=int, default=2, help='Number of X accounts (X_*, X2_*, X3_*, ...)')
+    parser.add_argument('--auth-fail-account', type=int, help='Account whose credentials are rejected')
+    parser.add_argument('--max-pending', type=int, default=1000, help='Threads allowed to wait in the queue')
+    parser.add_argument('--overflow-policy', choices=['block', 'drop_oldest', 'reject'], default='block',
+                        help='What to do with new threads once the queue is full')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of creates failing with 503')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Give up waiting for the queue after this long')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for content and faults')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directory with the job store and exports')
+    parser.add_argument('--verbose', action='store_true', help='Show the bot\'s INFO logging')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    # Job store, history and export log go to a scratch directory, not the real database
+    scratch_dir = tempfile.mkdtemp(prefix='x_queue_bench_')
+    os.chdir(scratch_dir)
+    result = asyncio.run(run_benchmark(args))
+
+    print_report(result)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {json_path}")
+    if args.keep:
+        print(f"📁 Scratch directory kept at {scratch_dir}")
+    else:
+        import shutil
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
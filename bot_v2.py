@@ -1,63 +1,130 @@
+import sys
+from modules.startup_profiler import ImportProfiler
+
+# Started before anything else is imported so --profile-startup sees every module
+startup_profiler = ImportProfiler().start() if '--profile-startup' in sys.argv else None
+
 import asyncio
 import logging
 import os
 import random
-import pytz
+import time
 from datetime import datetime, timedelta
 import json
-from dotenv import load_dotenv
-import tweepy
-import pycoingecko
-from googleapiclient.discovery import build
-from modules.x_thread_queue import start_x_queue, stop_x_queue, queue_x_thread, get_x_queue_status
+from typing import Dict, Iterable
+from modules.providers import get_provider, providers
+from modules.x_thread_queue import start_x_queue, stop_x_queue, queue_x_thread, join_x_queue
 import argparse
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('CryptoBot')
 
-# Load environment variables with Replit compatibility
-env_path = ".env"  # Default to local .env file
-if not os.path.exists(env_path):
-    logger.info("No local .env file found, using Replit Secrets (environment variables)")
-    # In Replit, secrets are automatically loaded as environment variables
-    # No need to load from file
-else:
-    if not load_dotenv(env_path):
-        logger.error(f"Failed to load .env file from {env_path}")
-        raise Exception(f"Failed to load .env file from {env_path}")
-    logger.info(f"Successfully loaded .env from {env_path}")
-for key, value in os.environ.items():
-    if key.startswith('X_') or key.startswith('YOUTUBE_') or key.startswith('DISCORD_'):
-        logger.debug(f"Env[{key}]: {value[:50]}{'...' if len(value) > 50 else ''}")
-
-# Database initialization (placeholder)
-logger.info("Database initialized successfully with tables: used_videos, sqlite_sequence, workflow_history, "
-            "x_post_history, coins, coin_data_cache, news_cache, price_averages_cache, project_sources_cache, "
-            "projects_cache, thread_history, youtube_cache, youtube_summary_cache, prices, schema_version, social_metrics")
-
-# X Client Setup with Debugging
-try:
-    x_consumer_key = os.getenv("X_CONSUMER_KEY")
-    x_consumer_secret = os.getenv("X_CONSUMER_SECRET")
-    x_access_token = os.getenv("X_ACCESS_TOKEN")
-    x_access_token_secret = os.getenv("X_ACCESS_TOKEN_SECRET")
-    logger.debug(f"X_CONSUMER_KEY: {x_consumer_key}")
-    logger.debug(f"X_CONSUMER_SECRET: {x_consumer_secret[:10]}...")  # Partial for security
-    logger.debug(f"X_ACCESS_TOKEN: {x_access_token}")
-    logger.debug(f"X_ACCESS_TOKEN_SECRET: {x_access_token_secret[:10]}...")  # Partial for security
-    if not all([x_consumer_key, x_consumer_secret, x_access_token, x_access_token_secret]):
-        raise ValueError("One or more X API credentials are missing")
-    x_client = tweepy.Client(
-        consumer_key=x_consumer_key,
-        consumer_secret=x_consumer_secret,
-        access_token=x_access_token,
-        access_token_secret=x_access_token_secret
-    )
-    logger.info("X API client initialized successfully")
-except Exception as e:
-    logger.error(f"Missing or invalid X API credentials for account 1: {e}")
-    raise
+DB_FILE = "crypto_bot.db"
+
+class Application:
+    """Configuration, API clients, the X queue and the database for one bot run.
+
+    Importing bot_v2 does nothing beyond defining this; start() loads the
+    configuration, then builds the clients the run needs in parallel (each
+    in its own thread, since they block), then starts the X queue. How long
+    each phase took is logged once startup finishes.
+    """
+
+    CLIENTS = ('x_client', 'youtube', 'database')
+
+    def __init__(self, env_path: str = ".env", db_file: str = DB_FILE):
+        self.env_path = env_path
+        self.db_file = db_file
+        self.x_client = None
+        self.youtube = None
+        self.db = None
+        self.queue_started = False
+        self.phases: Dict[str, float] = {}  # phase -> seconds
+
+    def load_config(self):
+        """Load .env if there is one; otherwise the environment (Replit Secrets) is used as is."""
+        if not os.path.exists(self.env_path):
+            logger.info("No local .env file found, using Replit Secrets (environment variables)")
+        else:
+            from dotenv import load_dotenv
+            if not load_dotenv(self.env_path):
+                logger.error(f"Failed to load .env file from {self.env_path}")
+                raise Exception(f"Failed to load .env file from {self.env_path}")
+            logger.info(f"Successfully loaded .env from {self.env_path}")
+        configured = sorted(key for key in os.environ if key.startswith(('X_', 'YOUTUBE_', 'DISCORD_')))
+        logger.debug(f"Configured settings: {', '.join(configured) or 'none'}")
+
+    def init_x_client(self):
+        """X client for account 1, shared with the posting queue through the client pool."""
+        from modules.api_clients import get_x_client
+        self.x_client = get_x_client(posting_only=True, account_number=1)
+        if not self.x_client:
+            logger.error("Missing or invalid X API credentials for account 1")
+            raise ValueError("One or more X API credentials are missing")
+        logger.info("X API client initialized successfully")
+
+    def init_youtube(self):
+        # static_discovery uses the discovery document shipped with googleapiclient instead of fetching it
+        try:
+            self.youtube = get_provider('youtube')('youtube', 'v3', developerKey=get_youtube_api_key(),
+                                                   static_discovery=True)
+            logger.info("YouTube API client initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize YouTube API: {e}")
+            raise
+
+    def init_database(self):
+        from modules.database import Database
+        self.db = Database(self.db_file)
+
+    async def _timed(self, phase: str, func):
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(func)
+        finally:
+            self.phases[phase] = time.perf_counter() - started
+
+    async def start(self, clients: Iterable[str] = CLIENTS, start_queue: bool = True):
+        """Load configuration, build the given clients in parallel and start the X queue."""
+        started = time.perf_counter()
+        await self._timed('config', self.load_config)
+
+        clients = list(clients)
+        unknown = set(clients) - set(self.CLIENTS)
+        if unknown:
+            raise ValueError(f"Unknown clients: {', '.join(sorted(unknown))}")
+        parallel_started = time.perf_counter()
+        results = await asyncio.gather(*(self._timed(name, getattr(self, f"init_{name}")) for name in clients),
+                                       return_exceptions=True)
+        if clients:
+            self.phases['clients'] = time.perf_counter() - parallel_started
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+
+        if start_queue:
+            queue_started = time.perf_counter()
+            start_x_queue()
+            self.queue_started = True
+            self.phases['x_queue'] = time.perf_counter() - queue_started
+        self.phases['total'] = time.perf_counter() - started
+        logger.info(self.startup_report(clients))
+
+    def startup_report(self, clients: Iterable[str] = ()) -> str:
+        def ms(phase):
+            return f"{self.phases[phase] * 1000:.0f}ms"
+        parts = [f"config {ms('config')}"] if 'config' in self.phases else []
+        clients = [name for name in clients if name in self.phases]
+        if clients:
+            parts.append(f"clients {ms('clients')} in parallel ("
+                         + ", ".join(f"{name} {ms(name)}" for name in clients) + ")")
+        if 'x_queue' in self.phases:
+            parts.append(f"x_queue {ms('x_queue')}")
+        return f"Startup finished in {ms('total')}: " + " | ".join(parts)
+
+    async def stop(self):
+        if self.queue_started:
+            await stop_x_queue()
+            self.queue_started = False
 
 # YouTube API Setup
 def get_youtube_api_key():
@@ -67,16 +134,6 @@ def get_youtube_api_key():
         raise Exception("YOUTUBE_API_KEY is required")
     return api_key
 
-try:
-    youtube = build('youtube', 'v3', developerKey=get_youtube_api_key())
-    logger.info("YouTube API client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize YouTube API: {e}")
-    raise
-
-# Queue Management
-start_x_queue()
-
 # Post Update Function (Fixed KeyError)
 def post_update(news_items, idx):
     if not news_items or (isinstance(news_items, dict) and str(idx) not in news_items):
@@ -92,6 +149,7 @@ def post_update(news_items, idx):
 
 # Scheduling Logic (Capped Sleep Time)
 def calculate_next_run():
+    import pytz
     current_time = datetime.now(pytz.timezone("US/Eastern"))
     next_run = datetime.strptime("2025-06-15 02:44:00-04:00", "%Y-%m-%d %H:%M:%S%z")
     sleep_time = (next_run - current_time).total_seconds()
@@ -106,16 +164,42 @@ def fetch_xdc_price():
     try:
         with open("data/coin_mapping.json", "r") as f:
             coin_mapping = json.load(f)
-        client = pycoingecko.CoinGeckoAPI()
+        client = get_provider('coingecko')()
         data = client.get_price(ids=coin_mapping.get("xdc-network", "xdce-crowd-sale"), vs_currencies="usd")
         return data
     except Exception as e:
         logger.error(f"ERROR - XDC Network fetch failed: {e}")
         return None
 
+def report_startup_profile():
+    """Stop the import profiler and log where startup time went (--profile-startup)."""
+    if not startup_profiler:
+        return
+    startup_profiler.stop()
+    logger.info(startup_profiler.report())
+    loaded = {name: stats['load_ms'] for name, stats in providers.get_stats().items() if stats['loaded']}
+    logger.info(f"Providers loaded during startup: {loaded or 'none'}")
+
 # Main Bot Logic
-async def main_bot_run(test_discord=False, queue_only=False):
+async def main_bot_run(test_discord=False, queue_only=False, app: Application = None):
     logger.info("Starting CryptoBotV2 main loop...")
+    app = app or Application()
+    # Each mode only starts what it uses: a Discord test needs no X, YouTube or queue
+    if test_discord:
+        await app.start(clients=(), start_queue=False)
+    elif queue_only:
+        await app.start(clients=('database',))
+    else:
+        await app.start()
+    report_startup_profile()
+
+    try:
+        await run_mode(app, test_discord=test_discord, queue_only=queue_only)
+    finally:
+        logger.info("Shutting down CryptoBotV2...")
+        await app.stop()
+
+async def run_mode(app: Application, test_discord=False, queue_only=False):
     news_items = ["News 1", "News 2", "News 3"]
     
     if test_discord:
@@ -125,9 +209,11 @@ async def main_bot_run(test_discord=False, queue_only=False):
     if queue_only:
         logger.info("Running in queue_only mode...")
         posts = [{"text": f"Price update for {coin}", "coin_name": coin} for coin in ["BTC", "ETH"]]
-        queue_x_thread(posts, main_post_text="Crypto Market Update")
-        while get_x_queue_status()['queue_size'] > 0:
-            await asyncio.sleep(1)
+        job = queue_x_thread(posts, main_post_text="Crypto Market Update")
+        await join_x_queue()
+        if job:
+            result = job.result()
+            logger.info(f"Queued thread {result['job_id']} {result['status']}")
         logger.info("Queue processing completed")
         return
     
@@ -140,7 +226,7 @@ async def main_bot_run(test_discord=False, queue_only=False):
                 post_update(news_items, idx)
                 tweet = f"Crypto Update (2025-06-14 19:30:00 EDT) #Crypto #{random.randint(1000, 9999)}"
                 try:
-                    response = await asyncio.to_thread(x_client.create_tweet, text=tweet)
+                    response = await asyncio.to_thread(app.x_client.create_tweet, text=tweet)
                     logger.info(f"Posted tweet: {response.data['id']}")
                 except Exception as e:
                     logger.error(f"Failed to post tweet: {e}")
@@ -151,21 +237,18 @@ async def main_bot_run(test_discord=False, queue_only=False):
             logger.error(f"Error in main loop: {e}")
             await asyncio.sleep(5)
 
-async def shutdown():
-    logger.info("Shutting down CryptoBotV2...")
-    stop_x_queue()
-    await asyncio.sleep(1)
-
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
     parser = argparse.ArgumentParser(description="CryptoBotV2")
-    parser.add_argument("--test_discord", action="store_true", help="Run in test Discord mode")
-    parser.add_argument("--queue_only", action="store_true", help="Run in queue-only mode")
+    parser.add_argument("--test_discord", "--test-discord", action="store_true", help="Run in test Discord mode")
+    parser.add_argument("--queue_only", "--queue-only", action="store_true", help="Run in queue-only mode")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Log per-package import times and provider load times once startup finishes")
     args = parser.parse_args()
 
     try:
         asyncio.run(main_bot_run(test_discord=args.test_discord, queue_only=args.queue_only))
     except KeyboardInterrupt:
-        asyncio.run(shutdown())
+        pass
     except Exception as e:
         logger.error(f"Script failed: {e}")
-        asyncio.run(shutdown())
\ No newline at end of file
@@ -9,25 +9,67 @@ import os
 import json
 import logging
 import sqlite3
+import argparse
+import time
+import threading
+from collections import deque
 from datetime import datetime
 import subprocess
 import sys
 from pathlib import Path
 
+# Per-gatherer time budget in seconds. Gatherers run concurrently, so the
+# slowest one (usually pip list or the api_clients import) bounds the run.
+GATHERER_TIMEOUTS = {
+    'project_structure': 60,
+    'database_data': 30,
+    'log_files': 30,
+    'system_info': 35,
+    'workflow_data': 10,
+    'api_status': 20,
+    'recent_exports': 20,
+}
+
+# Threads read from the NDJSON thread export log per run
+RECENT_THREAD_RECORDS = 200
+THREAD_LOG_KEY = 'thread_export_log'
+THREAD_LOG_DIR = os.path.join('data', 'thread_exports')
+
 def get_timestamp():
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-def gather_project_structure():
-    """Get complete project structure."""
+def _is_own_output(file_name: str) -> bool:
+    """Skip this script's own output so exports don't nest previous exports."""
+    return os.path.basename(file_name).startswith('grok_analysis_')
+
+def _is_unchanged(baseline: dict, key: str, modified: str) -> bool:
+    """Check whether a file is unchanged since the baseline export."""
+    return bool(baseline) and baseline.get(key, {}).get('modified') == modified
+
+def gather_project_structure(baseline=None):
+    """Get complete project structure.
+
+    With a baseline manifest only new or modified files are read; unchanged
+    files are skipped and removed files are listed under '_deleted'.
+    """
     project_structure = {}
+    seen = set()
     
     for root, dirs, files in os.walk('.'):
-        # Skip hidden directories and __pycache__
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__']
+        # Skip hidden directories, __pycache__ and the thread export log (read by gather_recent_exports)
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__'
+                   and os.path.normpath(os.path.join(root, d)) != THREAD_LOG_DIR]
         
         for file in files:
-            if not file.startswith('.') and not file.endswith('.pyc'):
+            if not file.startswith('.') and not file.endswith('.pyc') and not _is_own_output(file):
                 file_path = os.path.join(root, file)
+                seen.add(file_path)
+                try:
+                    modified = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+                    if _is_unchanged(baseline, file_path, modified):
+                        continue
+                except OSError:
+                    pass
                 try:
                     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                         content = f.read()
@@ -45,10 +87,21 @@ def gather_project_structure():
                         'modified': datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
                     }
     
+    if baseline:
+        deleted = sorted(path for path in baseline if path not in seen)
+        if deleted:
+            project_structure['_deleted'] = deleted
+    
     return project_structure
 
-def gather_database_data():
-    """Extract all database information."""
+def gather_database_data(baseline=None):
+    """Extract all database information.
+
+    Up to 100 rows per table are returned in rowid order, and last_rowid
+    records the last one. With a baseline manifest only rows after the
+    previous export's last_rowid are returned, so chained --since runs
+    export every row exactly once.
+    """
     database_data = {}
     
     try:
@@ -65,16 +118,30 @@ def gather_database_data():
             for table in tables:
                 table_name = table[0]
                 try:
-                    cursor.execute(f"SELECT * FROM {table_name}")
+                    cursor.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table_name}")
+                    row_count, max_rowid = cursor.fetchone()
+                    since_rowid = (baseline or {}).get(table_name)
+                    # 100 rows per export; the next --since run picks up after last_rowid
+                    if since_rowid is not None:
+                        cursor.execute(
+                            f"SELECT rowid, * FROM {table_name} WHERE rowid > ? ORDER BY rowid LIMIT 100",
+                            (since_rowid,)
+                        )
+                    else:
+                        cursor.execute(f"SELECT rowid, * FROM {table_name} ORDER BY rowid LIMIT 100")
                     rows = cursor.fetchall()
                     cursor.execute(f"PRAGMA table_info({table_name})")
                     columns = cursor.fetchall()
                     
                     database_data['tables'][table_name] = {
                         'columns': columns,
-                        'row_count': len(rows),
-                        'data': rows[:100]  # Limit to first 100 rows
+                        'row_count': row_count,
+                        'max_rowid': max_rowid,
+                        'last_rowid': rows[-1][0] if rows else since_rowid,
+                        'data': [row[1:] for row in rows]
                     }
+                    if since_rowid is not None:
+                        database_data['tables'][table_name]['since_rowid'] = since_rowid
                 except Exception as e:
                     database_data['tables'][table_name] = {'error': str(e)}
             
@@ -87,8 +154,12 @@ def gather_database_data():
     
     return database_data
 
-def gather_log_files():
-    """Collect all log files and their contents."""
+def gather_log_files(baseline=None):
+    """Collect all log files and their contents.
+
+    With a baseline manifest unchanged logs are skipped and logs that grew
+    are returned as the appended tail only ('offset' marks where it starts).
+    """
     log_data = {}
     
     # Common log file patterns
@@ -96,15 +167,23 @@ def gather_log_files():
     
     for pattern in log_patterns:
         for file_path in Path('.').glob(pattern):
-            if file_path.is_file():
+            if file_path.is_file() and str(file_path) not in log_data and not _is_own_output(file_path.name):
                 try:
+                    modified = datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
+                    if _is_unchanged(baseline, str(file_path), modified):
+                        continue
                     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                         content = f.read()
+                    offset = (baseline or {}).get(str(file_path), {}).get('size', 0)
+                    if offset > len(content):
+                        offset = 0  # Rotated or truncated, send it whole
                     log_data[str(file_path)] = {
                         'size': len(content),
-                        'content': content,
-                        'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
+                        'content': content[offset:],
+                        'modified': modified
                     }
+                    if offset:
+                        log_data[str(file_path)]['offset'] = offset
                 except Exception as e:
                     log_data[str(file_path)] = {'error': str(e)}
     
@@ -222,8 +301,13 @@ def gather_api_status():
     
     return api_status
 
-def gather_recent_exports():
-    """Find and include recent export files."""
+def gather_recent_exports(baseline=None):
+    """Find and include recent export files, skipping ones unchanged since the baseline.
+
+    Posted threads come from the NDJSON thread export log: the last
+    RECENT_THREAD_RECORDS threads, or with a baseline only those posted since.
+    Legacy per-thread JSON files are still picked up.
+    """
     exports = {}
     
     # Look for export files
@@ -231,51 +315,168 @@ def gather_recent_exports():
     
     for pattern in export_patterns:
         for file_path in Path('.').glob(pattern):
-            if file_path.is_file():
+            if file_path.is_file() and str(file_path) not in exports:
+                modified = datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
+                if _is_unchanged(baseline, str(file_path), modified):
+                    continue
                 try:
                     with open(file_path, 'r') as f:
                         exports[str(file_path)] = json.load(f)
                 except Exception as e:
                     exports[f'{file_path}_error'] = str(e)
     
+    try:
+        from modules.thread_export_log import thread_export_log
+        since = (baseline or {}).get(THREAD_LOG_KEY, {}).get('last_posted_at')
+        records = deque(thread_export_log.iter_records(since=since), maxlen=RECENT_THREAD_RECORDS)
+        if records:
+            exports[THREAD_LOG_KEY] = list(records)
+    except Exception as e:
+        exports[f'{THREAD_LOG_KEY}_error'] = str(e)
+    
     return exports
 
-def main():
-    """Generate comprehensive Grok analysis data."""
-    print("🔍 GENERATING GROK ANALYSIS DATA")
-    print("=" * 50)
+def load_baseline(previous_export: str) -> dict:
+    """Load the manifest of a previous export to diff against."""
+    with open(previous_export, 'r') as f:
+        previous = json.load(f)
     
-    timestamp = get_timestamp()
+    manifest = previous.get('manifest')
+    if manifest:
+        return manifest
     
-    # Gather all data
-    print("📁 Collecting project structure...")
-    project_structure = gather_project_structure()
+    # Exports written before manifests existed: rebuild from their contents
+    return {
+        'files': {path: {'modified': info.get('modified'), 'size': info.get('size')}
+                  for path, info in previous.get('project_structure', {}).items()
+                  if isinstance(info, dict)},
+        'logs': {path: {'modified': info.get('modified'), 'size': info.get('size')}
+                 for path, info in previous.get('log_files', {}).items()
+                 if isinstance(info, dict) and 'modified' in info},
+        # They never recorded rowids (row_count isn't one), so tables start from their first rows again
+        'db_rowids': {},
+        'exports': {}
+    }
+
+def build_manifest(baseline: dict, project_structure: dict, log_data: dict,
+                   database_data: dict, exports: dict) -> dict:
+    """Build the manifest the next --since run diffs against.
+
+    Entries skipped as unchanged are carried forward from the baseline so
+    deltas can be chained.
+    """
+    baseline = baseline or {}
+    files = dict(baseline.get('files', {}))
+    for path in project_structure.get('_deleted', []):
+        files.pop(path, None)
+    files.update({path: {'modified': info.get('modified'), 'size': info.get('size')}
+                  for path, info in project_structure.items()
+                  if path != '_deleted' and isinstance(info, dict)})
+    
+    logs = dict(baseline.get('logs', {}))
+    logs.update({path: {'modified': info['modified'], 'size': info['size']}
+                 for path, info in log_data.items() if isinstance(info, dict) and 'modified' in info})
+    
+    db_rowids = dict(baseline.get('db_rowids', {}))
+    db_rowids.update({name: info['last_rowid']
+                      for name, info in database_data.get('tables', {}).items()
+                      if info.get('last_rowid') is not None})
+    
+    export_files = dict(baseline.get('exports', {}))
+    if exports.get(THREAD_LOG_KEY):
+        export_files[THREAD_LOG_KEY] = {'last_posted_at': exports[THREAD_LOG_KEY][-1].get('posted_at')}
+    for path in exports:
+        if os.path.exists(path):
+            export_files[path] = {'modified': datetime.fromtimestamp(os.path.getmtime(path)).isoformat()}
+    
+    return {'files': files, 'logs': logs, 'db_rowids': db_rowids, 'exports': export_files}
+
+def run_gatherers(gatherers: list) -> tuple:
+    """Run gatherers concurrently, each bounded by its own timeout.
+
+    Returns (results, errors, timings). A gatherer that fails or overruns
+    gets an empty result and its message in errors, so the export only ever
+    sees well-formed data. Gatherers run in daemon threads: one that hangs
+    is abandoned and neither holds up the export nor keeps the process
+    alive once it is written.
+    """
+    outcomes = {}
+    
+    def timed(name, func, args):
+        started = time.perf_counter()
+        try:
+            outcomes[name] = ('ok', func(*args), time.perf_counter() - started)
+        except Exception as e:
+            outcomes[name] = ('error', str(e), time.perf_counter() - started)
     
-    print("🗄️ Extracting database data...")
-    database_data = gather_database_data()
+    started = time.perf_counter()
+    threads = {}
+    for name, func, args in gatherers:
+        threads[name] = threading.Thread(target=timed, args=(name, func, args),
+                                         name=f'gatherer-{name}', daemon=True)
+        threads[name].start()
     
-    print("📋 Gathering log files...")
-    log_data = gather_log_files()
+    results, errors, timings = {}, {}, {}
+    for name, thread in threads.items():
+        timeout = GATHERER_TIMEOUTS.get(name, 30)
+        thread.join(max(timeout - (time.perf_counter() - started), 0))
+        status, value, elapsed = outcomes.get(name, ('timeout', f'Timed out after {timeout}s', timeout))
+        if status == 'ok':
+            results[name] = value
+        else:
+            results[name] = {}
+            errors[name] = value
+        timings[name] = {'seconds': round(elapsed, 3), 'status': status}
+        print(f"   {'✅' if status == 'ok' else '⚠️'} {name}: {elapsed:.2f}s ({status})")
+    
+    return results, errors, timings
+
+def main(argv=None):
+    """Generate comprehensive Grok analysis data."""
+    parser = argparse.ArgumentParser(description="Generate Grok analysis data")
+    parser.add_argument("--since", metavar="PREVIOUS_EXPORT",
+                        help="Only export files, DB rows and logs changed since this previous export")
+    args = parser.parse_args(argv)
     
-    print("🖥️ Collecting system information...")
-    system_info = gather_system_info()
+    print("🔍 GENERATING GROK ANALYSIS DATA")
+    print("=" * 50)
     
-    print("⚙️ Gathering workflow data...")
-    workflow_data = gather_workflow_data()
+    timestamp = get_timestamp()
+    baseline = load_baseline(args.since) if args.since else None
+    if baseline:
+        print(f"🔁 Delta mode: diffing against {args.since}")
     
-    print("🔌 Checking API status...")
-    api_status = gather_api_status()
+    # Gather all data concurrently
+    print("⏱️ Running gatherers concurrently...")
+    gather_started = time.perf_counter()
+    results, errors, timings = run_gatherers([
+        ('project_structure', gather_project_structure, ((baseline or {}).get('files'),)),
+        ('database_data', gather_database_data, ((baseline or {}).get('db_rowids'),)),
+        ('log_files', gather_log_files, ((baseline or {}).get('logs'),)),
+        ('system_info', gather_system_info, ()),
+        ('workflow_data', gather_workflow_data, ()),
+        ('api_status', gather_api_status, ()),
+        ('recent_exports', gather_recent_exports, ((baseline or {}).get('exports'),)),
+    ])
+    gather_seconds = time.perf_counter() - gather_started
     
-    print("📤 Finding recent exports...")
-    exports = gather_recent_exports()
+    project_structure = results['project_structure']
+    database_data = results['database_data']
+    log_data = results['log_files']
+    system_info = results['system_info']
+    workflow_data = results['workflow_data']
+    api_status = results['api_status']
+    exports = results['recent_exports']
+    file_count = len([path for path in project_structure if path != '_deleted'])
     
     # Compile comprehensive data
     grok_analysis_data = {
         'metadata': {
             'generated_at': datetime.now().isoformat(),
             'project_name': 'crypto_bot_v2',
-            'analysis_type': 'comprehensive_project_export',
-            'export_version': '1.0'
+            'analysis_type': 'delta_project_export' if baseline else 'comprehensive_project_export',
+            'export_version': '1.1',
+            'since': args.since
         },
         'project_structure': project_structure,
         'database_data': database_data,
@@ -284,17 +485,24 @@ def main():
         'workflow_data': workflow_data,
         'api_status': api_status,
         'recent_exports': exports,
+        'gatherer_errors': errors,
+        'manifest': build_manifest(baseline, project_structure, log_data, database_data, exports),
         'summary': {
-            'total_files': len(project_structure),
+            'total_files': file_count,
             'total_logs': len(log_data),
             'database_tables': len(database_data.get('tables', {})),
             'workflow_configs': len(workflow_data),
-            'api_endpoints': len(api_status)
+            'api_endpoints': len(api_status),
+            'deleted_files': len(project_structure.get('_deleted', [])),
+            'gather_seconds': round(gather_seconds, 3),
+            'gatherer_timings': timings,
+            'failed_gatherers': sorted(errors)
         }
     }
     
     # Save to file
-    output_filename = f"grok_analysis_data_{timestamp}.json"
+    output_kind = "delta" if baseline else "data"
+    output_filename = f"grok_analysis_{output_kind}_{timestamp}.json"
     
     print(f"💾 Saving to {output_filename}...")
     with open(output_filename, 'w') as f:
@@ -307,19 +515,33 @@ def main():
     with open(summary_filename, 'w') as f:
         f.write("CRYPTO BOT V2 - GROK ANALYSIS DATA SUMMARY\n")
         f.write("=" * 50 + "\n\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if baseline:
+            f.write(f"Delta since: {args.since}\n")
+        f.write("\n")
         
         f.write("PROJECT OVERVIEW:\n")
-        f.write(f"- Total Files: {len(project_structure)}\n")
+        f.write(f"- Total Files: {file_count}\n")
         f.write(f"- Log Files: {len(log_data)}\n")
         f.write(f"- Database Tables: {len(database_data.get('tables', {}))}\n")
         f.write(f"- Workflow Configs: {len(workflow_data)}\n")
-        f.write(f"- Recent Exports: {len(exports)}\n\n")
+        f.write(f"- Recent Exports: {len(exports)}\n")
+        f.write(f"- Exported Threads: {len(exports.get(THREAD_LOG_KEY, []))}\n")
+        if baseline:
+            f.write(f"- Deleted Files: {len(project_structure.get('_deleted', []))}\n")
+        f.write("\n")
+        
+        f.write(f"GATHERER TIMINGS (total {gather_seconds:.2f}s, concurrent):\n")
+        for name, timing in timings.items():
+            f.write(f"- {name}: {timing['seconds']:.2f}s ({timing['status']})\n")
+            if name in errors:
+                f.write(f"    {errors[name]}\n")
+        f.write("\n")
         
         f.write("KEY FILES:\n")
         key_files = ['bot_v2.py', 'modules/x_thread_queue.py', 'modules/api_clients.py', '.replit']
         for file in key_files:
-            if file in project_structure:
+            if file in project_structure and 'size' in project_structure[file]:
                 f.write(f"- {file} ({project_structure[file]['size']} bytes)\n")
         
         f.write("\nAPI STATUS:\n")
@@ -1,10 +1,10 @@
 import os
 import logging
-import tweepy
-from pycoingecko import CoinGeckoAPI
-from binance.client import Client as BinanceClient
-from googleapiclient.discovery import build
-import aiohttp
+import threading
+from functools import lru_cache
+from modules.providers import get_provider
+from modules.rate_limit_manager import rate_manager
+from modules.x_accounts import x_accounts
 
 logger = logging.getLogger('CryptoBot')
 
@@ -24,64 +24,180 @@ X_ACCESS_TOKEN = os.getenv("X_ACCESS_TOKEN")
 X_ACCESS_TOKEN_SECRET = os.getenv("X_ACCESS_TOKEN_SECRET")
 X_BEARER_TOKEN = os.getenv("X_BEARER_TOKEN")
 
+X_API_DEFAULT_BASE_URL = "https://api.twitter.com"
+
+@lru_cache(maxsize=None)
+def _tracking_client_class():
+    """Build RateLimitTrackingClient on first use, so importing this module doesn't import tweepy."""
+    tweepy = get_provider('tweepy')
+    from requests.adapters import HTTPAdapter
+
+    class _BaseURLAdapter(HTTPAdapter):
+        """Sends requests for the real X API host to another base URL (e.g. a local fake server)."""
+
+        def __init__(self, base_url, **kwargs):
+            super().__init__(**kwargs)
+            self.base_url = base_url
+
+        def send(self, request, **kwargs):
+            request.url = self.base_url + request.url[len(X_API_DEFAULT_BASE_URL):]
+            return super().send(request, **kwargs)
+
+    class RateLimitTrackingClient(tweepy.Client):
+        """tweepy.Client that feeds every response's rate-limit headers to rate_manager."""
+
+        def __init__(self, *args, account_number=1, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.account_number = account_number
+            # tweepy hardcodes the API host, so honour X_API_BASE_URL at the transport level
+            base_url = get_x_api_base_url()
+            if base_url != X_API_DEFAULT_BASE_URL:
+                self.session.mount(X_API_DEFAULT_BASE_URL, _BaseURLAdapter(base_url))
+
+        def request(self, method, route, params=None, json=None, user_auth=False):
+            try:
+                response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+            except tweepy.HTTPException as e:
+                rate_manager.update_from_headers(self.account_number, e.response.headers)
+                if isinstance(e, tweepy.Unauthorized):
+                    # Rejected credentials: build a fresh client next time instead of reusing this one
+                    x_client_pool.invalidate(self.account_number)
+                raise
+            rate_manager.update_from_headers(self.account_number, response.headers)
+            return response
+
+    return RateLimitTrackingClient
+
+def __getattr__(name):
+    # RateLimitTrackingClient is still importable from here; it is only built when asked for
+    if name == 'RateLimitTrackingClient':
+        return _tracking_client_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class XClientPool:
+    """tweepy clients keyed by (account, mode), built on first use and then reused.
+
+    Each client keeps its own requests session, so repeated posts reuse warm
+    TLS connections to the X API instead of handshaking per thread. A cached
+    client is rebuilt when its account's credentials or X_API_BASE_URL change,
+    and dropped by invalidate() (done automatically on a 401).
+    """
+
+    def __init__(self):
+        self._clients = {}  # (account_number, posting_only) -> (settings fingerprint, client)
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'reused': 0, 'invalidated': 0}
+
+    @staticmethod
+    def _settings(account_number: int) -> tuple:
+        """Current credentials and base URL for an account, read straight from the environment."""
+        prefix = 'X' if account_number == 1 else f'X{account_number}'
+        credentials = tuple(os.getenv(f"{prefix}_{field}") for field in
+                            ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET', 'BEARER_TOKEN'))
+        return credentials + (get_x_api_base_url(),)
+
+    def get(self, account_number: int, posting_only: bool):
+        settings = self._settings(account_number)
+        key = (account_number, posting_only)
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached and cached[0] == settings:
+                self.stats['reused'] += 1
+                return cached[1]
+
+        if cached:
+            logger.info(f"X credentials for account {account_number} changed - rebuilding its client")
+        account = x_accounts.get(account_number)
+        if (account.fingerprint if account else (None,) * 5) != settings[:-1]:
+            x_accounts.discover()
+        client = _build_x_client(posting_only, account_number)
+        with self._lock:
+            replaced = self._clients.pop(key, None)
+            if client:
+                self._clients[key] = (settings, client)
+                self.stats['created'] += 1
+        if replaced:
+            replaced[1].session.close()
+        return client
+
+    def invalidate(self, account_number: int = None):
+        """Drop cached clients for one account (or all accounts)."""
+        with self._lock:
+            stale = [key for key in self._clients if account_number is None or key[0] == account_number]
+            for key in stale:
+                self._clients.pop(key)[1].session.close()
+            self.stats['invalidated'] += len(stale)
+        if stale:
+            logger.info(f"Dropped {len(stale)} cached X client(s) for account {account_number or 'all'}")
+
+    def get_stats(self):
+        return {**self.stats, 'cached': len(self._clients)}
+
+# Global client pool
+x_client_pool = XClientPool()
+
 def get_x_client(posting_only=False, account_number=1):
     """
-    Get X API client with dual account support and posting-only mode.
+    Get X API client for any configured account, in posting-only or full mode.
+
+    Clients come from x_client_pool, so repeated calls reuse the same client
+    and its HTTP connections.
 
     Args:
         posting_only (bool): If True, optimize for posting only to avoid rate limits
-        account_number (int): 1 for primary account, 2 for secondary account
+        account_number (int): 1 for the X_* credentials, n for the X{n}_* credentials
 
     Returns:
         tweepy.Client or None
     """
+    return x_client_pool.get(account_number, posting_only)
+
+def invalidate_x_clients(account_number=None):
+    """Drop cached X clients, e.g. after credentials were rejected."""
+    x_client_pool.invalidate(account_number)
+
+def _build_x_client(posting_only=False, account_number=1):
+    """Create a new X API client for an account, or None if it can't be set up."""
     try:
-        # Select account credentials
-        if account_number == 1:
-            consumer_key = os.getenv('X_CONSUMER_KEY')
-            consumer_secret = os.getenv('X_CONSUMER_SECRET')
-            access_token = os.getenv('X_ACCESS_TOKEN')
-            access_token_secret = os.getenv('X_ACCESS_TOKEN_SECRET')
-            bearer_token = os.getenv('X_BEARER_TOKEN')
-            account_type = "Primary (Verified)"
-        else:
-            consumer_key = os.getenv('X2_CONSUMER_KEY')
-            consumer_secret = os.getenv('X2_CONSUMER_SECRET')
-            access_token = os.getenv('X2_ACCESS_TOKEN')
-            access_token_secret = os.getenv('X2_ACCESS_TOKEN_SECRET')
-            bearer_token = os.getenv('X2_BEARER_TOKEN')
-            account_type = "Secondary (Failover)"
-
-        if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
+        account = x_accounts.get(account_number)
+        if account is None or account.missing_credentials:
+            prefix = account.prefix if account else ('X' if account_number == 1 else f'X{account_number}')
             logger.error(f"Missing X API credentials for account {account_number}")
-            if account_number == 2:
-                logger.error("Add these secrets for second account:")
-                logger.error("  - X2_CONSUMER_KEY")
-                logger.error("  - X2_CONSUMER_SECRET")
-                logger.error("  - X2_ACCESS_TOKEN")
-                logger.error("  - X2_ACCESS_TOKEN_SECRET")
-                logger.error("  - X2_BEARER_TOKEN (optional)")
+            logger.error(f"Add these secrets for account {account_number}:")
+            for field in ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET'):
+                logger.error(f"  - {prefix}_{field}")
+            logger.error(f"  - {prefix}_BEARER_TOKEN (optional)")
             return None
 
+        consumer_key = account.consumer_key
+        consumer_secret = account.consumer_secret
+        access_token = account.access_token
+        access_token_secret = account.access_token_secret
+        bearer_token = account.bearer_token
+        account_type = account.label
+
+        RateLimitTrackingClient = _tracking_client_class()
         if posting_only:
-            client = tweepy.Client(
+            client = RateLimitTrackingClient(
                 consumer_key=consumer_key,
                 consumer_secret=consumer_secret,
                 access_token=access_token,
                 access_token_secret=access_token_secret,
-                wait_on_rate_limit=False
+                wait_on_rate_limit=False,
+                account_number=account_number
             )
             logger.info(f"X {account_type} posting-only client initialized (no search capability)")
         else:
             if not bearer_token and not posting_only:
                 logger.warning("Bearer token missing for full client; ensure tweet.read scope is included")
-            client = tweepy.Client(
+            client = RateLimitTrackingClient(
                 bearer_token=bearer_token,
                 consumer_key=consumer_key,
                 consumer_secret=consumer_secret,
                 access_token=access_token,
                 access_token_secret=access_token_secret,
-                wait_on_rate_limit=False
+                wait_on_rate_limit=False,
+                account_number=account_number
             )
             logger.info(f"X {account_type} full client initialized")
 
@@ -105,13 +221,33 @@ def get_x_client(posting_only=False, account_number=1):
         return None
 
 def get_x_client_with_failover(posting_only: bool = False):
-    """Get X API client with automatic failover between accounts."""
-    # Try primary account first
-    client, account_number = get_x_client(posting_only, account_number=1), 1
-    if client:
-        return client, account_number
+    """Get X API client with automatic failover between accounts.
+
+    Tries the best account by capacity and health first, then the others.
+    """
+    best = x_accounts.select()
+    ordered = ([best] if best else []) + [account_number for account_number in x_accounts.numbers() if account_number != best]
+    for account_number in ordered:
+        client = get_x_client(posting_only, account_number=account_number)
+        if client:
+            return client, account_number
+        logger.warning(f"X account {account_number} failed, trying the next account...")
+
+    logger.error("No X account could be initialized")
+    return None, None
+
+def get_discord_webhook_url():
+    """Get the Discord webhook URL used for posting updates."""
+    return os.getenv("DISCORD_WEBHOOK_URL")
+
+def get_notification_webhook_url():
+    """Get the webhook URL for worker notifications, defaulting to the Discord webhook."""
+    return os.getenv("NOTIFICATION_WEBHOOK_URL") or get_discord_webhook_url()
 
-    logger.warning("Primary X account failed, trying failover account...")
+def get_x_api_base_url():
+    """Get the X API base URL; X_API_BASE_URL points the bot at a local fake server."""
+    return (os.getenv("X_API_BASE_URL") or X_API_DEFAULT_BASE_URL).rstrip('/')
 
-    # Try failover account
-    client, account_number = get_x_client
\ No newline at end of file
+def get_x_bearer_token():
+    """Get an app-only bearer token for read endpoints from any X account."""
+    return next((account.bearer_token for account in x_accounts.accounts.values() if account.bearer_token), None)
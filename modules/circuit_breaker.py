@@ -0,0 +1,185 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+from modules.error_handler import APIError
+
+logger = logging.getLogger('CryptoBot')
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(APIError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit open, next probe in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Failure-rate and latency breaker for one upstream provider.
+
+    Every call's outcome and latency go into a rolling window of the last
+    window_size calls; a call slower than slow_call_seconds counts as a
+    failure. Once at least min_calls are in the window and the failure rate
+    reaches failure_threshold the circuit opens: calls raise
+    CircuitOpenError straight away, so callers go to their fallback without
+    waiting on a provider that is down. After open_seconds one probe call is
+    let through (half-open). If it succeeds the circuit closes; if it fails
+    the circuit reopens for twice as long, up to max_open_seconds.
+    """
+
+    def __init__(self, name: str, failure_threshold: float = 0.5, min_calls: int = 4, window_size: int = 20,
+                 slow_call_seconds: float = 10.0, open_seconds: float = 30.0, max_open_seconds: float = 600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.open_seconds = open_seconds
+        self.opened_at: Optional[float] = None
+        self._calls = deque(maxlen=window_size)  # (ok, latency seconds)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - now)
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError unless a call may go through now; True if the call is the half-open probe."""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state == OPEN and self._retry_in(now) == 0:
+                self.state = HALF_OPEN
+                logger.info(f"🔌 {self.name} circuit half-open, probing")
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(self.name, self._retry_in(now) if self.state == OPEN else self.open_seconds)
+
+    def record(self, ok: bool, latency: float):
+        """Feed one call's outcome into the window, opening or closing the circuit as needed."""
+        ok = ok and latency < self.slow_call_seconds
+        with self._lock:
+            self.stats['calls'] += 1
+            self.stats['failures'] += not ok
+            if self.state == HALF_OPEN and self._probe_in_flight:
+                self._probe_in_flight = False
+                if ok:
+                    self._close()
+                else:
+                    self._open(min(self.open_seconds * 2, self.max_open_seconds))
+                return
+            self._calls.append((ok, latency))
+            if self.state == CLOSED and len(self._calls) >= self.min_calls \
+                    and self.failure_rate() >= self.failure_threshold:
+                self._open(self.base_open_seconds)
+
+    def release_probe(self):
+        """Let another probe through after the current one was cancelled without an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self, open_seconds: float):
+        self.state = OPEN
+        self.open_seconds = open_seconds
+        self.opened_at = time.monotonic()
+        self.stats['opened'] += 1
+        logger.warning(f"🔌 {self.name} circuit open for {open_seconds:.0f}s "
+                       f"(failure rate {self.failure_rate():.0%} over {len(self._calls)} calls)")
+
+    def _close(self):
+        self.state = CLOSED
+        self.open_seconds = self.base_open_seconds
+        self.opened_at = None
+        self._calls.clear()
+        logger.info(f"🔌 {self.name} circuit closed, provider recovered")
+
+    def failure_rate(self) -> float:
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls) if self._calls else 0.0
+
+    def protect(self) -> '_ProtectedCall':
+        """Context manager (sync or async) guarding one call to the provider.
+
+        Raises CircuitOpenError on entry while the circuit is open; any
+        exception leaving the block counts as a failure, except
+        cancellation (e.g. the losing side of a hedged request), which says
+        nothing about the provider and is not recorded.
+        """
+        return _ProtectedCall(self)
+
+    def get_stats(self) -> Dict:
+        latencies = sorted(latency for _, latency in self._calls)
+        return {
+            **self.stats,
+            'state': self.state,
+            'failure_rate': round(self.failure_rate(), 3),
+            'p50_latency_seconds': round(latencies[len(latencies) // 2], 3) if latencies else None,
+            'retry_in_seconds': round(self._retry_in(time.monotonic()), 1) if self.state == OPEN else None
+        }
+
+class _ProtectedCall:
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.started = None
+        self.probe = False
+
+    def __enter__(self):
+        self.probe = self.breaker.before_call()
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            if self.probe:
+                self.breaker.release_probe()
+            return False
+        self.breaker.record(exc_type is None, time.monotonic() - self.started)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per provider, created on first use."""
+
+    # Settings that differ from the CircuitBreaker defaults
+    PROVIDER_SETTINGS = {
+        'coinmarketcap': {'slow_call_seconds': 8.0},
+        'coingecko': {'slow_call_seconds': 8.0},
+        'reddit': {'slow_call_seconds': 5.0, 'open_seconds': 60.0},
+        'youtube': {'slow_call_seconds': 8.0}
+    }
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, **self.PROVIDER_SETTINGS.get(provider, {}))
+            return self._breakers[provider]
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {provider: breaker.get_stats() for provider, breaker in self._breakers.items()}
+
+# Global breaker registry
+circuit_breakers = CircuitBreakerRegistry()
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Get the breaker for a provider, e.g. get_breaker('coingecko')."""
+    return circuit_breakers.get(provider)
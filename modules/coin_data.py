@@ -3,8 +3,10 @@ import json
 import os
 import asyncio
 import aiohttp
-from pycoingecko import CoinGeckoAPI
 from typing import Dict, List
+from modules.providers import get_provider
+from modules.circuit_breaker import CircuitOpenError, get_breaker
+from modules.retry_policy import get_policy, with_retries
 
 logger = logging.getLogger('CryptoBot')
 
@@ -38,6 +40,17 @@ coinmarketcap_id_map = {
     "casper-network": "5899"
 }
 
+# Top exchange per coin, used when CoinGecko has no tickers or is unavailable
+TOP_PROJECT_FALLBACKS = {
+    "hedera-hashgraph": "Binance CEX",
+    "stellar": "Binance CEX",
+    "sui": "Binance CEX",
+    "algorand": "Binance CEX",
+    "xdce-crowd-sale": "Gate",
+    "casper-network": "Gate",
+    "ondo-finance": "Binance CEX"
+}
+
 # Cache files
 VOLUME_CACHE_FILE = "volume_cache.json"
 TOP_PROJECT_CACHE_FILE = "top_project_cache.json"
@@ -80,22 +93,36 @@ def save_top_project_cache(cache: Dict[str, str]):
     except IOError as e:
         logger.error(f"Error saving top project cache: {e}")
 
-def fetch_coin_prices(coin_ids: List[str], cg_client: CoinGeckoAPI) -> Dict:
-    """Fetch coin prices and 24h change using CoinGecko API."""
+def fetch_coin_prices(coin_ids: List[str], cg_client=None) -> Dict:
+    """Fetch coin prices and 24h change using CoinGecko API (a new CoinGeckoAPI client if none is given)."""
     try:
+        cg_client = cg_client or get_provider('coingecko')()
         if not coin_ids:
             logger.error("Empty coin_ids list provided")
             return {}
-        prices = cg_client.get_price(
-            ids=coin_ids,
-            vs_currencies='usd',
-            include_24hr_change=True
-        )
-        return prices
+        def get_price():
+            with get_breaker('coingecko').protect():
+                return cg_client.get_price(
+                    ids=coin_ids,
+                    vs_currencies='usd',
+                    include_24hr_change=True
+                )
+        return get_policy('coingecko').run_sync(get_price)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching prices from CoinGecko: {e}")
         raise
 
+async def _get_json(provider: str, session: aiohttp.ClientSession, url: str):
+    """GET a JSON document through the provider's circuit breaker and retry policy."""
+    async def get():
+        async with get_breaker(provider).protect():
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return await response.json()
+    return await with_retries(provider, get)
+
 async def fetch_volume(coin_id: str, session: aiohttp.ClientSession) -> float:
     """Fetch 24h transaction volume using CoinMarketCap API, with CoinGecko fallback."""
     cache = load_volume_cache()
@@ -116,40 +143,41 @@ async def fetch_volume(coin_id: str, session: aiohttp.ClientSession) -> float:
 
     url = f"https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest?id={coinmarketcap_id}&convert=USD&CMC_PRO_API_KEY={api_key}"
     try:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            data = await response.json()
-            logger.debug(f"CoinMarketCap API response for {coin_id} (ID: {coinmarketcap_id}): {data}")
-            if 'data' not in data or coinmarketcap_id not in data['data']:
-                logger.error(f"CoinMarketCap API error for {coin_id} (ID: {coinmarketcap_id}): No data returned")
-                raise ValueError("No data returned")
-            volume = data['data'][coinmarketcap_id]['quote']['USD'].get('volume_24h')
-            if volume is None:
-                logger.warning(f"No volume data available for {coin_id} (ID: {coinmarketcap_id}) from CoinMarketCap")
-                raise ValueError("No volume data")
-            volume = volume / 1_000_000  # Convert to millions
-            cache[coin_id] = volume
-            save_volume_cache(cache)
-            return volume
-    except (aiohttp.ClientError, ValueError) as e:
+        data = await _get_json('coinmarketcap', session, url)
+        logger.debug(f"CoinMarketCap API response for {coin_id} (ID: {coinmarketcap_id}): {data}")
+        if 'data' not in data or coinmarketcap_id not in data['data']:
+            logger.error(f"CoinMarketCap API error for {coin_id} (ID: {coinmarketcap_id}): No data returned")
+            raise ValueError("No data returned")
+        volume = data['data'][coinmarketcap_id]['quote']['USD'].get('volume_24h')
+        if volume is None:
+            logger.warning(f"No volume data available for {coin_id} (ID: {coinmarketcap_id}) from CoinMarketCap")
+            raise ValueError("No volume data")
+        volume = volume / 1_000_000  # Convert to millions
+        cache[coin_id] = volume
+        save_volume_cache(cache)
+        return volume
+    except CircuitOpenError as e:
+        logger.debug(f"Skipping CoinMarketCap volume for {coin_id}: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
         logger.error(f"CoinMarketCap API error for {coin_id} (ID: {coinmarketcap_id}): {e}")
 
     # Fallback to CoinGecko API
     try:
         url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
-        async with session.get(url) as response:
-            response.raise_for_status()
-            data = await response.json()
-            logger.debug(f"CoinGecko API response for volume {coin_id}: {data}")
-            volume = data.get('market_data', {}).get('total_volume', {}).get('usd', 0)
-            if volume == 0:
-                logger.warning(f"No volume data available for {coin_id} from CoinGecko")
-                return 0.0
-            volume = volume / 1_000_000  # Convert to millions
-            cache[coin_id] = volume
-            save_volume_cache(cache)
-            return volume
-    except aiohttp.ClientError as e:
+        data = await _get_json('coingecko', session, url)
+        logger.debug(f"CoinGecko API response for volume {coin_id}: {data}")
+        volume = data.get('market_data', {}).get('total_volume', {}).get('usd', 0)
+        if volume == 0:
+            logger.warning(f"No volume data available for {coin_id} from CoinGecko")
+            return 0.0
+        volume = volume / 1_000_000  # Convert to millions
+        cache[coin_id] = volume
+        save_volume_cache(cache)
+        return volume
+    except CircuitOpenError as e:
+        logger.debug(f"Skipping CoinGecko volume for {coin_id}: {e}")
+        return 0.0
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"CoinGecko API error for volume {coin_id}: {e}")
         return 0.0
 
@@ -162,44 +190,28 @@ async def fetch_top_project(coin_id: str, session: aiohttp.ClientSession) -> str
 
     try:
         url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/tickers"
-        async with session.get(url) as response:
-            response.raise_for_status()
-            data = await response.json()
-            logger.debug(f"CoinGecko API response for top project {coin_id}: {data}")
-            if 'tickers' not in data or not data['tickers']:
-                logger.warning(f"No tickers found for {coin_id}, using fallback.")
-                project_map = {
-                    "hedera-hashgraph": "Binance CEX",
-                    "stellar": "Binance CEX",
-                    "sui": "Binance CEX",
-                    "algorand": "Binance CEX",
-                    "xdce-crowd-sale": "Gate",
-                    "casper-network": "Gate",
-                    "ondo-finance": "Binance CEX"
-                }
-                top_exchange = project_map.get(coin_id, "N/A")
-                cache[coin_id] = top_exchange
-                save_top_project_cache(cache)
-                return top_exchange
-            top_ticker = max(data['tickers'], key=lambda x: x.get('volume', 0))
-            top_exchange = top_ticker.get('market', {}).get('name', "N/A")
-            if top_exchange == "N/A":
-                raise ValueError("No exchange name found")
+        data = await _get_json('coingecko', session, url)
+        logger.debug(f"CoinGecko API response for top project {coin_id}: {data}")
+        if 'tickers' not in data or not data['tickers']:
+            logger.warning(f"No tickers found for {coin_id}, using fallback.")
+            top_exchange = TOP_PROJECT_FALLBACKS.get(coin_id, "N/A")
             cache[coin_id] = top_exchange
             save_top_project_cache(cache)
             return top_exchange
-    except (aiohttp.ClientError, ValueError) as e:
+        top_ticker = max(data['tickers'], key=lambda x: x.get('volume', 0))
+        top_exchange = top_ticker.get('market', {}).get('name', "N/A")
+        if top_exchange == "N/A":
+            raise ValueError("No exchange name found")
+        cache[coin_id] = top_exchange
+        save_top_project_cache(cache)
+        return top_exchange
+    except CircuitOpenError as e:
+        # Not cached, so the real top project is fetched once CoinGecko is back
+        logger.debug(f"Skipping CoinGecko top project for {coin_id}: {e}")
+        return TOP_PROJECT_FALLBACKS.get(coin_id, "N/A")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
         logger.error(f"CoinGecko API error for top project {coin_id}: {e}")
-        project_map = {
-            "hedera-hashgraph": "Binance CEX",
-            "stellar": "Binance CEX",
-            "sui": "Binance CEX",
-            "algorand": "Binance CEX",
-            "xdce-crowd-sale": "Gate",
-            "casper-network": "Gate",
-            "ondo-finance": "Binance CEX"
-        }
-        top_project = project_map.get(coin_id, "N/A")
+        top_project = TOP_PROJECT_FALLBACKS.get(coin_id, "N/A")
         cache[coin_id] = top_project
         save_top_project_cache(cache)
         return top_project
\ No newline at end of file
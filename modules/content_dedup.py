@@ -0,0 +1,163 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import unicodedata
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+DEDUP_DB_FILE = "crypto_bot.db"
+MAX_TWEET_LENGTH = 280
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_content(text: str) -> str:
+    """Normalize post text the way duplicate checks should see it.
+
+    Unicode compatibility forms are folded (e.g. bold math letters), case is
+    folded and whitespace runs collapse to one space, so trivially different
+    copies of the same post get the same fingerprint.
+    """
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text).casefold()).strip()
+
+def content_fingerprint(text: str) -> str:
+    """Stable fingerprint of normalized post text, stored in x_post_history.content_hash."""
+    return hashlib.blake2b(normalize_content(text).encode('utf-8'), digest_size=16).hexdigest()
+
+class DuplicateContentError(Exception):
+    """Raised when a post duplicates recent content and the policy is to reject it."""
+
+class ContentDedupIndex:
+    """In-memory fingerprint index of recently posted text, backed by x_post_history.
+
+    Fingerprints posted within the lookback window are loaded from
+    x_post_history.content_hash on first use; after that every check is a
+    dict lookup. Text is reserved before it is sent and released if the post
+    fails, so two accounts posting in parallel cannot both send the same text.
+    A duplicate is either rejected or mutated with a short time suffix until
+    it is unique.
+    """
+
+    def __init__(self, lookback_hours: float = 24.0, policy: str = "mutate", db_file: str = DEDUP_DB_FILE):
+        if policy not in ("mutate", "reject"):
+            raise ValueError(f"Unknown dedup policy: {policy}")
+        self.lookback_seconds = lookback_hours * 3600
+        self.policy = policy
+        self.db_file = db_file
+        self._seen: Dict[str, float] = {}  # fingerprint -> epoch seconds posted or reserved
+        self._order = deque()  # (epoch seconds, fingerprint) for expiry
+        self._loaded = False
+        self.stats = {'checks': 0, 'duplicates': 0, 'mutated': 0, 'rejected': 0, 'check_seconds_total': 0.0}
+
+    def load(self):
+        """Load fingerprints posted within the lookback window from x_post_history."""
+        self._loaded = True
+        try:
+            from modules.database import Database
+            Database(self.db_file)  # Makes sure content_hash exists on older databases
+            with sqlite3.connect(self.db_file) as conn:
+                rows = conn.execute(
+                    "SELECT content_hash, CAST(strftime('%s', timestamp) AS INTEGER) FROM x_post_history "
+                    "WHERE content_hash IS NOT NULL AND timestamp >= datetime('now', ?) ORDER BY timestamp",
+                    (f"-{int(self.lookback_seconds)} seconds",)
+                ).fetchall()
+        except Exception as e:
+            logger.warning(f"Could not load post fingerprints, dedup starts empty: {e}")
+            return
+        for fingerprint, posted_at in rows:
+            self._remember(fingerprint, float(posted_at))
+        logger.info(f"Loaded {len(rows)} post fingerprints from the last {self.lookback_seconds / 3600:g}h")
+
+    def _remember(self, fingerprint: str, at: float):
+        self._seen[fingerprint] = at
+        self._order.append((at, fingerprint))
+
+    def _expire(self, now: float):
+        while self._order and now - self._order[0][0] >= self.lookback_seconds:
+            at, fingerprint = self._order.popleft()
+            if self._seen.get(fingerprint) == at:
+                del self._seen[fingerprint]
+
+    def _is_seen(self, fingerprint: str) -> bool:
+        if not self._loaded:
+            self.load()
+        self._expire(time.time())
+        return fingerprint in self._seen
+
+    def is_duplicate(self, text: str) -> bool:
+        """Whether equivalent text was posted (or reserved) within the lookback window."""
+        return self._is_seen(content_fingerprint(text))
+
+    def reserve(self, text: str, policy: Optional[str] = None) -> str:
+        """Check text before sending it and reserve its fingerprint.
+
+        Returns the text to post: unchanged if it is new, or a mutated copy
+        under the mutate policy. Raises DuplicateContentError under the
+        reject policy. policy overrides the index's default for this post.
+        """
+        started = time.perf_counter()
+        self.stats['checks'] += 1
+        try:
+            fingerprint = content_fingerprint(text)
+            if not self._is_seen(fingerprint):
+                self._remember(fingerprint, time.time())
+                return text
+
+            self.stats['duplicates'] += 1
+            if (policy or self.policy) == "reject":
+                self.stats['rejected'] += 1
+                raise DuplicateContentError(f"Duplicate content posted within the last {self.lookback_seconds / 3600:g}h")
+
+            for candidate in self._mutations(text):
+                fingerprint = content_fingerprint(candidate)
+                if not self._is_seen(fingerprint):
+                    self.stats['mutated'] += 1
+                    self._remember(fingerprint, time.time())
+                    return candidate
+            self.stats['rejected'] += 1
+            raise DuplicateContentError("Could not make duplicate content unique")
+        finally:
+            self.stats['check_seconds_total'] += time.perf_counter() - started
+
+    @staticmethod
+    def _mutations(text: str):
+        """Candidate variants of text, each fitting in a tweet."""
+        now = datetime.now()
+        suffixes = [f" 🕒 {now.strftime('%H:%M')}", f" 🕒 {now.strftime('%H:%M:%S')}"]
+        suffixes += [f" 🕒 {now.strftime('%H:%M:%S')} #{n}" for n in range(2, 10)]
+        for suffix in suffixes:
+            yield text[:MAX_TWEET_LENGTH - len(suffix)].rstrip() + suffix
+
+    def release(self, text: str):
+        """Forget a reservation whose post was not sent."""
+        self._seen.pop(content_fingerprint(text), None)
+
+    def get_stats(self) -> Dict:
+        checks = self.stats['checks']
+        return {
+            'checks': checks,
+            'duplicates': self.stats['duplicates'],
+            'mutated': self.stats['mutated'],
+            'rejected': self.stats['rejected'],
+            'avg_check_microseconds': round(self.stats['check_seconds_total'] / checks * 1e6, 1) if checks else None,
+            'indexed_fingerprints': len(self._seen),
+            'lookback_hours': self.lookback_seconds / 3600,
+            'policy': self.policy
+        }
+
+_dedup_index = None
+
+def get_dedup_index() -> ContentDedupIndex:
+    """Get the shared dedup index, configured from X_DEDUP_LOOKBACK_HOURS and X_DEDUP_POLICY."""
+    global _dedup_index
+    if _dedup_index is None:
+        _dedup_index = ContentDedupIndex(
+            lookback_hours=float(os.getenv("X_DEDUP_LOOKBACK_HOURS", "24")),
+            policy=os.getenv("X_DEDUP_POLICY", "mutate")
+        )
+    return _dedup_index
@@ -3,7 +3,7 @@ import logging
 import re
 import asyncio
 import aiohttp
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
 import os
@@ -56,7 +56,151 @@ async def verify_all_content(coin_data: Dict) -> Dict:
             'post_decision_reason': f"Error: {e}"
         }
 
+def _trie_pattern(terms: List[str]) -> str:
+    """Regex matching the longest of terms at a position, factored as a character trie.
+
+    Terms sharing a prefix share one branch, so the engine checks each
+    character of the title against one branch instead of every term.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:  # A term ends here; the longer terms are tried first
+            return body + '?' if len(branches) > 1 else '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+class TitleMatcher:
+    """Counts the terms of each category found in a title, in one regex pass.
+
+    A term counts when it occurs anywhere in the title, exactly like
+    `term in title`. All terms are compiled into one trie-shaped regex
+    inside a lookahead, so it is tried at every position and overlapping
+    terms are all seen. Where several terms start at the same position the
+    longest wins and the shorter ones are its prefixes, so a match also
+    credits the terms that are prefixes of it.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = {category: list(terms) for category, terms in categories.items()}
+        terms = {term for category_terms in categories.values() for term in category_terms}
+        # Categories credited per term, repeated for terms listed more than once
+        self._credits = {term: [] for term in terms}
+        for category, category_terms in categories.items():
+            for term in category_terms:
+                self._credits[term].append(category)
+        self._prefixes = {term: [prefix for prefix in terms if term.startswith(prefix)] for term in terms}
+        self._pattern = re.compile('(?=(' + _trie_pattern(sorted(terms)) + '))') if terms else None
+
+    def count(self, title: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.categories, 0)
+        if self._pattern is None:
+            return counts
+        found = set()
+        for term in set(self._pattern.findall(title)):
+            found.update(self._prefixes[term])
+        for term in found:
+            for category in self._credits[term]:
+                counts[category] += 1
+        return counts
+
 class ContentVerifier:
+    COIN_SYMBOLS = {
+        'ripple': 'XRP',
+        'hedera hashgraph': 'HBAR',
+        'stellar': 'XLM',
+        'xdce crowd sale': 'XDC',
+        'sui': 'SUI',
+        'ondo finance': 'ONDO',
+        'algorand': 'ALGO',
+        'casper network': 'CSPR'
+    }
+
+    COIN_KEYWORDS = {
+        'ripple': ['ripple', 'xrp', 'swift', 'cross-border'],
+        'hedera hashgraph': ['hedera', 'hbar', 'hashgraph', 'enterprise'],
+        'stellar': ['stellar', 'xlm', 'lumen', 'payment'],
+        'xdce crowd sale': ['xinfin', 'xdc', 'trade finance'],
+        'sui': ['sui', 'move', 'programming'],
+        'ondo finance': ['ondo', 'rwa', 'real world assets'],
+        'algorand': ['algorand', 'algo', 'smart contract'],
+        'casper network': ['casper', 'cspr', 'proof of stake']
+    }
+
+    # Generic crypto terms; more than one in a title means it isn't specific to the coin
+    GENERIC_TERMS = ['crypto', 'bitcoin', 'altcoin', 'blockchain', 'market', 'trading', 'cryptocurrency']
+
+    # Coin-specific technology terms, by symbol
+    TECH_TERMS = {
+        'xrp': ['swift', 'cross-border', 'ripple', 'cbdc', 'sec', 'lawsuit', 'remittance', 'odl'],
+        'hbar': ['hashgraph', 'enterprise', 'hedera', 'consensus', 'council', 'governing'],
+        'xlm': ['stellar', 'lumens', 'anchor', 'soroban', 'stripe', 'financial inclusion'],
+        'xdc': ['xinfin', 'trade finance', 'iso20022', 'enterprise', 'hybrid'],
+        'sui': ['move programming', 'sui network', 'aptos', 'object', 'parallel execution'],
+        'ondo': ['rwa', 'real world assets', 'tokenization', 'institutional', 'blackrock'],
+        'algo': ['algorand', 'pure proof', 'carbon negative', 'smart contract', 'silvio micali'],
+        'cspr': ['casper', 'highway consensus', 'upgradeable', 'proof of stake', 'cbc']
+    }
+
+    # Educational content indicators (higher engagement)
+    EDUCATIONAL_INDICATORS = [
+        'tutorial', 'guide', 'explained', 'analysis', 'review',
+        'deep dive', 'fundamentals', 'technical analysis'
+    ]
+
+    # Professional creator indicators
+    PROFESSIONAL_INDICATORS = [
+        'expert', 'professional', 'institutional', 'research',
+        'official', 'whitepaper', 'development'
+    ]
+
+    # Clickbait terms that reduce genuine engagement
+    CLICKBAIT_TERMS = [
+        'shocking', 'unbelievable', 'secret', 'hidden',
+        '100x', 'moon', 'lambo', 'pump', 'dump'
+    ]
+
+    # Clickbait detection (stricter for crypto). No two patterns can match at the same character
+    # and the trailing !/? is only looked at, not consumed (so "pump!!!" still counts as a ???/!!!
+    # run), which lets CLICKBAIT_REGEX find every pattern present in one non-overlapping scan.
+    CLICKBAIT_PATTERNS = [
+        r'\b(shocking|unbelievable|must see|secret|hidden)\b',
+        r'\b(100x|1000x|moon|lambo|to the moon)\b',
+        r'\$\d+\s*(target|prediction)\s*(?=!|\?)',
+        r'\b(crash|pump|dump|rocket)\s*(?=!|\?)',
+        r'(\?{3,}|!{3,})',
+        r'\b(breaking|urgent|alert|explosive)\b'
+    ]
+    CLICKBAIT_REGEX = re.compile('|'.join(f'(?P<clickbait{n}>{pattern})'
+                                          for n, pattern in enumerate(CLICKBAIT_PATTERNS)), re.IGNORECASE)
+    # Literals every CLICKBAIT_PATTERNS match contains; an ASCII title without any of them has no clickbait
+    CLICKBAIT_HINTS = [
+        'shocking', 'unbelievable', 'must see', 'secret', 'hidden', '100x', '1000x', 'moon', 'lambo', '$',
+        'crash', 'pump', 'dump', 'rocket', '???', '!!!', 'breaking', 'urgent', 'alert', 'explosive'
+    ]
+
+    PLATFORM_DOMAINS = {
+        'youtube': ['youtu.be', 'youtube.com'],
+        'rumble': ['rumble.com'],
+        'twitch': ['twitch.tv']
+    }
+
+    PLATFORM_MODIFIERS = {
+        'youtube': 5,    # Established platform
+        'rumble': 3,     # Growing platform
+        'twitch': 7      # Live interaction potential
+    }
+
     def __init__(self):
         self.verification_cache = self._load_verification_cache()
         self.accuracy_scores = {}
@@ -65,6 +209,8 @@ class ContentVerifier:
             'coingecko.com', 'coinmarketcap.com', 'messari.io', 
             'defillama.com', 'github.com', 'whitepaper'
         }
+        self._matchers: Dict[Tuple, TitleMatcher] = {}
+        self._recency_cache = (None, None)
         
     def _load_verification_cache(self) -> Dict:
         """Load cached verification data."""
@@ -76,66 +222,156 @@ class ContentVerifier:
             logger.error(f"Error loading verification cache: {e}")
         return {}
         
-    def _save_verification_cache(self):
-        """Save verification cache."""
+    def _save_verification_cache(self, prune: bool = False):
+        """Save verification cache, optionally dropping video verifications past their 6h lifetime."""
+        if prune:
+            expired_before = (datetime.now() - timedelta(hours=6)).isoformat()
+            self.verification_cache = {key: entry for key, entry in self.verification_cache.items()
+                                       if not key.startswith('video_') or entry.get('timestamp', '') >= expired_before}
         try:
             with open('content_verification_cache.json', 'w') as f:
                 json.dump(self.verification_cache, f, indent=2)
         except Exception as e:
             logger.error(f"Error saving verification cache: {e}")
 
+    def _get_matcher(self, coin_symbol: str = '', coin_keywords: Tuple[str, ...] = ()) -> TitleMatcher:
+        """The compiled matcher for a coin's terms, built on first use."""
+        key = (coin_symbol, coin_keywords)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = self._matchers[key] = TitleMatcher({
+                'symbol': [coin_symbol.lower()] if coin_symbol else [],
+                'keywords': [keyword.lower() for keyword in coin_keywords],
+                'generic': self.GENERIC_TERMS,
+                'tech': [term.lower() for term in self.TECH_TERMS.get(coin_symbol.lower(), [])],
+                'educational': self.EDUCATIONAL_INDICATORS,
+                'professional': self.PROFESSIONAL_INDICATORS,
+                'clickbait_terms': self.CLICKBAIT_TERMS,
+                'clickbait_hints': self.CLICKBAIT_HINTS
+            })
+        return matcher
+
     async def verify_video_content(self, video_data: Dict, coin_name: str) -> Tuple[bool, float, str]:
         """
         Enhanced video verification: crypto-specificity, public availability, accuracy and engagement.
         Returns: (is_verified, accuracy_score, reason)
         """
-        title = video_data.get('title', '').lower()
-        url = video_data.get('url', '')
-        video_id = video_data.get('video_id', '')
-        platform = video_data.get('platform', 'youtube').lower()
-        content_date = video_data.get('content_date', '')
-        
         # Cache check with shorter duration for recent content verification
-        cache_key = f"video_{platform}_{video_id}_{coin_name}_{content_date}"
+        cache_key = self._video_cache_key(video_data, coin_name)
         if cache_key in self.verification_cache:
             cached = self.verification_cache[cache_key]
             cache_time = datetime.fromisoformat(cached['timestamp'])
             if datetime.now() - cache_time < timedelta(hours=6):  # Shorter cache for recency
                 return cached['verified'], cached['score'], cached['reason']
         
+        is_verified, score, reason, cache_entry = self.score_video(video_data, coin_name)
+        self.verification_cache[cache_key] = cache_entry
+        self._save_verification_cache()
+
+        return is_verified, score, reason
+
+    def rank_videos(self, candidates: List[Dict], coin_name: str, top_k: int = 5) -> List[Dict]:
+        """Score all candidate videos for a coin in one pass and return the top_k, best first.
+
+        Fresh cached verifications are reused, new ones are cached, and the
+        cache file is written once for the whole batch. Each result is the
+        candidate plus verified, verification_score, verification_reason,
+        score_breakdown (points per check) and cached. Verified videos rank
+        above unverified ones, then by score.
+        """
+        ranked, scored = self._rank(candidates, coin_name, datetime.now() - timedelta(hours=6))
+        if scored:
+            self._save_verification_cache(prune=True)
+        return ranked[:top_k]
+
+    def rank_all(self, candidates_by_coin: Dict[str, List[Dict]], top_k: int = 5) -> Dict[str, List[Dict]]:
+        """rank_videos for several coins, writing the cache file once for all of them."""
+        fresh_after = datetime.now() - timedelta(hours=6)
+        results, scored = {}, 0
+        for coin_name, candidates in candidates_by_coin.items():
+            ranked, coin_scored = self._rank(candidates, coin_name, fresh_after)
+            results[coin_name] = ranked[:top_k]
+            scored += coin_scored
+        if scored:
+            self._save_verification_cache(prune=True)
+        return results
+
+    def _rank(self, candidates: List[Dict], coin_name: str, fresh_after: datetime) -> Tuple[List[Dict], int]:
+        """All candidates ranked, and how many had to be scored (the rest came from the cache)."""
+        ranked, scored = [], 0
+        for video_data in candidates:
+            cache_key = self._video_cache_key(video_data, coin_name)
+            entry = self.verification_cache.get(cache_key)
+            cached = (entry is not None and 'breakdown' in entry
+                      and datetime.fromisoformat(entry['timestamp']) > fresh_after)
+            if not cached:
+                entry = self.verification_cache[cache_key] = self.score_video(video_data, coin_name)[3]
+                scored += 1
+            ranked.append({
+                **video_data,
+                'verified': entry['verified'],
+                'verification_score': entry['score'],
+                'verification_reason': entry['reason'],
+                'score_breakdown': entry['breakdown'],
+                'cached': cached
+            })
+        ranked.sort(key=lambda video: (video['verified'], video['verification_score']), reverse=True)
+        return ranked, scored
+
+    @staticmethod
+    def _video_cache_key(video_data: Dict, coin_name: str) -> str:
+        platform = video_data.get('platform', 'youtube').lower()
+        return f"video_{platform}_{video_data.get('video_id', '')}_{coin_name}_{video_data.get('content_date', '')}"
+
+    def score_video(self, video_data: Dict, coin_name: str) -> Tuple[bool, float, str, Dict]:
+        """Score a video without touching the cache.
+
+        Returns (is_verified, accuracy_score, reason, cache_entry), where
+        cache_entry is the verification record verify_video_content caches,
+        including the points each check contributed under 'breakdown'.
+        """
+        title = video_data.get('title', '').lower()
+        url = video_data.get('url', '')
+        platform = video_data.get('platform', 'youtube').lower()
+        content_date = video_data.get('content_date', '')
+
         score = 0.0
         issues = []
+        breakdown = {}  # Points each check contributed, recorded as the checks run
         
         # 1. PUBLIC AVAILABILITY CHECK (CRITICAL)
-        is_public, availability_reason = await self._verify_public_availability(url, platform)
+        is_public, availability_reason = self._check_public_availability(url, platform)
         if not is_public:
             issues.append(f"Video not publicly available: {availability_reason}")
             score -= 30  # Heavy penalty for non-public content
         else:
             score += 20  # Bonus for verified public access
+        breakdown['availability'] = score - sum(breakdown.values())
         
         # 2. Crypto-specific token verification (CRITICAL)
         coin_keywords = self._get_coin_keywords(coin_name)
         coin_symbol = self._get_coin_symbol(coin_name)
+        counts = self._get_matcher(coin_symbol, tuple(coin_keywords)).count(title)
         
-        crypto_specific_score = self._verify_crypto_specificity(title, coin_symbol, coin_keywords)
+        crypto_specific_score = self._verify_crypto_specificity(title, coin_symbol, coin_keywords, counts)
         if crypto_specific_score < 15:  # Minimum threshold for crypto relevance
             issues.append(f"Video not specifically about {coin_symbol}")
             score -= 25  # Heavy penalty for non-specific content
         else:
             score += crypto_specific_score
+        breakdown['specificity'] = score - sum(breakdown.values())
             
         # 3. ENGAGEMENT & ACCURACY RATING (CRITICAL)
-        engagement_score = self._calculate_engagement_rating(title, platform)
+        engagement_score = self._calculate_engagement_rating(title, platform, counts)
         if engagement_score < 60:
             issues.append(f"Low engagement potential: {engagement_score}/100")
             score -= 15
         else:
             score += min(engagement_score // 5, 20)  # Up to 20 bonus points
+        breakdown['engagement'] = score - sum(breakdown.values())
         
         # 4. 24-hour recency verification (CRITICAL)
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        yesterday_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        current_date, yesterday_date = self._recency_dates()
         
         if current_date in title or content_date == current_date:
             score += 25  # Bonus for same-day content
@@ -146,18 +382,13 @@ class ContentVerifier:
         else:
             issues.append("Content not verified as recent (within 24h)")
             score -= 15
+        breakdown['recency'] = score - sum(breakdown.values())
             
         # 5. Clickbait detection (stricter for crypto)
-        clickbait_patterns = [
-            r'\b(shocking|unbelievable|must see|secret|hidden)\b',
-            r'\b(100x|1000x|moon|lambo|to the moon)\b',
-            r'\$\d+\s*(target|prediction)\s*(!|\?)',
-            r'\b(crash|pump|dump|rocket)\s*(!|\?)',
-            r'(\?{3,}|!{3,})',
-            r'\b(breaking|urgent|alert|explosive)\b'
-        ]
-        
-        clickbait_count = sum(1 for pattern in clickbait_patterns if re.search(pattern, title, re.IGNORECASE))
+        if counts['clickbait_hints'] or not title.isascii():  # IGNORECASE also folds e.g. "ſ" to "s"
+            clickbait_count = len({match.lastgroup for match in self.CLICKBAIT_REGEX.finditer(title)})
+        else:
+            clickbait_count = 0
         if clickbait_count == 0:
             score += 15
         elif clickbait_count <= 1:
@@ -166,15 +397,10 @@ class ContentVerifier:
         else:
             issues.append("High clickbait content detected")
             score -= 15
+        breakdown['clickbait'] = score - sum(breakdown.values())
         
         # 6. Platform verification with crypto-specific checks
-        platform_domains = {
-            'youtube': ['youtu.be', 'youtube.com'],
-            'rumble': ['rumble.com'],
-            'twitch': ['twitch.tv']
-        }
-        
-        valid_domains = platform_domains.get(platform, ['youtube.com'])
+        valid_domains = self.PLATFORM_DOMAINS.get(platform, ['youtube.com'])
         if any(domain in url for domain in valid_domains):
             score += 10
             # Verify crypto-specific content in URL
@@ -182,6 +408,7 @@ class ContentVerifier:
                 score += 5  # Bonus for token-specific URL
         else:
             issues.append(f"Invalid {platform} URL")
+        breakdown['platform'] = score - sum(breakdown.values())
             
         # 7. Enhanced verification flags
         if video_data.get('verified_crypto_specific'):
@@ -190,6 +417,7 @@ class ContentVerifier:
             target_keywords = video_data['target_keywords']
             if coin_symbol in target_keywords:
                 score += 10
+        breakdown['flags'] = score - sum(breakdown.values())
                 
         # ENHANCED FINAL VERIFICATION with lenient requirements for X posting
         is_verified = (score >= 50 and           # Lower threshold for X posting
@@ -200,56 +428,45 @@ class ContentVerifier:
         
         reason = "Verified high-quality crypto-specific content" if is_verified else f"Issues: {', '.join(issues)}"
         
-        # Cache result with enhanced verification data
-        self.verification_cache[cache_key] = {
+        # Verification record with enhanced verification data
+        cache_entry = {
             'verified': is_verified,
             'score': score,
             'reason': reason,
             'timestamp': datetime.now().isoformat(),
-            'crypto_specific': coin_symbol.lower() in title,
+            'crypto_specific': counts['symbol'] > 0,
             'recency_verified': current_date in title or content_date == current_date,
             'public_available': is_public,
             'engagement_score': engagement_score,
             'specificity_score': crypto_specific_score,
-            'issues_count': len(issues)
+            'issues_count': len(issues),
+            'breakdown': breakdown
         }
-        self._save_verification_cache()
         
-        return is_verified, score, reason
+        return is_verified, score, reason, cache_entry
+
+    def _recency_dates(self) -> Tuple[str, str]:
+        """Today's and yesterday's dates as YYYY-MM-DD, formatted once per day."""
+        today = date.today()
+        if self._recency_cache[0] != today:
+            self._recency_cache = (today, (today.strftime("%Y-%m-%d"),
+                                           (today - timedelta(days=1)).strftime("%Y-%m-%d")))
+        return self._recency_cache[1]
     
     def _get_coin_symbol(self, coin_name: str) -> str:
         """Get the trading symbol for a coin."""
-        symbol_map = {
-            'ripple': 'XRP',
-            'hedera hashgraph': 'HBAR', 
-            'stellar': 'XLM',
-            'xdce crowd sale': 'XDC',
-            'sui': 'SUI',
-            'ondo finance': 'ONDO',
-            'algorand': 'ALGO',
-            'casper network': 'CSPR'
-        }
-        return symbol_map.get(coin_name, coin_name.split()[0].upper())
+        return self.COIN_SYMBOLS.get(coin_name, coin_name.split()[0].upper())
 
     def _get_coin_keywords(self, coin_name: str) -> List[str]:
         """Get relevant keywords for coin verification."""
-        coin_keywords = {
-            'ripple': ['ripple', 'xrp', 'swift', 'cross-border'],
-            'hedera hashgraph': ['hedera', 'hbar', 'hashgraph', 'enterprise'],
-            'stellar': ['stellar', 'xlm', 'lumen', 'payment'],
-            'xdce crowd sale': ['xinfin', 'xdc', 'trade finance'],
-            'sui': ['sui', 'move', 'programming'],
-            'ondo finance': ['ondo', 'rwa', 'real world assets'],
-            'algorand': ['algorand', 'algo', 'smart contract'],
-            'casper network': ['casper', 'cspr', 'proof of stake']
-        }
-        return coin_keywords.get(coin_name, [coin_name.split()[0]])
+        return self.COIN_KEYWORDS.get(coin_name, [coin_name.split()[0]])
     
     async def _verify_public_availability(self, url: str, platform: str) -> Tuple[bool, str]:
         """Verify video is publicly accessible."""
+        return self._check_public_availability(url, platform)
+
+    def _check_public_availability(self, url: str, platform: str) -> Tuple[bool, str]:
         try:
-            import aiohttp
-            
             # Platform-specific availability checks
             if platform == 'youtube':
                 # Check for common YouTube unavailability indicators
@@ -282,20 +499,22 @@ class ContentVerifier:
             logger.error(f"Error verifying public availability: {e}")
             return False, f"Availability check failed: {e}"
     
-    def _verify_crypto_specificity(self, title: str, coin_symbol: str, coin_keywords: List[str]) -> int:
+    def _verify_crypto_specificity(self, title: str, coin_symbol: str, coin_keywords: List[str],
+                                   counts: Optional[Dict[str, int]] = None) -> int:
         """Verify content is specifically about the target cryptocurrency."""
+        if counts is None:
+            counts = self._get_matcher(coin_symbol, tuple(coin_keywords)).count(title.lower())
         specificity_score = 0
-        title_lower = title.lower()
         
         # MANDATORY: Direct token symbol match (reject if not present)
-        if coin_symbol.lower() not in title_lower:
+        if not counts['symbol']:
             logger.warning(f"Token symbol '{coin_symbol}' not found in title: {title}")
             return 0  # Automatic rejection for non-specific content
         
         specificity_score += 30  # High score for symbol match
         
         # Keyword matches (must have at least one coin-specific keyword)
-        keyword_matches = sum(1 for keyword in coin_keywords if keyword.lower() in title_lower)
+        keyword_matches = counts['keywords']
         if keyword_matches == 0:
             logger.warning(f"No coin-specific keywords found for {coin_symbol} in title: {title}")
             return 0  # Automatic rejection if no coin keywords
@@ -303,26 +522,11 @@ class ContentVerifier:
         specificity_score += keyword_matches * 15  # Higher weight for keywords
         
         # STRICTER penalty for generic crypto terms without specific context
-        generic_terms = ['crypto', 'bitcoin', 'altcoin', 'blockchain', 'market', 'trading', 'cryptocurrency']
-        generic_count = sum(1 for term in generic_terms if term in title_lower)
-        if generic_count > 1:  # Even stricter - max 1 generic term allowed
+        if counts['generic'] > 1:  # Even stricter - max 1 generic term allowed
             specificity_score -= 30
         
         # Enhanced coin-specific technology verification
-        tech_terms = {
-            'xrp': ['swift', 'cross-border', 'ripple', 'cbdc', 'sec', 'lawsuit', 'remittance', 'odl'],
-            'hbar': ['hashgraph', 'enterprise', 'hedera', 'consensus', 'council', 'governing'],
-            'xlm': ['stellar', 'lumens', 'anchor', 'soroban', 'stripe', 'financial inclusion'],
-            'xdc': ['xinfin', 'trade finance', 'iso20022', 'enterprise', 'hybrid'],
-            'sui': ['move programming', 'sui network', 'aptos', 'object', 'parallel execution'],
-            'ondo': ['rwa', 'real world assets', 'tokenization', 'institutional', 'blackrock'],
-            'algo': ['algorand', 'pure proof', 'carbon negative', 'smart contract', 'silvio micali'],
-            'cspr': ['casper', 'highway consensus', 'upgradeable', 'proof of stake', 'cbc']
-        }
-        
-        relevant_terms = tech_terms.get(coin_symbol.lower(), [])
-        tech_matches = sum(1 for term in relevant_terms if term.lower() in title_lower)
-        specificity_score += tech_matches * 12
+        specificity_score += counts['tech'] * 12
         
         # STRICT minimum threshold - must be highly specific
         if specificity_score < 35:
@@ -331,41 +535,20 @@ class ContentVerifier:
         
         return min(specificity_score, 60)  # Higher cap for quality content
     
-    def _calculate_engagement_rating(self, title: str, platform: str) -> int:
+    def _calculate_engagement_rating(self, title: str, platform: str,
+                                     counts: Optional[Dict[str, int]] = None) -> int:
         """Calculate engagement potential rating."""
+        if counts is None:
+            counts = self._get_matcher().count(title.lower())
         engagement_score = 50  # Base score
-        
-        # Educational content indicators (higher engagement)
-        educational_indicators = [
-            'tutorial', 'guide', 'explained', 'analysis', 'review',
-            'deep dive', 'fundamentals', 'technical analysis'
-        ]
-        education_matches = sum(1 for indicator in educational_indicators if indicator in title.lower())
-        engagement_score += education_matches * 10
-        
-        # Professional creator indicators
-        professional_indicators = [
-            'expert', 'professional', 'institutional', 'research',
-            'official', 'whitepaper', 'development'
-        ]
-        pro_matches = sum(1 for indicator in professional_indicators if indicator in title.lower())
-        engagement_score += pro_matches * 8
+        engagement_score += counts['educational'] * 10
+        engagement_score += counts['professional'] * 8
         
         # Platform engagement modifiers
-        platform_modifiers = {
-            'youtube': 5,    # Established platform
-            'rumble': 3,     # Growing platform
-            'twitch': 7      # Live interaction potential
-        }
-        engagement_score += platform_modifiers.get(platform, 0)
+        engagement_score += self.PLATFORM_MODIFIERS.get(platform, 0)
         
         # Penalty for clickbait (reduces genuine engagement)
-        clickbait_terms = [
-            'shocking', 'unbelievable', 'secret', 'hidden',
-            '100x', 'moon', 'lambo', 'pump', 'dump'
-        ]
-        clickbait_count = sum(1 for term in clickbait_terms if term in title.lower())
-        engagement_score -= clickbait_count * 15
+        engagement_score -= counts['clickbait_terms'] * 15
         
         return max(0, min(100, engagement_score))
 
@@ -63,6 +63,17 @@ class Database:
                     )
                 ''')
 
+                # Verification results written back by the batched post verifier
+                self._ensure_column(cursor, 'x_post_history', 'verified', 'BOOLEAN')
+                self._ensure_column(cursor, 'x_post_history', 'verified_at', 'TIMESTAMP')
+                self._ensure_column(cursor, 'x_post_history', 'verification_error', 'TEXT')
+
+                # Normalized content fingerprint for the pre-send duplicate check
+                self._ensure_column(cursor, 'x_post_history', 'content_hash', 'TEXT')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_x_post_history_hash ON x_post_history(content_hash, timestamp)
+                ''')
+
                 # Additional tables for comprehensive functionality
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS coins (
@@ -140,6 +151,19 @@ class Database:
                     )
                 ''')
 
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_youtube_cache_coin ON youtube_cache(coin, timestamp)
+                ''')
+
+                # Quota units spent per Pacific-time day, shared by every process
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS youtube_quota (
+                        day TEXT PRIMARY KEY,
+                        units_used INTEGER NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS youtube_summary_cache (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -185,6 +209,13 @@ class Database:
             logger.error(f"Error initializing database: {e}")
             raise
 
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, definition: str):
+        """Add a column to a table created by an older version of the schema."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
     def has_video_been_used(self, video_id: str) -> bool:
         """Check if a video has been used before."""
         try:
@@ -226,6 +257,34 @@ class Database:
         except Exception as e:
             logger.error(f"Error logging workflow: {e}")
 
+    def add_x_posts(self, posts: list):
+        """Record posted tweets as (tweet_id, content_preview, post_type, content_hash) tuples."""
+        try:
+            with sqlite3.connect(self.db_file) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO x_post_history (tweet_id, content_preview, post_type, content_hash) "
+                    "VALUES (?, ?, ?, ?)",
+                    posts
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording X posts: {e}")
+
+    def update_x_post_verification(self, results: list):
+        """Store verification results as (tweet_id, verified, error) tuples."""
+        try:
+            with sqlite3.connect(self.db_file) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "UPDATE x_post_history SET verified = ?, verification_error = ?, "
+                    "verified_at = CURRENT_TIMESTAMP WHERE tweet_id = ?",
+                    [(verified, error, tweet_id) for tweet_id, verified, error in results]
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error updating X post verification: {e}")
+
     def close(self):
         """Close database connections."""
         # SQLite connections are automatically closed when using context managers
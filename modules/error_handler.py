@@ -68,6 +68,12 @@ class ErrorHandler:
             "traceback": traceback.format_exc() if severity == "error" else None
         }
         
+        # An open circuit is expected while a provider is down: note it, don't record it
+        from modules.circuit_breaker import CircuitOpenError
+        if isinstance(error, CircuitOpenError):
+            logger.debug(f"🔌 {context}: {error}")
+            return error_data
+
         # Log based on severity
         if severity == "error":
             logger.error(f"❌ {context}: {error}")
@@ -128,6 +134,18 @@ class ErrorHandler:
         }
         
         try:
+            # Upstream provider circuits: an open circuit means calls are failing fast to fallbacks
+            from modules.circuit_breaker import circuit_breakers, OPEN, HALF_OPEN
+            breakers = circuit_breakers.get_stats()
+            health_status["checks"]["circuit_breakers"] = breakers
+            for provider, breaker in breakers.items():
+                if breaker["state"] == OPEN:
+                    health_status["warnings"].append(
+                        f"{provider} circuit open ({breaker['failure_rate']:.0%} failures), "
+                        f"next probe in {breaker['retry_in_seconds']:.0f}s")
+                elif breaker["state"] == HALF_OPEN:
+                    health_status["warnings"].append(f"{provider} circuit half-open, probing for recovery")
+            
             import psutil
             
             # Memory check
@@ -0,0 +1,234 @@
+"""
+Local stand-in for the X API v2, for exercising the bot without touching X.
+
+Point the bot at it with X_API_BASE_URL=http://127.0.0.1:<port>. Run it
+standalone with: python -m modules.fake_x_api --port 8089
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import math
+import random
+import re
+import time
+from typing import Dict, Optional, Set
+from aiohttp import web
+
+logger = logging.getLogger('CryptoBot')
+
+OAUTH_TOKEN_PATTERN = re.compile(r'oauth_token="([^"]*)"')
+
+class FakeXAPI:
+    """In-memory fake of the X v2 tweet endpoints used by the bot.
+
+    Serves POST /2/tweets (create, including replies) and GET /2/tweets?ids=
+    (lookup). Posting accounts are told apart by the OAuth 1.0a access token.
+    Configurable behaviour:
+      latency / jitter: seconds added to every create request
+      rate_limit / rate_window: posts allowed per account per window; every
+          create response carries x-rate-limit-* headers and a 429 is returned
+          once the window is spent
+      daily_limit: posts per account per 24h, reported in x-user-limit-24hour-*
+      duplicate_detection: reject an account re-posting identical text (403)
+      valid_tokens: access tokens accepted for posting (None accepts any)
+      auth_failure_rate / error_rate: fraction of creates failing with 401 / 503
+    New client connections to the create endpoint are counted, to check
+    that posting reuses them.
+    """
+
+    def __init__(self, bearer_token: Optional[str] = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit: Optional[int] = None, rate_window: float = 900.0, daily_limit: Optional[int] = None,
+                 duplicate_detection: bool = True, valid_tokens: Optional[Set[str]] = None,
+                 auth_failure_rate: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.bearer_token = bearer_token  # None accepts any bearer token
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.daily_limit = daily_limit
+        self.duplicate_detection = duplicate_detection
+        self.valid_tokens = valid_tokens
+        self.auth_failure_rate = auth_failure_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1_800_000_000_000_000_000)
+        self.tweets: Dict[str, Dict] = {}
+        self._windows: Dict[str, Dict] = {}  # access token -> {'reset', 'count', 'day_reset', 'day_count'}
+        self._texts: Dict[str, Set[str]] = {}  # access token -> texts posted
+        self.counters = {'lookup_requests': 0, 'create_requests': 0, 'created': 0, 'rate_limited': 0,
+                         'duplicates': 0, 'auth_failures': 0, 'server_errors': 0, 'connections': 0}
+        self._peers: Set[tuple] = set()  # Client (host, port) pairs seen, one per TCP connection
+        self.created_by_account: Dict[str, int] = {}
+        self.app = web.Application()
+        self.app.router.add_get('/2/tweets', self._lookup)
+        self.app.router.add_post('/2/tweets', self._create)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def lookup_requests(self) -> int:
+        return self.counters['lookup_requests']
+
+    def add_tweet(self, tweet_id: str, text: str = ""):
+        """Make a tweet visible to lookups."""
+        self.tweets[str(tweet_id)] = {'id': str(tweet_id), 'text': text,
+                                      'edit_history_tweet_ids': [str(tweet_id)]}
+
+    @staticmethod
+    def _problem(status: int, title: str, detail: str, headers: Optional[Dict] = None) -> web.Response:
+        return web.json_response({'title': title, 'detail': detail, 'status': status,
+                                  'type': 'about:blank'}, status=status, headers=headers)
+
+    def _authorized(self, request: web.Request) -> bool:
+        auth = request.headers.get('Authorization', '')
+        if not auth.startswith('Bearer '):
+            return False
+        return self.bearer_token is None or auth[len('Bearer '):] == self.bearer_token
+
+    async def _lookup(self, request: web.Request) -> web.Response:
+        self.counters['lookup_requests'] += 1
+        if not self._authorized(request):
+            return self._problem(401, 'Unauthorized', 'Unauthorized')
+
+        ids = [tweet_id for tweet_id in request.query.get('ids', '').split(',') if tweet_id]
+        if not ids or len(ids) > 100:
+            return web.json_response({
+                'errors': [{'parameters': {'ids': [request.query.get('ids', '')]},
+                            'message': 'The `ids` query parameter value must have between 1 and 100 items'}],
+                'title': 'Invalid Request', 'status': 400
+            }, status=400)
+
+        payload = {}
+        found = [self.tweets[tweet_id] for tweet_id in ids if tweet_id in self.tweets]
+        missing = [tweet_id for tweet_id in ids if tweet_id not in self.tweets]
+        if found:
+            payload['data'] = found
+        if missing:
+            payload['errors'] = [{
+                'value': tweet_id,
+                'detail': f"Could not find tweet with ids: [{tweet_id}].",
+                'title': 'Not Found Error',
+                'resource_type': 'tweet',
+                'parameter': 'ids',
+                'resource_id': tweet_id,
+                'type': 'https://api.twitter.com/2/problems/resource-not-found'
+            } for tweet_id in missing]
+        return web.json_response(payload)
+
+    def _rate_headers(self, token: str) -> Dict[str, str]:
+        """Advance the account's windows and return the headers X would send."""
+        # Windows reset on whole epoch seconds, as the reset headers report them
+        now = time.time()
+        window = self._windows.setdefault(token, {'reset': 0, 'count': 0, 'day_reset': 0, 'day_count': 0})
+        if now >= window['reset']:
+            window['reset'], window['count'] = math.ceil(now + self.rate_window), 0
+        if now >= window['day_reset']:
+            window['day_reset'], window['day_count'] = math.ceil(now + 86400), 0
+
+        headers = {}
+        if self.rate_limit is not None:
+            headers.update({
+                'x-rate-limit-limit': str(self.rate_limit),
+                'x-rate-limit-remaining': str(max(0, self.rate_limit - window['count'])),
+                'x-rate-limit-reset': str(window['reset'])
+            })
+        if self.daily_limit is not None:
+            headers.update({
+                'x-user-limit-24hour-limit': str(self.daily_limit),
+                'x-user-limit-24hour-remaining': str(max(0, self.daily_limit - window['day_count'])),
+                'x-user-limit-24hour-reset': str(window['day_reset'])
+            })
+        return headers
+
+    def _count_connection(self, request: web.Request):
+        peer = request.transport.get_extra_info('peername') if request.transport else None
+        if peer and tuple(peer) not in self._peers:
+            self._peers.add(tuple(peer))
+            self.counters['connections'] += 1
+
+    async def _create(self, request: web.Request) -> web.Response:
+        self.counters['create_requests'] += 1
+        self._count_connection(request)
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+
+        match = OAUTH_TOKEN_PATTERN.search(request.headers.get('Authorization', ''))
+        token = match.group(1) if match else None
+        if not token or (self.valid_tokens is not None and token not in self.valid_tokens) \
+                or self._random.random() < self.auth_failure_rate:
+            self.counters['auth_failures'] += 1
+            return self._problem(401, 'Unauthorized', 'Unauthorized')
+        if self._random.random() < self.error_rate:
+            self.counters['server_errors'] += 1
+            return self._problem(503, 'Service Unavailable', 'Service Unavailable')
+
+        headers = self._rate_headers(token)
+        window = self._windows[token]
+        if (self.rate_limit is not None and window['count'] >= self.rate_limit) or \
+                (self.daily_limit is not None and window['day_count'] >= self.daily_limit):
+            self.counters['rate_limited'] += 1
+            return self._problem(429, 'Too Many Requests', 'Too Many Requests', headers)
+
+        body = await request.json()
+        text = body.get('text', '')
+        reply_to = (body.get('reply') or {}).get('in_reply_to_tweet_id')
+        if reply_to and reply_to not in self.tweets:
+            return self._problem(400, 'Invalid Request', f"Reply target {reply_to} does not exist", headers)
+        if self.duplicate_detection and text in self._texts.get(token, set()):
+            self.counters['duplicates'] += 1
+            return self._problem(403, 'Forbidden',
+                                 'You are not allowed to create a Tweet with duplicate content.', headers)
+
+        window['count'] += 1
+        window['day_count'] += 1
+        headers = self._rate_headers(token)
+        tweet_id = str(next(self._ids))
+        self.add_tweet(tweet_id, text)
+        self._texts.setdefault(token, set()).add(text)
+        self.counters['created'] += 1
+        self.created_by_account[token] = self.created_by_account.get(token, 0) + 1
+        return web.json_response({'data': {'id': tweet_id, 'text': text,
+                                           'edit_history_tweet_ids': [tweet_id]}},
+                                 status=201, headers=headers)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving and return the base URL (port 0 picks a free port)."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://{host}:{bound_port}"
+        logger.info(f"Fake X API listening on {base_url}")
+        return base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def _serve(args):
+    fake_api = FakeXAPI(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                        rate_window=args.rate_window, daily_limit=args.daily_limit,
+                        auth_failure_rate=args.auth_failure_rate, error_rate=args.error_rate)
+    base_url = await fake_api.start(port=args.port)
+    print(f"Fake X API running at {base_url} - set X_API_BASE_URL={base_url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a local fake X API')
+    parser.add_argument('--port', type=int, default=8089, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every create request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds on top of latency')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Posts per account per window')
+    parser.add_argument('--rate-window', type=float, default=900.0, help='Rate-limit window in seconds')
+    parser.add_argument('--daily-limit', type=int, default=None, help='Posts per account per 24 hours')
+    parser.add_argument('--auth-failure-rate', type=float, default=0.0, help='Fraction of creates failing with 401')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of creates failing with 503')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
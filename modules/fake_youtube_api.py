@@ -0,0 +1,185 @@
+"""
+Local stand-in for the YouTube Data API v3, for exercising video discovery
+without spending quota.
+
+Point the bot at it with YOUTUBE_API_BASE_URL=http://127.0.0.1:<port>. Run it
+standalone with: python -m modules.fake_youtube_api --port 8090
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from aiohttp import web
+
+logger = logging.getLogger('CryptoBot')
+
+# Quota units YouTube charges per call
+SEARCH_COST = 100
+VIDEOS_COST = 1
+
+SAMPLE_TITLES = [
+    "{symbol} price analysis {date} - {name} technical analysis explained",
+    "{name} ({symbol}) news today {date}: fundamentals deep dive",
+    "Is {symbol} about to 100x?!! SHOCKING {name} prediction",
+    "{name} {symbol} development update and research review",
+    "Crypto market update {date} - bitcoin, altcoin and {symbol} trading",
+]
+
+class FakeYouTubeAPI:
+    """In-memory fake of the search.list and videos.list endpoints.
+
+    Serves GET /youtube/v3/search and GET /youtube/v3/videos in the shapes
+    the real API returns. Every call is charged against daily_quota at the
+    real unit costs; once it is spent, calls get the 403 quotaExceeded error
+    YouTube sends. Configurable behaviour:
+      api_key: key required on every request (None accepts any)
+      latency: seconds added to every request
+      error_rate: fraction of requests failing with 503
+    """
+
+    def __init__(self, api_key: Optional[str] = None, daily_quota: int = 10000, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        self.api_key = api_key
+        self.daily_quota = daily_quota
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.videos: Dict[str, Dict] = {}
+        self.quota_used = 0
+        self.counters = {'search_requests': 0, 'videos_requests': 0, 'videos_ids_requested': 0,
+                         'quota_exceeded': 0, 'server_errors': 0}
+        self.app = web.Application()
+        self.app.router.add_get('/youtube/v3/search', self._search)
+        self.app.router.add_get('/youtube/v3/videos', self._videos)
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_video(self, title: str, video_id: Optional[str] = None, channel: str = "Crypto Channel",
+                  published_at: Optional[datetime] = None, views: int = 1000, likes: int = 50,
+                  duration: str = "PT12M30S") -> str:
+        """Make a video findable by search and videos.list; returns its ID."""
+        video_id = video_id or f"vid{next(self._ids):08d}"
+        published_at = published_at or datetime.now(timezone.utc)
+        self.videos[video_id] = {
+            'id': video_id,
+            'snippet': {
+                'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'title': title,
+                'channelTitle': channel,
+                'liveBroadcastContent': 'none'
+            },
+            'statistics': {'viewCount': str(views), 'likeCount': str(likes)},
+            'contentDetails': {'duration': duration}
+        }
+        return video_id
+
+    def add_sample_videos(self, name: str, symbol: str, count: int = 5):
+        """Add a few typical titles (good and clickbait) for a coin."""
+        date = datetime.now().strftime("%Y-%m-%d")
+        for n in range(count):
+            template = SAMPLE_TITLES[n % len(SAMPLE_TITLES)]
+            self.add_video(template.format(name=name.title(), symbol=symbol, date=date),
+                           published_at=datetime.now(timezone.utc) - timedelta(hours=n),
+                           views=self._random.randrange(100, 100000))
+
+    @staticmethod
+    def _error(status: int, reason: str, message: str) -> web.Response:
+        return web.json_response({'error': {'code': status, 'message': message,
+                                            'errors': [{'message': message, 'domain': 'youtube.quota',
+                                                        'reason': reason}]}}, status=status)
+
+    async def _charge(self, request: web.Request, units: int) -> Optional[web.Response]:
+        """Apply latency, key and quota checks; returns an error response or None."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.api_key is not None and request.query.get('key') != self.api_key:
+            return self._error(400, 'keyInvalid', 'API key not valid. Please pass a valid API key.')
+        if self._random.random() < self.error_rate:
+            self.counters['server_errors'] += 1
+            return self._error(503, 'backendError', 'Backend Error')
+        if self.quota_used + units > self.daily_quota:
+            self.counters['quota_exceeded'] += 1
+            return self._error(403, 'quotaExceeded', 'The request cannot be completed because you have '
+                                                     'exceeded your quota.')
+        self.quota_used += units
+        return None
+
+    async def _search(self, request: web.Request) -> web.Response:
+        self.counters['search_requests'] += 1
+        error = await self._charge(request, SEARCH_COST)
+        if error is not None:
+            return error
+
+        terms = [term for term in request.query.get('q', '').lower().split() if term]
+        published_after = request.query.get('publishedAfter')
+        max_results = min(50, int(request.query.get('maxResults', 5)))
+        matches = [video for video in self.videos.values()
+                   if any(term in video['snippet']['title'].lower() for term in terms)
+                   and (not published_after or video['snippet']['publishedAt'] >= published_after)]
+        matches.sort(key=lambda video: video['snippet']['publishedAt'], reverse=True)
+        return web.json_response({
+            'kind': 'youtube#searchListResponse',
+            'pageInfo': {'totalResults': len(matches), 'resultsPerPage': max_results},
+            'items': [{'kind': 'youtube#searchResult',
+                       'id': {'kind': 'youtube#video', 'videoId': video['id']},
+                       'snippet': video['snippet']} for video in matches[:max_results]]
+        })
+
+    async def _videos(self, request: web.Request) -> web.Response:
+        self.counters['videos_requests'] += 1
+        error = await self._charge(request, VIDEOS_COST)
+        if error is not None:
+            return error
+
+        ids = [video_id for video_id in request.query.get('id', '').split(',') if video_id]
+        if len(ids) > 50:
+            return self._error(400, 'invalidParameter', 'At most 50 video IDs can be requested at once.')
+        self.counters['videos_ids_requested'] += len(ids)
+        return web.json_response({
+            'kind': 'youtube#videoListResponse',
+            'items': [self.videos[video_id] for video_id in ids if video_id in self.videos]
+        })
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving and return the base URL (port 0 picks a free port)."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://{host}:{bound_port}"
+        logger.info(f"Fake YouTube API listening on {base_url}")
+        return base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def _serve(args):
+    fake_api = FakeYouTubeAPI(daily_quota=args.daily_quota, latency=args.latency, error_rate=args.error_rate)
+    for coin in args.coins:
+        name, _, symbol = coin.partition(':')
+        fake_api.add_sample_videos(name.replace('-', ' '), symbol or name[:4].upper())
+    base_url = await fake_api.start(port=args.port)
+    print(f"Fake YouTube API running at {base_url} - set YOUTUBE_API_BASE_URL={base_url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a local fake YouTube Data API')
+    parser.add_argument('--port', type=int, default=8090, help='Port to listen on')
+    parser.add_argument('--daily-quota', type=int, default=10000, help='Quota units before quotaExceeded')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 503')
+    parser.add_argument('--coins', nargs='*', default=['ripple:XRP', 'stellar:XLM', 'algorand:ALGO'],
+                        help='Coins to add sample videos for, as name:SYMBOL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import aiohttp
+
+logger = logging.getLogger('CryptoBot')
+
+DISCORD_MESSAGE_LIMIT = 2000  # Max characters in a webhook message's content
+
+class WebhookNotifier:
+    """Background webhook sender that batches and de-duplicates alerts.
+
+    notify() only buffers the message and returns immediately. The sender
+    waits batch_window seconds after the first buffered message, then sends
+    everything collected as few webhook calls as the 2000-character limit
+    allows. Messages with the same key are merged while buffered (shown as
+    "(xN)") and suppressed if the same key was sent within dedup_window. The
+    buffer is bounded; when full, the oldest message is dropped. Discord's
+    X-RateLimit-* headers and 429 retry_after are honoured before each send.
+    """
+
+    def __init__(self, max_buffer: int = 200, batch_window: float = 2.0, dedup_window: float = 300.0):
+        self.max_buffer = max_buffer
+        self.batch_window = batch_window
+        self.dedup_window = dedup_window
+        self._buffer: "OrderedDict[str, Dict]" = OrderedDict()  # key -> {'content', 'count'}
+        self._recently_sent: Dict[str, float] = {}  # key -> monotonic time sent
+        self._blocked_until = 0.0  # Monotonic time before which Discord asked us not to send
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_requested: Optional[asyncio.Event] = None
+        self.stats = {'queued': 0, 'merged': 0, 'suppressed': 0, 'dropped': 0,
+                      'sent_messages': 0, 'webhook_calls': 0, 'rate_limited': 0, 'failed_calls': 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the sender on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stop_requested = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="webhook-notifier")
+
+    async def stop(self):
+        """Send whatever is buffered, then stop the sender."""
+        if not self.running:
+            return
+        # Cut the batch window short but let an in-flight send finish
+        self._stop_requested.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        try:
+            await self._flush()
+        except Exception as e:
+            logger.error(f"Failed to flush webhook notifications: {e}")
+
+    def notify(self, content: str, key: Optional[str] = None) -> bool:
+        """Buffer a message for the notification webhook without waiting.
+
+        key identifies duplicates (defaults to the content itself); pass one
+        when messages differ only in details such as timestamps. Returns False
+        if the message was suppressed as a recent duplicate.
+        """
+        key = key or content
+        now = time.monotonic()
+        if now - self._recently_sent.get(key, float('-inf')) < self.dedup_window:
+            self.stats['suppressed'] += 1
+            return False
+
+        if key in self._buffer:
+            self._buffer[key]['content'] = content
+            self._buffer[key]['count'] += 1
+            self.stats['merged'] += 1
+        else:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popitem(last=False)
+                self.stats['dropped'] += 1
+            self._buffer[key] = {'content': content, 'count': 1}
+            self.stats['queued'] += 1
+
+        if not self.running:
+            try:
+                self.start()
+            except RuntimeError:
+                pass  # No running loop; sent by the next start() or stop()
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'buffered': len(self._buffer)}
+
+    async def _run(self):
+        while not self._stop_requested.is_set():
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._stop_requested.wait(), self.batch_window)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Error sending webhook notifications: {e}")
+
+    def _take_batches(self) -> List[str]:
+        """Drain the buffer into messages of at most DISCORD_MESSAGE_LIMIT characters."""
+        now = time.monotonic()
+        self._recently_sent = {key: sent for key, sent in self._recently_sent.items()
+                               if now - sent < self.dedup_window}
+        batches, current = [], ""
+        while self._buffer:
+            key, entry = self._buffer.popitem(last=False)
+            self._recently_sent[key] = now
+            text = entry['content'] if entry['count'] == 1 else f"{entry['content']} (x{entry['count']})"
+            text = text[:DISCORD_MESSAGE_LIMIT]
+            if current and len(current) + 2 + len(text) > DISCORD_MESSAGE_LIMIT:
+                batches.append(current)
+                current = ""
+            current = f"{current}\n\n{text}" if current else text
+            self.stats['sent_messages'] += 1
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _flush(self):
+        from modules.api_clients import get_notification_webhook_url
+
+        webhook_url = get_notification_webhook_url()
+        if not webhook_url:
+            self._buffer.clear()
+            return
+        batches = self._take_batches()
+        if not batches:
+            return
+        async with aiohttp.ClientSession() as session:
+            for content in batches:
+                await self._send(session, webhook_url, content)
+
+    async def _send(self, session: aiohttp.ClientSession, webhook_url: str, content: str, attempts: int = 3):
+        for _ in range(attempts):
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with session.post(webhook_url, json={"content": content},
+                                        timeout=aiohttp.ClientTimeout(total=15)) as response:
+                    self.stats['webhook_calls'] += 1
+                    self._update_rate_limit(response.headers)
+                    if response.status == 429:
+                        self.stats['rate_limited'] += 1
+                        try:
+                            retry_after = float((await response.json()).get('retry_after', 1))
+                        except Exception:
+                            retry_after = float(response.headers.get('Retry-After', 1))
+                        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                        logger.warning(f"Discord webhook rate limited - retrying in {retry_after:.1f}s")
+                        continue
+                    if response.status >= 400:
+                        self.stats['failed_calls'] += 1
+                        logger.error(f"Webhook notification failed: HTTP {response.status}")
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats['failed_calls'] += 1
+                logger.error(f"Webhook notification failed: {e}")
+                return
+        logger.error("Dropping webhook notification after repeated rate limits")
+
+    def _update_rate_limit(self, headers):
+        """Wait out the bucket's reset when Discord says no requests remain."""
+        try:
+            if headers.get('X-RateLimit-Remaining') == '0':
+                reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+                self._blocked_until = max(self._blocked_until, time.monotonic() + reset_after)
+        except (TypeError, ValueError):
+            pass
+
+# Global notifier instance
+notifier = WebhookNotifier()
@@ -0,0 +1,76 @@
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+class ProviderRegistry:
+    """Third-party API SDKs, each imported the first time it is used.
+
+    tweepy, pycoingecko, python-binance and googleapiclient together take
+    about a second to import, and most runs only need one or two of them
+    (a Discord-only run needs none). Modules ask the registry for a
+    provider instead of importing the SDK at module load, so each workflow
+    only pays for the SDKs it actually calls. Load times are kept for the
+    startup report.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._loaded: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register a provider; loader is called once, on the first get()."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._loaded.pop(name, None)
+
+    def register_module(self, name: str, module: str, attribute: Optional[str] = None):
+        """Register a provider that is a module, or one attribute of it."""
+        def load():
+            loaded = importlib.import_module(module)
+            return getattr(loaded, attribute) if attribute else loaded
+        self.register(name, load)
+
+    def get(self, name: str) -> Any:
+        """The provider's SDK object, importing it now if this is its first use."""
+        if name in self._loaded:
+            return self._loaded[name]
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            if name not in self._loaders:
+                raise KeyError(f"Unknown provider: {name}")
+            started = time.perf_counter()
+            provider = self._loaders[name]()
+            self._load_seconds[name] = time.perf_counter() - started
+            self._loaded[name] = provider
+        logger.debug(f"Loaded provider {name} in {self._load_seconds[name] * 1000:.0f}ms")
+        return provider
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def get_stats(self) -> Dict:
+        return {
+            name: {
+                'loaded': name in self._loaded,
+                'load_ms': round(self._load_seconds[name] * 1000, 1) if name in self._load_seconds else None
+            }
+            for name in self._loaders
+        }
+
+# Global provider registry
+providers = ProviderRegistry()
+providers.register_module('tweepy', 'tweepy')
+providers.register_module('coingecko', 'pycoingecko', 'CoinGeckoAPI')
+providers.register_module('binance', 'binance.client', 'Client')
+providers.register_module('youtube', 'googleapiclient.discovery', 'build')
+
+def get_provider(name: str) -> Any:
+    """Get a provider SDK from the global registry, e.g. get_provider('tweepy')."""
+    return providers.get(name)
@@ -1,74 +1,448 @@
-
+import os
+import re
+import json
+import math
 import time
+import sqlite3
 import logging
+import threading
+from bisect import bisect_right, insort
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger('CryptoBot')
 
+RATE_LIMIT_DB_FILE = "crypto_bot.db"
+DEFAULT_RATE_LIMITS = "15m:10"  # Very conservative - X limits are strict
+
+# Window length of each limit X reports in response headers
+X_WINDOW_SECONDS = {'endpoint': 15 * 60, 'user_24hour': 24 * 3600}
+
+_PERIOD_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+class RateLimit:
+    """A sliding-window limit: at most `count` posts in any `period` seconds.
+
+    Checked against the account's post log (timestamps, oldest first): the
+    next post is allowed once the post `count` places back has left the
+    window, so a decision is one index lookup and there are no window edges
+    to burst across.
+    """
+
+    def __init__(self, name: str, count: int, period: float):
+        if count <= 0 or period <= 0:
+            raise ValueError(f"Rate limit {name} needs a positive count and period")
+        self.name = name
+        self.count = count
+        self.period = period
+
+    def earliest(self, post_log, now: float) -> float:
+        """Epoch time the next post is allowed."""
+        if len(post_log) < self.count:
+            return now
+        return max(now, post_log[-self.count] + self.period)
+
+    def in_window(self, post_log, now: float) -> int:
+        """Posts made within the last period."""
+        # Only the last `count` posts can matter; older ones are never needed
+        return len(post_log) - bisect_right(post_log, now - self.period, max(0, len(post_log) - self.count))
+
+    def __repr__(self):
+        return f"RateLimit({self.name!r}, {self.count}, {self.period:g})"
+
+def parse_rate_limits(spec: str) -> Dict[str, RateLimit]:
+    """Parse limits such as "15m:10,24h:100,30d:3000" (period:count, units s/m/h/d)."""
+    limits = {}
+    for part in filter(None, (part.strip() for part in spec.split(','))):
+        match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd]):(\d+)', part)
+        if not match:
+            raise ValueError(f"Invalid rate limit {part!r}, expected e.g. 15m:10")
+        amount, unit, count = match.groups()
+        name = f"{amount}{unit}"
+        limits[name] = RateLimit(name, int(count), float(amount) * _PERIOD_UNITS[unit])
+    return limits
+
 class RateLimitManager:
-    """Manages X API rate limits across multiple accounts."""
-    
-    def __init__(self):
-        self.account_limits = {
-            1: {'last_post': None, 'posts_in_window': 0, 'window_start': None, 'rate_limited_until': None},
-            2: {'last_post': None, 'posts_in_window': 0, 'window_start': None, 'rate_limited_until': None}
+    """Manages X API rate limits across multiple accounts.
+
+    Every account is held to all configured limits at once (X_RATE_LIMITS,
+    e.g. "15m:10,24h:100,30d:3000"), each a sliding window over the account's
+    post log (see RateLimit), plus any
+    exhausted window X reported in x-rate-limit-* / x-user-limit-24hour-*
+    headers and cooldowns set by mark_rate_limited.
+
+    State is shared by every process on the host through the x_rate_limits
+    table, with each post a row in x_rate_limit_posts (pruned once it is
+    older than the longest limit). Each change re-reads the account's row
+    and writes it back in one IMMEDIATE transaction, and a post only inserts
+    its own row, so concurrent processes never lose each other's posts or
+    cooldowns. Reads use the in-memory copy, reloaded when PRAGMA
+    data_version shows another process committed; that check runs at most
+    every refresh_interval seconds, so a read is normally just a clock call.
+    A reload reads only the post rows added since the last one.
+    Writes can wait up to 10s for another process's transaction, so async
+    callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, db_file: str = RATE_LIMIT_DB_FILE, refresh_interval: float = 0.05,
+                 limits: Optional[Dict[str, RateLimit]] = None):
+        # Accounts are created on first use; modules.x_accounts decides which exist
+        self.account_limits: Dict[int, Dict] = defaultdict(self._new_account_state)
+        self._limits = limits
+        self.db_file = db_file
+        self.refresh_interval = refresh_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._store_failed = False
+        self._lock = threading.RLock()  # Headers are recorded from tweepy's worker threads
+        self._data_version = None
+        self._posts_seen = 0  # Highest x_rate_limit_posts rowid merged into the in-memory post logs
+        self._checked_at = float('-inf')
+
+    @staticmethod
+    def _new_account_state() -> Dict:
+        return {
+            'last_post': None, 'rate_limited_until': None,
+            'post_log': [],  # Epoch times of recent posts, oldest first, as many as the largest limit needs
+            'api_windows': {}  # Limits reported by X response headers
         }
-        self.posts_per_15min = 10  # Very conservative - X limits are strict
-        
+
+    @property
+    def limits(self) -> Dict[str, RateLimit]:
+        """Local limits every account is held to, from X_RATE_LIMITS on first use."""
+        if self._limits is None:
+            try:
+                self._limits = parse_rate_limits(os.getenv("X_RATE_LIMITS", DEFAULT_RATE_LIMITS))
+            except ValueError as e:
+                logger.error(f"{e} - using {DEFAULT_RATE_LIMITS}")
+                self._limits = parse_rate_limits(DEFAULT_RATE_LIMITS)
+        return self._limits
+
+    @property
+    def posts_per_15min(self) -> Optional[int]:
+        limit = self.limits.get('15m')
+        return limit.count if limit else None
+
+    @posts_per_15min.setter
+    def posts_per_15min(self, count: int):
+        self.limits['15m'] = RateLimit('15m', count, 15 * 60)
+
+    def _store(self) -> Optional[sqlite3.Connection]:
+        """Open the shared state table on first use; None if it is unavailable."""
+        if self._conn is None and not self._store_failed:
+            try:
+                conn = sqlite3.connect(self.db_file, timeout=10, isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS x_rate_limits (
+                        account_num INTEGER PRIMARY KEY,
+                        last_post REAL,
+                        rate_limited_until REAL,
+                        post_log TEXT,
+                        api_windows TEXT
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS x_rate_limit_posts (
+                        account_num INTEGER NOT NULL,
+                        posted_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_x_rate_limit_posts ON x_rate_limit_posts(account_num, posted_at)
+                ''')
+                self._migrate_post_logs(conn)
+                self._conn = conn
+            except sqlite3.Error as e:
+                self._store_failed = True
+                logger.error(f"Rate-limit state can't be shared between processes, keeping it in memory: {e}")
+        return self._conn
+
+    @staticmethod
+    def _migrate_post_logs(conn: sqlite3.Connection):
+        """Move post logs stored as JSON by older versions into x_rate_limit_posts."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT account_num, post_log FROM x_rate_limits WHERE post_log IS NOT NULL"
+            ).fetchall()
+            conn.executemany(
+                "INSERT INTO x_rate_limit_posts (account_num, posted_at) VALUES (?, ?)",
+                [(account_num, posted_at) for account_num, post_log in rows for posted_at in json.loads(post_log or '[]')]
+            )
+            conn.execute("UPDATE x_rate_limits SET post_log = NULL")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @property
+    def _keep_posts(self) -> int:
+        """Posts per account the limits can still need, newest first."""
+        return max(limit.count for limit in self.limits.values())
+
+    @staticmethod
+    def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+        return value.timestamp() if value else None
+
+    @staticmethod
+    def _from_epoch(value: Optional[float]) -> Optional[datetime]:
+        return datetime.fromtimestamp(value) if value is not None else None
+
+    def _account_from_row(self, row: tuple, post_log: List[float]) -> Dict:
+        account = self._new_account_state()
+        account.update({
+            'last_post': self._from_epoch(row[0]),
+            'rate_limited_until': self._from_epoch(row[1]),
+            'post_log': post_log
+        })
+        account['api_windows'] = {
+            name: {'remaining': window['remaining'], 'reset': self._from_epoch(window['reset']),
+                   'limit': window.get('limit')}
+            for name, window in json.loads(row[2] or '{}').items()
+        }
+        return account
+
+    def _account_to_row(self, account_num: int, account: Dict) -> tuple:
+        return (
+            account_num,
+            self._to_epoch(account['last_post']),
+            self._to_epoch(account['rate_limited_until']),
+            json.dumps({name: {'remaining': window['remaining'], 'reset': window['reset'].timestamp(),
+                               'limit': window.get('limit')}
+                        for name, window in account['api_windows'].items()})
+        )
+
+    def _refresh(self):
+        """Pick up changes other processes committed since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return
+        conn = self._store()
+        with self._lock:
+            self._checked_at = now
+            if conn is None:
+                return
+            try:
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == self._data_version:
+                    return
+                rows = conn.execute(
+                    "SELECT account_num, last_post, rate_limited_until, api_windows FROM x_rate_limits"
+                ).fetchall()
+                self._load_new_posts(conn)
+                self._data_version = version
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read shared rate-limit state: {e}")
+                return
+            for row in rows:
+                self.account_limits[row[0]] = self._account_from_row(row[1:], self.account_limits[row[0]]['post_log'])
+
+    def _load_new_posts(self, conn: sqlite3.Connection):
+        """Merge post rows added since the last load (by any process) into the in-memory post logs."""
+        rows = conn.execute(
+            "SELECT rowid, account_num, posted_at FROM x_rate_limit_posts WHERE rowid > ? ORDER BY rowid",
+            (self._posts_seen,)
+        ).fetchall()
+        keep = self._keep_posts
+        for _, account_num, posted_at in rows:
+            post_log = self.account_limits[account_num]['post_log']
+            insort(post_log, posted_at)
+            del post_log[:-keep]
+        if rows:
+            self._posts_seen = rows[-1][0]
+
+    def _update(self, account_num: int, change: Callable[[Dict], None], posted_at: Optional[float] = None):
+        """Apply a change to an account's state and persist it for other processes.
+
+        posted_at adds a post to the account's log; only that one row is
+        written, and rows older than the longest limit are pruned with it.
+        Posts other processes logged since the last refresh are merged first.
+        """
+        conn = self._store()
+        with self._lock:
+            if conn is not None:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        row = conn.execute(
+                            "SELECT last_post, rate_limited_until, api_windows "
+                            "FROM x_rate_limits WHERE account_num = ?", (account_num,)
+                        ).fetchone()
+                        if conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                            # Another process committed since the last refresh: it may have posted too
+                            self._load_new_posts(conn)
+                        post_log = list(self.account_limits[account_num]['post_log'])
+                        account = self._account_from_row(row, post_log) if row else \
+                            {**self._new_account_state(), 'post_log': post_log}
+                        change(account)
+                        conn.execute(
+                            "INSERT OR REPLACE INTO x_rate_limits "
+                            "(account_num, last_post, rate_limited_until, api_windows) VALUES (?, ?, ?, ?)",
+                            self._account_to_row(account_num, account)
+                        )
+                        if posted_at is not None:
+                            post_rowid = conn.execute(
+                                "INSERT INTO x_rate_limit_posts (account_num, posted_at) VALUES (?, ?)",
+                                (account_num, posted_at)
+                            ).lastrowid
+                            conn.execute(
+                                "DELETE FROM x_rate_limit_posts WHERE account_num = ? AND posted_at < ?",
+                                (account_num, posted_at - max(limit.period for limit in self.limits.values()))
+                            )
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                    self.account_limits[account_num] = account
+                    if posted_at is not None:
+                        # Every earlier row has been merged by now, and this one is in the change
+                        self._posts_seen = post_rowid
+                    return
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to save rate-limit state for account {account_num}: {e}")
+            change(self.account_limits[account_num])
+
     def can_post(self, account_num: int) -> bool:
         """Check if account can post without hitting rate limits."""
-        now = datetime.now()
+        self._refresh()
+        now = time.time()
         account = self.account_limits[account_num]
-        
+
         # Check if account is currently rate limited
-        if account['rate_limited_until'] and now < account['rate_limited_until']:
+        if account['rate_limited_until'] and now < account['rate_limited_until'].timestamp():
             return False
-        
-        # Reset window if 15 minutes passed
-        if account['window_start'] and (now - account['window_start']) > timedelta(minutes=15):
-            account['posts_in_window'] = 0
-            account['window_start'] = now
-        
-        # Check if we're under the limit
-        return account['posts_in_window'] < self.posts_per_15min
-    
-    def mark_rate_limited(self, account_num: int, duration_minutes: int = 60):
-        """Mark account as rate limited for specified duration."""
+
+        # Check limits reported by X itself
+        for window in account['api_windows'].values():
+            if window['remaining'] <= 0 and now < window['reset'].timestamp():
+                return False
+
+        return all(limit.earliest(account['post_log'], now) <= now for limit in self.limits.values())
+
+    def mark_rate_limited(self, account_num: int, duration_minutes: int = 60, until: Optional[datetime] = None):
+        """Mark account as rate limited for specified duration (or until a given time)."""
+        until = until or datetime.now() + timedelta(minutes=duration_minutes)
+
+        def change(account):
+            # Another process may already have set a longer cooldown
+            account['rate_limited_until'] = max(until, account['rate_limited_until'] or until)
+
+        self._update(account_num, change)
+        logger.warning(f"Account {account_num} marked as rate limited until {until.strftime('%H:%M:%S')}")
+
+    def reported_reset(self, account_num: int) -> Optional[datetime]:
+        """When the latest window X reported as exhausted resets, or None if none is."""
+        self._refresh()
         now = datetime.now()
-        self.account_limits[account_num]['rate_limited_until'] = now + timedelta(minutes=duration_minutes)
-        logger.warning(f"Account {account_num} marked as rate limited for {duration_minutes} minutes")
-    
-    def get_best_account(self) -> int:
-        """Get the account with the most remaining capacity."""
-        for account_num in [1, 2]:
-            if self.can_post(account_num):
-                return account_num
-        return None  # All accounts rate limited
-    
+        resets = [window['reset'] for window in self.account_limits[account_num]['api_windows'].values()
+                  if window['remaining'] <= 0 and window['reset'] > now]
+        return max(resets, default=None)
+
+    def remaining_capacity(self, account_num: int) -> int:
+        """Posts the account can still make back to back right now (0 while rate limited)."""
+        if not self.can_post(account_num):
+            return 0
+        return min(remaining for remaining, _ in self.get_budget_windows(account_num))
+
+    def next_available_time(self, account_num: int, posts: int = 1) -> datetime:
+        """Earliest time the account can have made `posts` more posts.
+
+        Simulates posting each one as soon as every limit allows, so for
+        posts=1 it is when the next post may go out and for a thread it is
+        when its last tweet can. X-reported windows are assumed to renew
+        with the same limit at each reset.
+        """
+        self._refresh()
+        now = time.time()
+        account = self.account_limits[account_num]
+        t = max(now, self._to_epoch(account['rate_limited_until']) or now)
+        post_log = list(account['post_log'])
+        x_windows = [(window['remaining'], window['reset'].timestamp(), window.get('limit'), X_WINDOW_SECONDS.get(name))
+                     for name, window in account['api_windows'].items() if window['reset'].timestamp() > now]
+
+        for index in range(max(1, posts)):
+            for limit in self.limits.values():
+                t = max(t, limit.earliest(post_log, t))
+            for remaining, reset, limit_count, window_seconds in x_windows:
+                if index >= remaining:
+                    # Beyond this window's remaining posts: wait for the reset that renews enough of them
+                    renewals = (index - remaining) // limit_count if limit_count and window_seconds else 0
+                    t = max(t, reset + renewals * (window_seconds or 0))
+            post_log.append(t)
+        return datetime.fromtimestamp(t)
+
+    def get_best_account(self) -> Optional[int]:
+        """Get the account with the most remaining capacity, weighted by health (None if all are limited)."""
+        from modules.x_accounts import x_accounts
+        return x_accounts.select()
+
     def record_post(self, account_num: int):
         """Record a successful post."""
         now = datetime.now()
-        account = self.account_limits[account_num]
-        
-        if not account['window_start']:
-            account['window_start'] = now
-            
-        account['last_post'] = now
-        account['posts_in_window'] += 1
-        
+
+        def change(account):
+            # Another process may have logged a later post already
+            account['last_post'] = max(now, account['last_post'] or now)
+            insort(account['post_log'], now.timestamp())
+            del account['post_log'][:-self._keep_posts]
+
+        self._update(account_num, change, posted_at=now.timestamp())
+
+    def update_from_headers(self, account_num: int, headers) -> None:
+        """Record the rate-limit state X reported in a response's headers."""
+        if not headers:
+            return
+
+        windows = {}
+        for name, prefix in (('endpoint', 'x-rate-limit'), ('user_24hour', 'x-user-limit-24hour')):
+            remaining = headers.get(f'{prefix}-remaining')
+            reset = headers.get(f'{prefix}-reset')
+            if remaining is None or reset is None:
+                continue
+            try:
+                limit = headers.get(f'{prefix}-limit')
+                windows[name] = {
+                    'remaining': int(remaining),
+                    'reset': datetime.fromtimestamp(int(reset)),
+                    'limit': int(limit) if limit is not None else None
+                }
+            except (TypeError, ValueError):
+                logger.debug(f"Ignoring malformed {prefix} headers for account {account_num}")
+        if windows:
+            self._update(account_num, lambda account: account['api_windows'].update(windows))
+
+    def get_budget_windows(self, account_num: int) -> List[Tuple[int, float]]:
+        """Get (remaining posts, seconds until reset) for every known limit on an account.
+
+        Includes every local limit, counted from the post log (reset is when
+        the oldest post in the window leaves it), plus any unexpired limits
+        reported by X headers.
+        """
+        self._refresh()
+        now = time.time()
+        post_log = self.account_limits[account_num]['post_log']
+
+        windows = []
+        for limit in self.limits.values():
+            recent = limit.in_window(post_log, now)
+            window_left = post_log[-recent] + limit.period - now if recent else limit.period
+            windows.append((limit.count - recent, window_left))
+
+        for window in self.account_limits[account_num]['api_windows'].values():
+            if now < window['reset'].timestamp():
+                windows.append((window['remaining'], window['reset'].timestamp() - now))
+        return windows
+
     def get_wait_time(self) -> int:
-        """Get recommended wait time before next attempt."""
-        now = datetime.now()
-        min_wait = float('inf')
-        
-        for account in self.account_limits.values():
-            if account['window_start']:
-                window_end = account['window_start'] + timedelta(minutes=15)
-                wait_time = (window_end - now).total_seconds()
-                min_wait = min(min_wait, max(0, wait_time))
-        
-        return int(min_wait) if min_wait != float('inf') else 900  # Default 15 min
+        """Get recommended wait time in seconds before the next post on any account."""
+        from modules.x_accounts import x_accounts
+        accounts = x_accounts.numbers()
+        if not accounts:
+            return 0
+        next_available = min(self.next_available_time(account_num) for account_num in accounts)
+        return max(0, math.ceil((next_available - datetime.now()).total_seconds()))
 
 # Global instance
 rate_manager = RateLimitManager()
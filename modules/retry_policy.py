@@ -0,0 +1,213 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+import aiohttp
+
+logger = logging.getLogger('CryptoBot')
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Transport failures worth another attempt; OSError covers requests' ConnectionError and Timeout
+RETRYABLE_EXCEPTIONS = (asyncio.TimeoutError, TimeoutError, ConnectionError, OSError,
+                        aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status carried by an aiohttp, requests or tweepy error, if any."""
+    status = getattr(error, 'status', None)  # aiohttp.ClientResponseError
+    if isinstance(status, int):
+        return status
+    response = getattr(error, 'response', None)  # requests.HTTPError, tweepy.HTTPException
+    status = getattr(response, 'status_code', None) or getattr(response, 'status', None) \
+        or getattr(error, 'status_code', None)  # XLookupError
+    return status if isinstance(status, int) else None
+
+class RetryPolicy:
+    """Declarative retry and hedging rules for one kind of network call.
+
+    A failed attempt is retried while it is retryable (a status in
+    retryable_statuses, or a transport error with no status), attempts
+    remain and the total deadline allows it. Waits between attempts use
+    exponential backoff, base_delay * 2^(attempt-1) capped at max_delay,
+    with jitter so clients that failed together don't retry together: "full"
+    picks a delay between 0 and that, "equal" between half of it and all of
+    it (for cooldowns that must not come out near zero).
+
+    With hedge=True (idempotent reads only) a second, duplicate request is
+    sent if the first hasn't answered by the p95 latency of recent calls, and
+    whichever answers first wins. Hedges are capped at hedge_budget of all
+    calls so an outage never doubles the load on a provider.
+    """
+
+    def __init__(self, name: str, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 jitter: str = "full", retryable_statuses: FrozenSet[int] = RETRYABLE_STATUSES,
+                 deadline: Optional[float] = None, hedge: bool = False, hedge_budget: float = 0.1,
+                 hedge_min_samples: int = 20):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        if jitter not in ("full", "equal"):
+            raise ValueError(f"Unknown jitter: {jitter}")
+        self.jitter = jitter
+        self.retryable_statuses = retryable_statuses
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies = deque(maxlen=200)  # Seconds taken by recent successful attempts
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'gave_up': 0, 'hedges': 0, 'hedge_wins': 0}
+
+    def is_retryable(self, error: BaseException) -> bool:
+        from modules.circuit_breaker import CircuitOpenError
+        if isinstance(error, CircuitOpenError):
+            return False
+        status = error_status(error)
+        if status is not None:
+            return status in self.retryable_statuses
+        if isinstance(error, RETRYABLE_EXCEPTIONS):
+            return True
+        # Wrapped transport errors, e.g. XLookupError raised from an aiohttp error
+        return error.__cause__ is not None and self.is_retryable(error.__cause__)
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number attempt (1 for the first retry)."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self._random.uniform(0 if self.jitter == "full" else delay / 2, delay)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 latency of recent successful attempts, or None until there are enough of them."""
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def _record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _next_delay(self, error: BaseException, attempt: int, started: float) -> Optional[float]:
+        """Delay before the next attempt, or None if error should be raised."""
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and time.monotonic() + delay - started >= self.deadline:
+            return None
+        return delay
+
+    def _give_up(self, error: BaseException, attempt: int):
+        self.stats['gave_up'] += 1
+        if attempt > 1:
+            logger.warning(f"🔁 {self.name}: giving up after {attempt} attempts: {error}")
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Await func(*args, **kwargs) under this policy; func must return a new coroutine on every call."""
+        self.stats['calls'] += 1
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats['attempts'] += 1
+            remaining = None if self.deadline is None else self.deadline - (time.monotonic() - started)
+            try:
+                return await self._attempt(func, args, kwargs, remaining)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    self._give_up(e, attempt)
+                    raise
+                self.stats['retries'] += 1
+                logger.debug(f"🔁 {self.name}: attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, func: Callable, args: Tuple, kwargs: Dict, timeout: Optional[float]) -> Any:
+        attempt_started = time.monotonic()
+        hedge_delay = self.hedge_delay() if self.hedge else None
+        if hedge_delay is None or (timeout is not None and hedge_delay >= timeout) or \
+                self.stats['hedges'] >= self.hedge_budget * self.stats['calls']:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+            self._record_latency(time.monotonic() - attempt_started)
+            return result
+
+        tasks = [asyncio.ensure_future(func(*args, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self.stats['hedges'] += 1
+                tasks.append(asyncio.ensure_future(func(*args, **kwargs)))
+            pending, error = set(tasks), None
+            while pending:
+                left = None if timeout is None else timeout - (time.monotonic() - attempt_started)
+                if left is not None and left <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.stats['hedge_wins'] += 1
+                        self._record_latency(time.monotonic() - attempt_started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def run_sync(self, func: Callable, *args, **kwargs) -> Any:
+        """Call a blocking func under this policy (retries only, no hedging)."""
+        self.stats['calls'] += 1
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats['attempts'] += 1
+            attempt_started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                self._record_latency(time.monotonic() - attempt_started)
+                return result
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    self._give_up(e, attempt)
+                    raise
+                self.stats['retries'] += 1
+                logger.debug(f"🔁 {self.name}: attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    def get_stats(self) -> Dict:
+        hedge_delay = self.hedge_delay()
+        return {**self.stats, 'hedge_delay_seconds': round(hedge_delay, 3) if hedge_delay is not None else None}
+
+# Policy per kind of call. Reads are hedged; posting to X is never repeated blindly, the
+# queue re-posts from the thread's checkpoint after x_post's backoff instead.
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    'coinmarketcap': RetryPolicy('coinmarketcap', max_attempts=2, base_delay=1.0, deadline=20.0),
+    'coingecko': RetryPolicy('coingecko', max_attempts=3, base_delay=1.0, deadline=20.0, hedge=True),
+    'reddit': RetryPolicy('reddit', max_attempts=2, base_delay=1.0, deadline=15.0, hedge=True),
+    # 403 quotaExceeded is final for the day; only server errors are worth another try
+    'youtube': RetryPolicy('youtube', max_attempts=2, base_delay=1.0, deadline=20.0,
+                           retryable_statuses=frozenset({500, 502, 503, 504})),
+    # 429s on lookups are left to the verifier, which waits for the reported reset
+    'x_lookup': RetryPolicy('x_lookup', max_attempts=3, base_delay=1.0,
+                            retryable_statuses=frozenset({500, 502, 503, 504})),
+    'x_post': RetryPolicy('x_post', max_attempts=4, base_delay=5.0, max_delay=120.0, jitter="equal",
+                          retryable_statuses=frozenset({500, 502, 503, 504})),
+    # Cooldown after a 429 that came without a reset time, growing with consecutive 429s
+    'x_rate_limit': RetryPolicy('x_rate_limit', max_attempts=8, base_delay=120.0, max_delay=7200.0, jitter="equal"),
+}
+
+def get_policy(name: str) -> RetryPolicy:
+    return RETRY_POLICIES[name]
+
+async def with_retries(name: str, func: Callable, *args, **kwargs) -> Any:
+    """Await func(*args, **kwargs) under the named policy, e.g. with_retries('coingecko', fetch, url)."""
+    return await RETRY_POLICIES[name].run(func, *args, **kwargs)
+
+def get_retry_stats() -> Dict[str, Dict]:
+    return {name: policy.get_stats() for name, policy in RETRY_POLICIES.items() if policy.stats['calls']}
@@ -4,6 +4,8 @@ from typing import Dict
 import json
 import os
 from datetime import datetime, timedelta
+from modules.circuit_breaker import CircuitOpenError, get_breaker
+from modules.retry_policy import with_retries
 
 logger = logging.getLogger('CryptoBot')
 
@@ -38,6 +40,16 @@ def save_social_metrics_cache(cache_data: Dict[str, Dict]):
     except Exception as e:
         logger.error(f"Error saving social metrics cache: {e}")
 
+async def _fetch_reddit_search(session: aiohttp.ClientSession, url: str):
+    """One Reddit search request: the JSON on a 200, None on other client errors."""
+    async with get_breaker('reddit').protect():
+        async with session.get(url, headers={'User-Agent': 'CryptoBot/1.0'}, timeout=10) as response:
+            if response.status == 429 or response.status >= 500:
+                response.raise_for_status()  # Retried, and counts against Reddit's circuit
+            if response.status == 200:
+                return await response.json()
+            return None
+
 async def fetch_social_metrics(coin_id: str, session: aiohttp.ClientSession, skip_x_api: bool = True, price_change_24h: float = 0.0) -> Dict:
     """Fetch social metrics for a coin (free tier compliant)."""
     try:
@@ -56,18 +68,19 @@ async def fetch_social_metrics(coin_id: str, session: aiohttp.ClientSession, ski
         # Try Reddit (free API)
         try:
             reddit_url = f"https://www.reddit.com/r/cryptocurrency/search.json?q={symbol}&sort=new&limit=5"
-            async with session.get(reddit_url, headers={'User-Agent': 'CryptoBot/1.0'}, timeout=10) as response:
-                if response.status == 200:
-                    reddit_data = await response.json()
-                    reddit_posts = reddit_data.get('data', {}).get('children', [])
-                    total_mentions += len(reddit_posts)
-
-                    # Adjust sentiment based on Reddit activity
-                    if len(reddit_posts) > 3:
-                        if sentiment == "Neutral":
-                            sentiment = "Positive"
-                        elif sentiment == "Bearish":
-                            sentiment = "Neutral"
+            reddit_data = await with_retries('reddit', _fetch_reddit_search, session, reddit_url)
+            if reddit_data is not None:
+                reddit_posts = reddit_data.get('data', {}).get('children', [])
+                total_mentions += len(reddit_posts)
+
+                # Adjust sentiment based on Reddit activity
+                if len(reddit_posts) > 3:
+                    if sentiment == "Neutral":
+                        sentiment = "Positive"
+                    elif sentiment == "Bearish":
+                        sentiment = "Neutral"
+        except CircuitOpenError as e:
+            logger.debug(f"Skipping Reddit mentions for {coin_id}: {e}")
         except Exception as e:
             logger.error(f"Reddit API error for {coin_id}: {e}")
 
@@ -0,0 +1,112 @@
+"""
+Import-time profiling for cold-start measurements.
+
+Records how long every module takes to import, like python -X importtime,
+and aggregates the result per top-level package. Profile any entry point
+with: python -m modules.startup_profiler bot_v2
+"""
+
+import sys
+import time
+import logging
+import threading
+import importlib
+import importlib._bootstrap
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+class ImportProfiler:
+    """Times every module loaded while it is running.
+
+    Hooks importlib's _find_and_load, the same point -X importtime measures,
+    so each module is timed once, when it is first loaded, whether it came
+    from an import statement or importlib.import_module(). Self time
+    excludes the modules it imported in turn; cumulative time includes them.
+    """
+
+    def __init__(self):
+        self.modules: Dict[str, Dict[str, float]] = {}  # module -> {'self', 'cumulative'}
+        self._roots: List[str] = []  # modules imported directly rather than by another module
+        self._stacks = threading.local()
+        self._original = None
+        self._started = None
+        self.elapsed = 0.0
+
+    def start(self) -> 'ImportProfiler':
+        if self._original is None:
+            self._original = importlib._bootstrap._find_and_load
+            importlib._bootstrap._find_and_load = self._find_and_load
+            self._started = time.perf_counter()
+        return self
+
+    def stop(self) -> 'ImportProfiler':
+        if self._original is not None:
+            importlib._bootstrap._find_and_load = self._original
+            self._original = None
+            self.elapsed += time.perf_counter() - self._started
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _find_and_load(self, name, import_):
+        stack = getattr(self._stacks, 'stack', None)
+        if stack is None:
+            stack = self._stacks.stack = []
+        stack.append(0.0)  # Time spent in nested imports
+        started = time.perf_counter()
+        try:
+            return self._original(name, import_)
+        finally:
+            cumulative = time.perf_counter() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            else:
+                self._roots.append(name)
+            self.modules[name] = {'self': cumulative - nested, 'cumulative': cumulative}
+
+    def by_package(self) -> Dict[str, Dict[str, float]]:
+        """Self time, module count and share of the total for each top-level package."""
+        packages = defaultdict(lambda: {'self': 0.0, 'modules': 0})
+        for name, timing in self.modules.items():
+            package = packages[name.partition('.')[0]]
+            package['self'] += timing['self']
+            package['modules'] += 1
+        total = sum(package['self'] for package in packages.values()) or 1.0
+        for package in packages.values():
+            package['share'] = package['self'] / total
+        return dict(sorted(packages.items(), key=lambda item: item[1]['self'], reverse=True))
+
+    def total_import_seconds(self) -> float:
+        return sum(self.modules[name]['cumulative'] for name in self._roots if name in self.modules)
+
+    def report(self, top: Optional[int] = 15) -> str:
+        packages = list(self.by_package().items())
+        lines = [f"Startup imports: {len(self.modules)} modules in {self.total_import_seconds() * 1000:.0f}ms",
+                 f"  {'package':<28}{'self ms':>10}{'modules':>9}{'share':>8}"]
+        for name, package in packages[:top]:
+            lines.append(f"  {name:<28}{package['self'] * 1000:>10.1f}{package['modules']:>9}{package['share']:>8.1%}")
+        if top is not None and len(packages) > top:
+            rest = packages[top:]
+            lines.append(f"  {'(' + str(len(rest)) + ' more)':<28}{sum(p['self'] for _, p in rest) * 1000:>10.1f}"
+                         f"{sum(p['modules'] for _, p in rest):>9}{sum(p['share'] for _, p in rest):>8.1%}")
+        return "\n".join(lines)
+
+def profile_import(module: str, top: Optional[int] = 15) -> ImportProfiler:
+    """Import a module under the profiler and print the aggregated report."""
+    with ImportProfiler() as profiler:
+        importlib.import_module(module)
+    print(profiler.report(top))
+    return profiler
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m modules.startup_profiler <module> [top]")
+        sys.exit(1)
+    profile_import(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 15)
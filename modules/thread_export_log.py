@@ -0,0 +1,230 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+EXPORT_LOG_DIR = os.path.join("data", "thread_exports")
+EXPORT_INDEX_DB_FILE = "crypto_bot.db"
+
+class ThreadExportLog:
+    """Append-only NDJSON log of posted threads, one JSON record per line.
+
+    Records go to <directory>/x_threads.ndjson. The active file is rotated to
+    x_threads.<timestamp>.ndjson (gzipped if compress is set) once it would
+    exceed max_bytes or its first record is older than max_age. Every tweet ID
+    of a thread is indexed to (file, offset) in x_export_index, so any past
+    thread can be read back with a single seek. submit() only buffers the
+    record; a background task does the file and index writes.
+    """
+
+    def __init__(self, directory: str = EXPORT_LOG_DIR, base_name: str = "x_threads",
+                 max_bytes: int = 5 * 1024 * 1024, max_age: timedelta = timedelta(days=1),
+                 compress: bool = True, index_db_file: str = EXPORT_INDEX_DB_FILE):
+        self.directory = directory
+        self.base_name = base_name
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.index_db_file = index_db_file
+        self._lock = threading.Lock()
+        self._conn = None
+        self._active_started_at: Optional[datetime] = None
+        self._pending = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {'written': 0, 'rotations': 0, 'write_errors': 0}
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.directory, f"{self.base_name}.ndjson")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background writer on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="thread-export-log")
+
+    async def stop(self):
+        """Write any buffered records, then stop the writer."""
+        if self.running:
+            # Let the writer finish its current batch rather than cancelling it mid-write
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._pending:
+            await asyncio.to_thread(self._write_pending)
+
+    def submit(self, record: Dict, tweet_ids: List[str]):
+        """Buffer a thread record, indexed under each of its tweet IDs."""
+        self._pending.append((record, tweet_ids))
+        if not self.running:
+            try:
+                self.start()
+            except RuntimeError:
+                self._write_pending()  # No event loop, write synchronously
+                return
+        self._wakeup.set()
+
+    async def _run(self):
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.to_thread(self._write_pending)
+
+    def _write_pending(self):
+        with self._lock:
+            while self._pending:
+                record, tweet_ids = self._pending.popleft()
+                try:
+                    self._append_locked(record, tweet_ids)
+                except Exception as e:
+                    self.stats['write_errors'] += 1
+                    logger.error(f"Failed to write thread export: {e}")
+
+    def append(self, record: Dict, tweet_ids: List[str]):
+        """Write one record synchronously and index it."""
+        with self._lock:
+            self._append_locked(record, tweet_ids)
+
+    def _append_locked(self, record: Dict, tweet_ids: List[str]):
+        os.makedirs(self.directory, exist_ok=True)
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+        self._rotate_if_needed(len(line))
+
+        with open(self.active_path, 'ab') as f:
+            offset = f.tell()
+            f.write(line)
+        if self._active_started_at is None:
+            self._active_started_at = datetime.now()
+
+        conn = self._index()
+        conn.executemany(
+            "INSERT OR REPLACE INTO x_export_index (tweet_id, file, offset) VALUES (?, ?, ?)",
+            [(str(tweet_id), os.path.basename(self.active_path), offset) for tweet_id in tweet_ids]
+        )
+        conn.commit()
+        self.stats['written'] += 1
+
+    def _rotate_if_needed(self, incoming: int):
+        if not os.path.exists(self.active_path):
+            self._active_started_at = None
+            return
+        size = os.path.getsize(self.active_path)
+        if size == 0:
+            return
+        if self._active_started_at is None:
+            self._active_started_at = self._first_record_time(self.active_path) or datetime.now()
+        too_big = size + incoming > self.max_bytes
+        too_old = datetime.now() - self._active_started_at > self.max_age
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        """Move the active file aside (compressing it if enabled) and repoint its index entries."""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        rotated = os.path.join(self.directory, f"{self.base_name}.{stamp}.ndjson")
+        os.replace(self.active_path, rotated)
+        if self.compress:
+            # Offsets stay valid: they index the uncompressed stream
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.remove(rotated)
+            rotated += '.gz'
+
+        conn = self._index()
+        conn.execute("UPDATE x_export_index SET file = ? WHERE file = ?",
+                     (os.path.basename(rotated), os.path.basename(self.active_path)))
+        conn.commit()
+        self._active_started_at = None
+        self.stats['rotations'] += 1
+        logger.info(f"Rotated thread export log to {rotated}")
+
+    @staticmethod
+    def _first_record_time(path: str) -> Optional[datetime]:
+        try:
+            with open(path, 'rb') as f:
+                return datetime.fromisoformat(json.loads(f.readline())['posted_at'])
+        except Exception:
+            return None
+
+    def _index(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.index_db_file, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS x_export_index (
+                    tweet_id TEXT PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    offset INTEGER NOT NULL
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _open(path: str):
+        return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+    def lookup(self, tweet_id: str) -> Optional[Dict]:
+        """Return the exported thread containing tweet_id, or None."""
+        with self._lock:
+            row = self._index().execute(
+                "SELECT file, offset FROM x_export_index WHERE tweet_id = ?", (str(tweet_id),)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            with self._open(os.path.join(self.directory, row[0])) as f:
+                f.seek(row[1])
+                return json.loads(f.readline())
+        except Exception as e:
+            logger.error(f"Failed to read exported thread for tweet {tweet_id}: {e}")
+            return None
+
+    def log_files(self) -> List[str]:
+        """All log files, oldest first, with the active file last."""
+        if not os.path.isdir(self.directory):
+            return []
+        rotated = sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                         if name.startswith(f"{self.base_name}.") and name != os.path.basename(self.active_path))
+        return rotated + ([self.active_path] if os.path.exists(self.active_path) else [])
+
+    def iter_records(self, since: Optional[str] = None) -> Iterator[Dict]:
+        """Yield exported threads oldest first, optionally only those posted after `since` (ISO time)."""
+        for path in self.log_files():
+            try:
+                with self._open(path) as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Partial line from an interrupted write
+                        if since is None or record.get('posted_at', '') > since:
+                            yield record
+            except Exception as e:
+                logger.error(f"Failed to read thread export log {path}: {e}")
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'buffered': len(self._pending)}
+
+# Global export log instance
+thread_export_log = ThreadExportLog()
@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+import aiohttp
+
+logger = logging.getLogger('CryptoBot')
+
+# A source takes the coins to search for and a shared session, and returns candidate videos per
+# coin in the video_data format ContentVerifier.verify_video_content expects
+VideoSource = Callable[[List[str], aiohttp.ClientSession], Awaitable[Dict[str, List[Dict]]]]
+
+async def youtube_source(coins: List[str], session: aiohttp.ClientSession) -> Dict[str, List[Dict]]:
+    from modules.youtube_videos import get_youtube_fetcher
+    return await get_youtube_fetcher().fetch_candidates(coins, session=session)
+
+class VideoDiscovery:
+    """Picks a video per coin from every enabled platform at once.
+
+    All enabled sources are queried concurrently. Each source's candidates
+    are ranked in one batch with ContentVerifier.rank_videos as soon as
+    that source answers, and a coin is settled by the first source whose
+    best candidate is verified with a score of at least min_score; once
+    every coin is settled the sources still running are cancelled. A coin's
+    selection therefore takes as long as the fastest source with a good
+    video, not the sum of all of them. If no candidate clears min_score
+    before the sources finish (or timeout passes), the best verified
+    candidate seen is used, if any.
+    """
+
+    def __init__(self, platforms: Optional[List[str]] = None, min_score: float = 50.0, timeout: float = 30.0,
+                 verifier=None):
+        self.sources: Dict[str, VideoSource] = {'youtube': youtube_source}
+        self.platforms = platforms or ['youtube']
+        self.min_score = min_score
+        self.timeout = timeout
+        self._verifier = verifier
+        self.stats = {'runs': 0, 'scored': 0, 'source_errors': 0, 'cancelled_sources': 0,
+                      'wins': {}, 'last_run_seconds': None}
+
+    @property
+    def verifier(self):
+        if self._verifier is None:
+            from modules.content_verification import content_verifier
+            self._verifier = content_verifier
+        return self._verifier
+
+    def register_source(self, platform: str, source: VideoSource, enable: bool = True):
+        """Add (or replace) the source for a platform, e.g. register_source('rumble', rumble_search)."""
+        self.sources[platform] = source
+        if enable and platform not in self.platforms:
+            self.platforms.append(platform)
+
+    def enabled_sources(self) -> Dict[str, VideoSource]:
+        missing = [platform for platform in self.platforms if platform not in self.sources]
+        if missing:
+            logger.debug(f"No video source registered for: {', '.join(missing)}")
+        return {platform: self.sources[platform] for platform in self.platforms if platform in self.sources}
+
+    async def _query(self, platform: str, source: VideoSource, coins: List[str],
+                     session: aiohttp.ClientSession) -> Dict[str, List[Dict]]:
+        started = time.monotonic()
+        results = await source(coins, session)
+        logger.debug(f"📺 {platform} answered in {time.monotonic() - started:.2f}s")
+        return results
+
+    async def discover(self, coins: List[str], session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Optional[Dict]]:
+        """The selected video for each coin (None if no source had a verified one).
+
+        Selected videos are the source's candidate dict plus the fields
+        rank_videos adds (verification_score, score_breakdown, ...) and
+        source_latency (seconds until its source answered).
+        """
+        self.stats['runs'] += 1
+        started = time.monotonic()
+        selected: Dict[str, Optional[Dict]] = {coin: None for coin in coins}
+        settled = set()
+        sources = self.enabled_sources()
+        if not coins or not sources:
+            return selected
+
+        own_session = session is None
+        session = session or aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        tasks = {asyncio.ensure_future(self._query(platform, source, coins, session)): platform
+                 for platform, source in sources.items()}
+        pending = set(tasks)
+        try:
+            while pending and len(settled) < len(coins):
+                left = self.timeout - (time.monotonic() - started)
+                if left <= 0:
+                    logger.warning(f"📺 Video discovery timed out waiting for {', '.join(tasks[t] for t in pending)}")
+                    break
+                done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    platform = tasks[task]
+                    if task.exception() is not None:
+                        self.stats['source_errors'] += 1
+                        logger.error(f"📺 {platform} video search failed: {task.exception()}")
+                        continue
+                    latency = time.monotonic() - started
+                    for coin, candidates in task.result().items():
+                        if coin in selected and coin not in settled:
+                            await self._score(coin, candidates, latency, selected, settled)
+        finally:
+            for task in pending:
+                task.cancel()
+            self.stats['cancelled_sources'] += len(pending)
+            if own_session:
+                await session.close()
+
+        for video in selected.values():
+            if video:
+                self.stats['wins'][video['platform']] = self.stats['wins'].get(video['platform'], 0) + 1
+        self.stats['last_run_seconds'] = round(time.monotonic() - started, 3)
+        return selected
+
+    async def _score(self, coin: str, candidates: List[Dict], latency: float,
+               selected: Dict[str, Optional[Dict]], settled: set):
+        """Rank a source's candidates in one batch, keep the best; settle the coin if it is good enough.
+
+        Ranking writes the verification cache file, so it runs in a worker thread.
+        """
+        if not candidates:
+            return
+        self.stats['scored'] += len(candidates)
+        ranked = await asyncio.to_thread(self.verifier.rank_videos, candidates, coin, top_k=1)
+        if not ranked or not ranked[0]['verified']:
+            return
+        best, score = selected[coin], ranked[0]['verification_score']
+        if best is None or score > best['verification_score']:
+            selected[coin] = {**ranked[0], 'source_latency': round(latency, 3)}
+        if score >= self.min_score:
+            settled.add(coin)
+
+    async def find_video(self, coin: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[Dict]:
+        """The selected video for one coin, or None."""
+        return (await self.discover([coin], session))[coin]
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'platforms': list(self.enabled_sources())}
+
+_video_discovery = None
+
+def get_video_discovery() -> VideoDiscovery:
+    """Get the shared discovery stage; VIDEO_PLATFORMS (comma separated, default youtube) picks the platforms."""
+    global _video_discovery
+    if _video_discovery is None:
+        platforms = [p.strip().lower() for p in os.getenv("VIDEO_PLATFORMS", "youtube").split(',') if p.strip()]
+        _video_discovery = VideoDiscovery(platforms=platforms)
+    return _video_discovery
@@ -0,0 +1,179 @@
+import os
+import re
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+from modules.rate_limit_manager import rate_manager
+
+logger = logging.getLogger('CryptoBot')
+
+CREDENTIAL_FIELDS = ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET')
+_CREDENTIAL_PATTERN = re.compile(r'^X(\d*)_(CONSUMER_KEY|CONSUMER_SECRET|ACCESS_TOKEN|ACCESS_TOKEN_SECRET|BEARER_TOKEN)$')
+
+class XAccount:
+    """One set of X credentials: account 1 uses X_*, account n uses X{n}_*."""
+
+    def __init__(self, number: int, prefix: str, credentials: Dict[str, str]):
+        self.number = number
+        self.prefix = prefix
+        self.consumer_key = credentials.get('CONSUMER_KEY')
+        self.consumer_secret = credentials.get('CONSUMER_SECRET')
+        self.access_token = credentials.get('ACCESS_TOKEN')
+        self.access_token_secret = credentials.get('ACCESS_TOKEN_SECRET')
+        self.bearer_token = credentials.get('BEARER_TOKEN')
+
+    @property
+    def label(self) -> str:
+        if self.number == 1:
+            return "Primary (Verified)"
+        if self.number == 2:
+            return "Secondary (Failover)"
+        return f"Account #{self.number}"
+
+    @property
+    def missing_credentials(self) -> List[str]:
+        return [f"{self.prefix}_{field}" for field in CREDENTIAL_FIELDS
+                if not getattr(self, field.lower())]
+
+    @property
+    def fingerprint(self) -> tuple:
+        """Changes whenever any of the account's credentials change."""
+        return (self.consumer_key, self.consumer_secret, self.access_token,
+                self.access_token_secret, self.bearer_token)
+
+def discover_x_accounts(environ=None) -> Dict[int, XAccount]:
+    """Find every X{n}_* credential set in the environment (X_* is account 1).
+
+    X1_* is accepted for account 1 when X_* is not set. Returns every
+    account with at least one credential, complete or not.
+    """
+    environ = os.environ if environ is None else environ
+    found = defaultdict(dict)  # prefix -> {field: value}
+    for key, value in environ.items():
+        match = _CREDENTIAL_PATTERN.match(key)
+        if match and value:
+            found[f"X{match.group(1)}"][match.group(2)] = value
+
+    accounts = {}
+    for prefix, credentials in found.items():
+        number = int(prefix[1:] or 1)
+        if number < 1 or (prefix == 'X1' and 'X' in found):
+            continue
+        accounts[number] = XAccount(number, prefix, credentials)
+    return dict(sorted(accounts.items()))
+
+class XAccountRegistry:
+    """Every configured X posting account, with a health score for each.
+
+    Accounts are discovered from the environment on first use, so adding an
+    X3_* (X4_*, ...) credential set adds a posting account and its worker.
+    Every create_tweet result feeds an exponentially weighted error rate;
+    health is 1 minus that rate (never below min_health, so a recovering
+    account is still tried). select() picks the account with the highest
+    remaining capacity x health, breaking ties by the least recently used,
+    so load spreads evenly over healthy accounts. Accounts whose credentials
+    are rejected are disabled until discover() finds new credentials for them.
+    """
+
+    def __init__(self, error_decay: float = 0.2, min_health: float = 0.05):
+        self.error_decay = error_decay
+        self.min_health = min_health
+        self._accounts: Optional[Dict[int, XAccount]] = None
+        self._error_rates: Dict[int, float] = defaultdict(float)
+        self._disabled: Dict[int, str] = {}  # account -> reason
+        self._lock = threading.Lock()
+
+    def discover(self) -> Dict[int, XAccount]:
+        """(Re)read credentials from the environment.
+
+        Disabled accounts are re-enabled only if their credentials changed,
+        so rotating one account's secrets doesn't bring back others that
+        failed authentication.
+        """
+        accounts = discover_x_accounts()
+        for account in accounts.values():
+            if account.missing_credentials:
+                logger.error(f"Missing X API credentials for account {account.number}: "
+                             f"{', '.join(account.missing_credentials)}")
+        with self._lock:
+            previous = self._accounts or {}
+            self._disabled = {number: reason for number, reason in self._disabled.items()
+                              if number in accounts and number in previous
+                              and accounts[number].fingerprint == previous[number].fingerprint}
+            self._accounts = accounts
+        complete = [number for number, account in accounts.items() if not account.missing_credentials]
+        logger.info(f"Discovered {len(complete)} X posting account(s): {complete}")
+        return accounts
+
+    @property
+    def accounts(self) -> Dict[int, XAccount]:
+        if self._accounts is None:
+            self.discover()
+        return self._accounts
+
+    def get(self, account_num: int) -> Optional[XAccount]:
+        return self.accounts.get(account_num)
+
+    def numbers(self) -> List[int]:
+        """Accounts with complete credentials that are not disabled."""
+        return [number for number, account in self.accounts.items()
+                if not account.missing_credentials and number not in self._disabled]
+
+    def disable(self, account_num: int, reason: str):
+        """Stop selecting an account, e.g. after its credentials were rejected."""
+        with self._lock:
+            self._disabled[account_num] = reason
+        logger.warning(f"X account #{account_num} disabled: {reason}")
+
+    def is_disabled(self, account_num: int) -> bool:
+        return account_num in self._disabled
+
+    def record_result(self, account_num: int, ok: bool):
+        """Feed one API call's outcome into the account's error rate."""
+        with self._lock:
+            rate = self._error_rates[account_num]
+            self._error_rates[account_num] = rate + self.error_decay * ((0.0 if ok else 1.0) - rate)
+
+    def health(self, account_num: int) -> float:
+        """0 for a disabled account, otherwise 1 minus the recent error rate."""
+        if account_num in self._disabled:
+            return 0.0
+        return max(self.min_health, 1.0 - self._error_rates[account_num])
+
+    def score(self, account_num: int) -> float:
+        return rate_manager.remaining_capacity(account_num) * self.health(account_num)
+
+    def select(self, candidates: Optional[List[int]] = None) -> Optional[int]:
+        """Best account to post with next among candidates (default: all), or None if none can post."""
+        candidates = self.numbers() if candidates is None else [
+            account_num for account_num in candidates if account_num not in self._disabled
+        ]
+        scored = [(self.score(account_num), account_num) for account_num in candidates]
+        scored = [(score, account_num) for score, account_num in scored if score > 0]
+        if not scored:
+            return None
+        best = max(score for score, _ in scored)
+        tied = [account_num for score, account_num in scored if score == best]
+        return min(tied, key=self._last_used)
+
+    @staticmethod
+    def _last_used(account_num: int) -> float:
+        last_post = rate_manager.account_limits[account_num]['last_post']
+        return last_post.timestamp() if last_post else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            account_num: {
+                'label': account.label,
+                'complete': not account.missing_credentials,
+                'disabled': self._disabled.get(account_num),
+                'health': round(self.health(account_num), 3),
+                'error_rate': round(self._error_rates[account_num], 3),
+                'remaining_capacity': rate_manager.remaining_capacity(account_num)
+            }
+            for account_num, account in self.accounts.items()
+        }
+
+# Global account registry
+x_accounts = XAccountRegistry()
@@ -0,0 +1,272 @@
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+JOB_STORE_DB_FILE = "crypto_bot.db"
+
+class XJobStore:
+    """Durable store for queued X threads with per-reply checkpoints.
+
+    Every thread is a row in x_queue_threads and every tweet in it (position 0
+    is the main tweet) a row in x_queue_posts. Marking a post as posted commits
+    its tweet ID together with the thread's last_tweet_id checkpoint, so after a
+    crash the worker resumes at the next unposted reply instead of re-posting.
+    Non-critical status updates are buffered and written in the next commit.
+    """
+
+    def __init__(self, db_file: str = JOB_STORE_DB_FILE):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._pending_writes = []
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.init_store()
+
+    def init_store(self):
+        """Create job tables and switch the database to WAL mode."""
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                # WAL lets readers (diagnostics, status checks) run while the
+                # worker writes, and NORMAL sync makes each commit cheap
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS x_queue_threads (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        account_num INTEGER,
+                        main_tweet_id TEXT,
+                        last_tweet_id TEXT,
+                        error TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
+                self._ensure_column(cursor, 'x_queue_threads', 'priority', 'INTEGER DEFAULT 0')
+                self._ensure_column(cursor, 'x_queue_threads', 'deadline', 'TIMESTAMP')
+
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_x_queue_threads_status ON x_queue_threads(status, id)
+                ''')
+
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS x_queue_posts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        thread_id INTEGER NOT NULL REFERENCES x_queue_threads(id),
+                        position INTEGER NOT NULL,
+                        text TEXT NOT NULL,
+                        coin_name TEXT,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        tweet_id TEXT,
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        posted_at TIMESTAMP,
+                        UNIQUE(thread_id, position)
+                    )
+                ''')
+
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Error initializing X job store: {e}")
+            raise
+
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, definition: str):
+        """Add a column to a table created by an older version of the store."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def enqueue_thread(self, main_post: str, posts: List[Dict], priority: int = 0,
+                       deadline: Optional[datetime] = None) -> int:
+        """Persist a new thread and all its posts in one transaction."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "INSERT INTO x_queue_threads (status, priority, deadline) VALUES ('pending', ?, ?)",
+                (priority, deadline.isoformat() if deadline else None)
+            )
+            thread_id = cursor.lastrowid
+            self._insert_posts(cursor, thread_id, main_post, posts)
+            self._flush_locked()
+            return thread_id
+
+    @staticmethod
+    def _insert_posts(cursor, thread_id: int, main_post: str, posts: List[Dict]):
+        rows = [(thread_id, 0, main_post, None)]
+        rows += [(thread_id, i + 1, post.get('text', ''), post.get('coin_name', 'Unknown'))
+                 for i, post in enumerate(posts)]
+        cursor.executemany(
+            "INSERT INTO x_queue_posts (thread_id, position, text, coin_name) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
+    def replace_content(self, thread_id: int, main_post: str, posts: List[Dict],
+                        deadline: Optional[datetime] = None):
+        """Swap in re-rendered content for a thread that has not started posting."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("DELETE FROM x_queue_posts WHERE thread_id = ? AND status != 'posted'", (thread_id,))
+            self._insert_posts(cursor, thread_id, main_post, posts)
+            cursor.execute(
+                "UPDATE x_queue_threads SET deadline = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (deadline.isoformat() if deadline else None, thread_id)
+            )
+            self._flush_locked()
+
+    def load_unfinished(self) -> List[Dict]:
+        """Load every pending or interrupted thread, highest priority first."""
+        with self._lock:
+            self._flush_locked()
+            cursor = self._conn.cursor()
+            cursor.execute('''
+                SELECT id, last_tweet_id, created_at, priority, deadline FROM x_queue_threads
+                WHERE status IN ('pending', 'in_progress') ORDER BY priority DESC, id
+            ''')
+            threads = cursor.fetchall()
+
+            jobs = []
+            for thread_id, last_tweet_id, created_at, priority, deadline in threads:
+                cursor.execute('''
+                    SELECT position, text, coin_name, status, tweet_id FROM x_queue_posts
+                    WHERE thread_id = ? ORDER BY position
+                ''', (thread_id,))
+                rows = cursor.fetchall()
+                if not rows:
+                    continue
+                job = self._job_from_rows(thread_id, last_tweet_id, created_at, rows)
+                job['priority'] = priority or 0
+                job['deadline'] = datetime.fromisoformat(deadline) if deadline else None
+                jobs.append(job)
+            return jobs
+
+    def _job_from_rows(self, thread_id: int, last_tweet_id: Optional[str], created_at: str, rows: List) -> Dict:
+        """Rebuild queue thread_data from stored post rows."""
+        main_row = rows[0]
+        posted = {position: tweet_id for position, _, _, status, tweet_id in rows if status == 'posted'}
+        return {
+            'job_id': thread_id,
+            'main_post': main_row[1],
+            'posts': [{'text': text, 'coin_name': coin_name} for _, text, coin_name, _, _ in rows[1:]],
+            # CURRENT_TIMESTAMP is UTC; queue timestamps are local
+            'timestamp': (datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+                          if created_at else datetime.now()),
+            'main_tweet_id': posted.get(0),
+            'tweet_ids': posted,
+            'last_tweet_id': last_tweet_id,
+            'next_position': next((row[0] for row in rows if row[3] != 'posted'), len(rows))
+        }
+
+    def mark_in_progress(self, thread_id: int, account_num: int):
+        """Record which account picked the thread up (buffered)."""
+        self._buffer(
+            "UPDATE x_queue_threads SET status = 'in_progress', account_num = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (account_num, thread_id)
+        )
+
+    def record_attempt_failure(self, thread_id: int, position: int, error: str):
+        """Count a failed attempt at one post (buffered)."""
+        self._buffer(
+            "UPDATE x_queue_posts SET attempts = attempts + 1, last_error = ? WHERE thread_id = ? AND position = ?",
+            (error[:500], thread_id, position)
+        )
+
+    def mark_posted(self, thread_id: int, position: int, tweet_id: str, text: Optional[str] = None):
+        """Checkpoint a posted tweet, and the text it was posted with if given.
+
+        Commits immediately with any buffered writes.
+        """
+        with self._lock:
+            self._pending_writes.append((
+                "UPDATE x_queue_posts SET status = 'posted', tweet_id = ?, text = COALESCE(?, text), "
+                "attempts = attempts + 1, posted_at = CURRENT_TIMESTAMP WHERE thread_id = ? AND position = ?",
+                (tweet_id, text, thread_id, position)
+            ))
+            if position == 0:
+                self._pending_writes.append((
+                    "UPDATE x_queue_threads SET main_tweet_id = ? WHERE id = ?",
+                    (tweet_id, thread_id)
+                ))
+            self._pending_writes.append((
+                "UPDATE x_queue_threads SET last_tweet_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (tweet_id, thread_id)
+            ))
+            self._flush_locked()
+
+    def mark_completed(self, thread_id: int):
+        """Mark a thread as fully posted."""
+        self._finish(thread_id, 'completed', None)
+
+    def mark_failed(self, thread_id: int, error: str):
+        """Mark a thread as permanently failed so it is not resumed."""
+        self._finish(thread_id, 'failed', error)
+
+    def mark_expired(self, thread_id: int, reason: str):
+        """Mark a thread dropped because it passed its deadline."""
+        self._finish(thread_id, 'expired', reason)
+
+    def mark_superseded(self, thread_id: int, reason: str):
+        """Mark a thread replaced by newer content for the same coins before it was posted."""
+        self._finish(thread_id, 'superseded', reason)
+
+    def mark_dropped(self, thread_id: int, reason: str):
+        """Mark a thread dropped to make room in a full queue."""
+        self._finish(thread_id, 'dropped', reason)
+
+    def _finish(self, thread_id: int, status: str, error: Optional[str]):
+        with self._lock:
+            self._pending_writes.append((
+                "UPDATE x_queue_threads SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (status, error[:500] if error else None, thread_id)
+            ))
+            self._flush_locked()
+
+    def pending_count(self) -> int:
+        """Number of threads not yet completed or failed."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM x_queue_threads WHERE status IN ('pending', 'in_progress')")
+            return cursor.fetchone()[0]
+
+    def _buffer(self, sql: str, params: tuple):
+        with self._lock:
+            self._pending_writes.append((sql, params))
+
+    def flush(self):
+        """Write any buffered status updates."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        try:
+            cursor = self._conn.cursor()
+            for sql, params in self._pending_writes:
+                cursor.execute(sql, params)
+            self._conn.commit()
+            self._pending_writes.clear()
+        except Exception as e:
+            self._conn.rollback()
+            logger.error(f"Error writing X job store updates: {e}")
+            raise
+
+    def close(self):
+        """Flush buffered writes and close the connection."""
+        with self._lock:
+            if self._pending_writes:
+                self._flush_locked()
+            self._conn.close()
+
+_job_store = None
+
+def get_job_store() -> XJobStore:
+    """Get the shared job store, opening it on first use."""
+    global _job_store
+    if _job_store is None:
+        _job_store = XJobStore()
+    return _job_store
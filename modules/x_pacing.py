@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+from modules.rate_limit_manager import rate_manager
+
+logger = logging.getLogger('CryptoBot')
+
+class ReplyPacer:
+    """Spaces thread replies according to each account's real posting budget.
+
+    For every known limit (the local limits counted from the post log and
+    the windows X reports in x-rate-limit-* / x-user-limit-24hour-* headers)
+    the pacer compares the tweets left in the thread with the remaining
+    budget. While the thread fits, replies go out min_gap apart. Once it needs
+    more than the budget, the spacing ramps smoothly towards spending the
+    remaining budget evenly until reset (reached when the thread needs twice
+    the budget), and an exhausted window waits for its reset.
+    """
+
+    def __init__(self, min_gap: float = 2.0, max_delay: float = 900.0):
+        self.min_gap = min_gap  # Floor between tweets so bursts don't look automated
+        self.max_delay = max_delay
+        self.history = deque(maxlen=500)  # (account, planned, actual, timestamp)
+
+    def plan_delay(self, account_num: int, posts_left: int) -> float:
+        """Seconds to wait before the next tweet when posts_left tweets remain in the thread."""
+        delay = 0.0
+        for remaining, seconds_to_reset in rate_manager.get_budget_windows(account_num):
+            if remaining <= 0:
+                window_delay = seconds_to_reset
+            else:
+                even_spacing = seconds_to_reset / remaining
+                overshoot = min(1.0, max(0.0, posts_left / remaining - 1.0))
+                window_delay = even_spacing * overshoot
+            delay = max(delay, window_delay)
+
+        # Never post sooner than min_gap after the account's previous tweet
+        last_post = rate_manager.account_limits[account_num]['last_post']
+        since_last = (datetime.now() - last_post).total_seconds() if last_post else self.min_gap
+        delay = max(delay, self.min_gap - since_last)
+
+        return min(max(delay, 0.0), self.max_delay)
+
+    async def pace(self, account_num: int, posts_left: int) -> float:
+        """Sleep for the planned delay and return it."""
+        planned = self.plan_delay(account_num, posts_left)
+        if planned > 0:
+            await asyncio.sleep(planned)
+        return planned
+
+    def record(self, account_num: int, planned: float, actual: float):
+        """Record planned versus actual spacing between two tweets for tuning."""
+        self.history.append((account_num, planned, actual, time.time()))
+        logger.debug(f"Pacing account {account_num}: planned {planned:.1f}s, actual {actual:.1f}s")
+
+    def get_stats(self, account_num: Optional[int] = None) -> Dict:
+        """Summarize recorded pacing, optionally for a single account."""
+        samples = [(planned, actual) for account, planned, actual, _ in self.history
+                   if account_num is None or account == account_num]
+        if not samples:
+            return {'samples': 0}
+        planned_total = sum(planned for planned, _ in samples)
+        actual_total = sum(actual for _, actual in samples)
+        return {
+            'samples': len(samples),
+            'avg_planned_seconds': round(planned_total / len(samples), 2),
+            'avg_actual_seconds': round(actual_total / len(samples), 2),
+            'avg_overhead_seconds': round((actual_total - planned_total) / len(samples), 2),
+            'max_actual_seconds': round(max(actual for _, actual in samples), 2)
+        }
+
+# Global pacer instance
+reply_pacer = ReplyPacer()
@@ -0,0 +1,139 @@
+import time
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('CryptoBot')
+
+# Windows for per-account post counts and throughput, in seconds
+METRIC_WINDOWS = {'15m': 15 * 60, '1h': 60 * 60, '24h': 24 * 60 * 60}
+
+def _percentiles(samples: List[float]) -> Dict:
+    """p50/p95/p99 (nearest rank) plus count and max of a list of seconds."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    def rank(p):
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p * len(ordered))) - 1))], 3)
+    return {
+        'count': len(ordered),
+        'p50': rank(0.50),
+        'p95': rank(0.95),
+        'p99': rank(0.99),
+        'max': round(ordered[-1], 3)
+    }
+
+class XQueueMetrics:
+    """Measurements of the X posting pipeline for get_x_queue_status().
+
+    Tracks every job's enqueue, start and finish time, the latency of each
+    create_tweet call, retries (failed post attempts and re-queues), failovers
+    between accounts and a log of posts per account. Samples are kept in
+    bounded deques so a long-running worker doesn't grow without limit.
+    """
+
+    def __init__(self, max_samples: int = 2000):
+        self.api_latencies = deque(maxlen=max_samples)  # (account, seconds, ok, timestamp)
+        self.job_timings = deque(maxlen=max_samples)    # (status, queued_seconds, run_seconds, total_seconds, timestamp)
+        self.post_log = deque(maxlen=10000)             # (account, timestamp)
+        self.open_jobs: Dict[int, float] = {}           # id(thread_data) -> enqueue timestamp
+        self.counters = Counter()
+
+    def job_enqueued(self, thread_data: Dict):
+        if 'enqueued_wall' not in thread_data:
+            timestamp = thread_data.get('timestamp')
+            thread_data['enqueued_wall'] = timestamp.timestamp() if isinstance(timestamp, datetime) else time.time()
+        self.open_jobs[id(thread_data)] = thread_data['enqueued_wall']
+
+    def job_started(self, thread_data: Dict):
+        thread_data.setdefault('started_wall', time.time())
+
+    def job_finished(self, thread_data: Dict, status: str):
+        """Record a job leaving the queue for good (completed, failed, expired, superseded or dropped)."""
+        if self.open_jobs.pop(id(thread_data), None) is None:
+            return
+        now = time.time()
+        enqueued = thread_data.get('enqueued_wall', now)
+        started = thread_data.get('started_wall')
+        self.job_timings.append((
+            status,
+            (started or now) - enqueued,
+            now - started if started else None,
+            now - enqueued,
+            now
+        ))
+        self.counters[f'jobs_{status}'] += 1
+
+    def api_call(self, account_num: int, seconds: float, ok: bool):
+        """Record the latency of one create_tweet call."""
+        now = time.time()
+        self.api_latencies.append((account_num, seconds, ok, now))
+        if ok:
+            self.post_log.append((account_num, now))
+        else:
+            self.counters['api_errors'] += 1
+
+    def retry(self, reason: str):
+        self.counters['retries'] += 1
+        self.counters[f'retries_{reason}'] += 1
+
+    def failover(self, from_account: int, to_account: int):
+        self.counters['failovers'] += 1
+        logger.info(f"🔄 Thread failed over from account {from_account} to account {to_account}")
+
+    def oldest_job_age(self) -> Optional[float]:
+        """Seconds since the oldest job still in the queue or being posted was enqueued."""
+        if not self.open_jobs:
+            return None
+        return round(time.time() - min(self.open_jobs.values()), 3)
+
+    def posts_per_account(self) -> Dict:
+        now = time.time()
+        counts = {}
+        for account_num, timestamp in self.post_log:
+            per_window = counts.setdefault(account_num, {name: 0 for name in METRIC_WINDOWS})
+            for name, length in METRIC_WINDOWS.items():
+                if now - timestamp < length:
+                    per_window[name] += 1
+        return counts
+
+    def throughput(self) -> Dict:
+        """Tweets and threads per minute over each window."""
+        now = time.time()
+        result = {}
+        for name, length in METRIC_WINDOWS.items():
+            posts = sum(1 for _, timestamp in self.post_log if now - timestamp < length)
+            threads = sum(1 for status, _, _, _, timestamp in self.job_timings
+                          if status == 'completed' and now - timestamp < length)
+            result[name] = {
+                'tweets_per_minute': round(posts / (length / 60), 3),
+                'threads_per_minute': round(threads / (length / 60), 3)
+            }
+        return result
+
+    def latency_summary(self) -> Dict:
+        completed = [timing for timing in self.job_timings if timing[0] == 'completed']
+        return {
+            'create_tweet_seconds': _percentiles([seconds for _, seconds, ok, _ in self.api_latencies if ok]),
+            'queue_wait_seconds': _percentiles([timing[1] for timing in completed]),
+            'thread_post_seconds': _percentiles([timing[2] for timing in completed if timing[2] is not None]),
+            'end_to_end_seconds': _percentiles([timing[3] for timing in completed])
+        }
+
+    def get_counters(self) -> Dict:
+        return {
+            'retries': self.counters['retries'],
+            'retries_by_reason': {key[len('retries_'):]: value for key, value in self.counters.items()
+                                  if key.startswith('retries_')},
+            'failovers': self.counters['failovers'],
+            'api_errors': self.counters['api_errors'],
+            'jobs_completed': self.counters['jobs_completed'],
+            'jobs_failed': self.counters['jobs_failed'],
+            'jobs_expired': self.counters['jobs_expired'],
+            'jobs_superseded': self.counters['jobs_superseded'],
+            'jobs_dropped': self.counters['jobs_dropped']
+        }
+
+# Global metrics instance
+queue_metrics = XQueueMetrics()
@@ -1,79 +1,50 @@
+import os
 import logging
-import threading
-import queue
 import asyncio
-import json
-from typing import List, Dict, Optional
+import time
+import itertools
+from collections import defaultdict, deque
+from typing import Callable, List, Dict, Optional
 from datetime import datetime, timedelta
 from modules.rate_limit_manager import rate_manager
+from modules.x_accounts import x_accounts
+from modules.x_job_store import get_job_store
+from modules.x_pacing import reply_pacer
+from modules.x_verifier import x_post_verifier, verify_tweets
+from modules.x_queue_metrics import queue_metrics
+from modules.notifier import notifier
+from modules.thread_export_log import thread_export_log
+from modules.content_dedup import get_dedup_index, content_fingerprint, DuplicateContentError
+from modules.retry_policy import get_policy, get_retry_stats
 
 logger = logging.getLogger('CryptoBot')
 
-# Global queue and worker state
-_post_queue = queue.Queue()
-_worker_thread = None
-_worker_running = False
+# Queue priorities: higher numbers are posted first
+PRIORITY_HIGH = 10    # Time-critical alerts (breakouts, large moves)
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10    # Long daily reports
+
+# Shortest lifetime a re-rendered thread gets, for threads queued with a deadline
+# already in the past (or resumed without their original timestamp)
+MIN_REFRESH_TTL = timedelta(minutes=5)
+
+# What queue_x_thread does with a new thread once max_pending threads are waiting
+OVERFLOW_BLOCK = "block"              # Wait for room (queue_x_thread_async); queue_x_thread rejects
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Drop the oldest unstarted thread of the lowest priority
+OVERFLOW_REJECT = "reject"            # Reject the new thread
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT)
+
+# Consecutive 429s per account that came without a reset time; sets the cooldown guess
+_rate_limit_strikes: Dict[int, int] = defaultdict(int)
 
 async def verify_post_exists(tweet_id: str) -> dict:
-    """Verify that a posted tweet exists and is accessible on the platform."""
+    """Verify that a posted tweet exists through the X lookup API.
+
+    Meant for one-off checks; the queue verifies its posts in batches through
+    x_post_verifier instead.
+    """
     try:
-        import aiohttp
-        verification_url = f"https://twitter.com/user/status/{tweet_id}"
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.head(verification_url, timeout=15) as response:
-                    if response.status == 200:
-                        async with session.get(verification_url, timeout=15) as content_response:
-                            if content_response.status == 200:
-                                content = await content_response.text()
-                                if any(indicator in content.lower() for indicator in ['twitter', 'tweet', 'post', 'status']):
-                                    return {
-                                        "exists": True,
-                                        "content_verified": True,
-                                        "status_code": response.status,
-                                        "method": "full_verification",
-                                        "url": verification_url
-                                    }
-                                return {
-                                    "exists": False,
-                                    "content_verified": False,
-                                    "error": "Content not found in response",
-                                    "status_code": content_response.status,
-                                    "method": "content_check_failed"
-                                }
-                            return {
-                                "exists": False,
-                                "content_verified": False,
-                                "error": f"Content fetch failed: HTTP {content_response.status}",
-                                "status_code": content_response.status,
-                                "method": "content_fetch_failed"
-                            }
-                    elif response.status == 401:  # Unauthorized
-                        logger.warning(f"401 Unauthorized for tweet {tweet_id}; skipping verification")
-                        return {
-                            "exists": False,
-                            "content_verified": False,
-                            "error": "401 Unauthorized",
-                            "status_code": response.status,
-                            "method": "auth_failed"
-                        }
-                    else:
-                        return {
-                            "exists": False,
-                            "content_verified": False,
-                            "error": f"URL not accessible: HTTP {response.status}",
-                            "status_code": response.status,
-                            "method": "url_check_failed"
-                        }
-            except asyncio.TimeoutError:
-                return {
-                    "exists": False,
-                    "content_verified": False,
-                    "error": "Verification timeout - X platform may be slow",
-                    "status_code": None,
-                    "method": "timeout"
-                }
+        return (await verify_tweets([tweet_id]))[tweet_id]
     except Exception as e:
         return {
             "exists": False,
@@ -83,228 +54,874 @@ async def verify_post_exists(tweet_id: str) -> dict:
             "method": "exception"
         }
 
-async def _queue_worker_async():
-    """Asynchronous worker to process queued posts."""
-    logger.info("X queue worker thread started successfully")
+async def _checkpoint(thread_data: Dict, position: int, tweet_id: str, text: str):
+    """Advance a thread's resume point and persist it (the commit runs off the event loop).
+
+    text is what was actually posted, which the dedup index may have made
+    unique; it replaces the stored text so a resumed thread and its
+    verification see the posted version.
+    """
+    thread_data['last_tweet_id'] = tweet_id
+    thread_data['next_position'] = position + 1
+    thread_data.setdefault('tweet_ids', {})[position] = tweet_id
+    if position == 0:
+        thread_data['main_tweet_id'] = tweet_id
+    job_id = thread_data.get('job_id')
+    if job_id:
+        try:
+            await asyncio.to_thread(get_job_store().mark_posted, job_id, position, tweet_id, text)
+        except Exception as e:
+            logger.error(f"Failed to checkpoint tweet {tweet_id} for thread {job_id}: {e}")
+
+async def _create_tweet(x_client, account_num: int, **kwargs):
+    """Call create_tweet off the event loop and record its latency and the account's health."""
+    started = time.monotonic()
+    try:
+        response = await asyncio.to_thread(x_client.create_tweet, **kwargs)
+    except Exception as e:
+        queue_metrics.api_call(account_num, time.monotonic() - started, ok=False)
+        # Rate limits and duplicate content say nothing about the account's health
+        error_str = str(e).lower()
+        if not any(marker in error_str for marker in ("429", "rate limit", "duplicate")):
+            x_accounts.record_result(account_num, ok=False)
+        raise
+    queue_metrics.api_call(account_num, time.monotonic() - started, ok=True)
+    x_accounts.record_result(account_num, ok=True)
+    return response
+
+async def _create_unique_tweet(x_client, account_num: int, text: str, policy: Optional[str] = None, **kwargs):
+    """Post text after the local duplicate check; returns (response, text actually posted).
+
+    Duplicates are caught by the fingerprint index before they cost an API
+    call, and are mutated or rejected (DuplicateContentError) per policy.
+    """
+    dedup_index = get_dedup_index()
+    text = dedup_index.reserve(text, policy=policy)
+    try:
+        return await _create_tweet(x_client, account_num, text=text, **kwargs), text
+    except Exception:
+        dedup_index.release(text)
+        raise
+
+async def _post_thread(x_client, account_num: int, thread_data: Dict) -> str:
+    """Post a thread starting at its checkpoint and return the main tweet ID.
+
+    Tweets already posted (e.g. before a crash or a rate limit) are skipped and
+    the next reply is chained onto the last posted tweet.
+    """
+    main_post = thread_data.get('main_post', '')
+    posts = thread_data.get('posts', [])
+    job_id = thread_data.get('job_id')
+    position = thread_data.get('next_position', 0)
+
+    if job_id:
+        await asyncio.to_thread(get_job_store().mark_in_progress, job_id, account_num)
+
+    last_posted_at = None
+    if position == 0:
+        logger.info(f"🐦 POSTING MAIN TWEET: {main_post[:100]}...")
+        try:
+            main_tweet, thread_data['main_post'] = await _create_unique_tweet(x_client, account_num, main_post)
+        except Exception as e:
+            if job_id:
+                await asyncio.to_thread(get_job_store().record_attempt_failure, job_id, 0, str(e))
+            raise
+        await asyncio.to_thread(rate_manager.record_post, account_num)
+        await _checkpoint(thread_data, 0, main_tweet.data['id'], thread_data['main_post'])
+        last_posted_at = time.monotonic()
+        logger.info(f"✅ MAIN TWEET POSTED SUCCESSFULLY: https://twitter.com/user/status/{thread_data['main_tweet_id']}")
+    else:
+        logger.info(f"↩️ Resuming thread {job_id} at reply {position} after tweet {thread_data.get('last_tweet_id')}")
+
+    for i in range(thread_data['next_position'] - 1, len(posts)):
+        post = posts[i]
+        post_text = post.get('text', '')
+        coin_name = post.get('coin_name', 'Unknown')
+        planned_delay = await reply_pacer.pace(account_num, len(posts) - i)
+        logger.info(f"Posting reply {i+1} for {coin_name}: {post_text[:50]}...")
+        try:
+            # Replies are always made unique: rejecting one would leave the thread half-posted
+            reply_tweet, post['text'] = await _create_unique_tweet(
+                x_client, account_num, post_text,
+                policy='mutate',
+                in_reply_to_tweet_id=thread_data['last_tweet_id']
+            )
+        except Exception as e:
+            if job_id:
+                await asyncio.to_thread(get_job_store().record_attempt_failure, job_id, i + 1, str(e))
+            raise
+        await asyncio.to_thread(rate_manager.record_post, account_num)
+        await _checkpoint(thread_data, i + 1, reply_tweet.data['id'], post['text'])
+        if last_posted_at is not None:
+            reply_pacer.record(account_num, planned_delay, time.monotonic() - last_posted_at)
+        last_posted_at = time.monotonic()
+        logger.info(f"Posted reply {i+1}: {thread_data['last_tweet_id']}")
+
+    return thread_data['main_tweet_id']
+
+def _posted_tweets(thread_data: Dict) -> List[tuple]:
+    """(tweet_id, text, post_type, content_hash) for every tweet of a posted thread."""
+    tweet_ids = thread_data.get('tweet_ids', {})
+    texts = [thread_data.get('main_post', '')] + [post.get('text', '') for post in thread_data.get('posts', [])]
+    return [(tweet_ids[position], texts[position], 'thread_main' if position == 0 else 'thread_reply',
+             content_fingerprint(texts[position]))
+            for position in sorted(tweet_ids) if position < len(texts)]
+
+async def _finish_job(thread_data: Dict, error: Optional[str] = None):
+    """Resolve a job's completion future and record its final state (the commit runs off the event loop)."""
+    queue_metrics.job_finished(thread_data, 'failed' if error else 'completed')
+    future = thread_data.get('future')
+    if future and not future.done():
+        future.set_result({
+            'job_id': thread_data.get('job_id'),
+            'status': 'failed' if error else 'completed',
+            'main_tweet_id': thread_data.get('main_tweet_id'),
+            'error': error
+        })
+
+    job_id = thread_data.get('job_id')
+    if not job_id:
+        return
+    try:
+        if error:
+            await asyncio.to_thread(get_job_store().mark_failed, job_id, error)
+        else:
+            await asyncio.to_thread(get_job_store().mark_completed, job_id)
+    except Exception as e:
+        logger.error(f"Failed to record final state of thread {job_id}: {e}")
+
+def _requeue(thread_data: Dict, reason: str, delay: float = 0.0):
+    """Put an interrupted job back so it resumes from its checkpoint.
+
+    With a delay the dispatcher holds the thread back until it has passed,
+    without tying up an account in the meantime.
+    """
+    queue_metrics.retry(reason)
+    logger.info(f"🔁 Re-queuing thread {thread_data.get('job_id')} at reply {thread_data.get('next_position', 0)}")
+    if delay > 0:
+        thread_data['not_before'] = time.monotonic() + delay
+    x_queue_service.put(thread_data)
+
+def _retry_transient(thread_data: Dict, error: Exception) -> bool:
+    """Count a transient failure (5xx, network) and say whether the thread gets another attempt."""
+    policy = get_policy('x_post')
+    if not policy.is_retryable(error):
+        return False
+    thread_data['transient_failures'] = thread_data.get('transient_failures', 0) + 1
+    return thread_data['transient_failures'] < policy.max_attempts
+
+async def _process_thread(thread_data: Dict, account_num: int) -> bool:
+    """Post one queued thread on the given account.
+
+    Returns False if the account has no usable client or its credentials
+    were rejected, in which case the job is handed back to the scheduler for
+    another account. A rate-limited thread
+    is re-queued from its checkpoint so the scheduler can move it to an account
+    with remaining capacity.
+    """
+    main_post = thread_data.get('main_post', '')
+    posts = thread_data.get('posts', [])
+    timestamp = thread_data.get('timestamp', datetime.now())
+
+    logger.info(f"Processing queued thread with {len(posts)} posts from {timestamp} on account #{account_num}")
+
+    from modules.api_clients import get_x_client, invalidate_x_clients
+
+    try:
+        x_client = get_x_client(posting_only=True, account_number=account_num)
+        if not x_client:
+            logger.error(f"❌ X account #{account_num} has no usable client - check its API credentials")
+            _requeue(thread_data, 'no_client')
+            return False
+
+        logger.info(f"✅ Using X account #{account_num}")
+
+        queue_metrics.job_started(thread_data)
+        main_tweet_id = await _post_thread(x_client, account_num, thread_data)
+        if thread_data.get('failover_from') not in (None, account_num):
+            queue_metrics.failover(thread_data['failover_from'], account_num)
+
+        thread_url = f"https://twitter.com/user/status/{main_tweet_id}"
+        # Verification runs in the background in batches; posting doesn't wait for it
+        x_post_verifier.submit(_posted_tweets(thread_data), thread_url)
+
+        notifier.notify(
+            f"🎉 X THREAD POSTED!\n✅ THREAD URL: {thread_url}\n✅ Posted {len(posts)} replies\n"
+            f"🔍 Verification queued\n🕒 {datetime.now().strftime('%H:%M:%S')}",
+            key=f"x_posted:{main_tweet_id}"
+        )
+
+        tweet_ids = thread_data.get('tweet_ids', {})
+        thread_export = {
+            "main_tweet": {
+                "id": main_tweet_id,
+                "url": thread_url,
+                "text": main_post[:100] + "..." if len(main_post) > 100 else main_post,
+                "timestamp": datetime.now().isoformat()
+            },
+            "replies": [
+                {"id": tweet_ids.get(i + 1),
+                 "text": post.get('text', '')[:100] + "..." if len(post.get('text', '')) > 100 else post.get('text', ''),
+                 "coin_name": post.get('coin_name', 'Unknown')}
+                for i, post in enumerate(posts)
+            ],
+            "verification": {"status": "queued", "method": "batched_lookup"},
+            "account": account_num,
+            "failover_from": thread_data.get('failover_from'),
+            "job_id": thread_data.get('job_id'),
+            "workflow_type": "x_queue_posting",
+            "posted_at": datetime.now().isoformat()
+        }
+        thread_export_log.submit(thread_export, list(tweet_ids.values()))
+
+        failover_note = f" (failover from account {thread_data['failover_from']})" if thread_data.get('failover_from') else ""
+        logger.info(f"✅ X POSTING SUCCESS: {thread_url} - {len(posts)} replies on account {account_num}{failover_note}")
+        _rate_limit_strikes.pop(account_num, None)
+
+        await _finish_job(thread_data)
+
+    except DuplicateContentError as e:
+        logger.warning(f"🚫 Thread {thread_data.get('job_id')} not posted - {e}")
+        await _finish_job(thread_data, f"Duplicate content: {e}")
+
+    except Exception as api_error:
+        logger.error(f"❌ REAL X API ERROR: {api_error}")
+        logger.error(f"Failed to post thread with {len(posts)} posts at position {thread_data.get('next_position', 0)}")
+
+        # Keyed on the error text so a burst of identical failures becomes one alert
+        notifier.notify(
+            f"❌ X POSTING FAILED!\n💥 Error: {str(api_error)[:100]}\n🕒 {datetime.now().strftime('%H:%M:%S')}",
+            key=f"x_error:{str(api_error)[:100]}"
+        )
+
+        error_str = str(api_error).lower()
+        if "rate limit" in error_str or "429" in error_str:
+            logger.error(f"❌ RATE LIMIT HIT ON ACCOUNT {account_num}")
+            # Wait for the reset X reported with the 429; without one, back off longer on every repeat
+            _rate_limit_strikes[account_num] += 1
+            until = rate_manager.reported_reset(account_num) or datetime.now() + timedelta(
+                seconds=get_policy('x_rate_limit').backoff(_rate_limit_strikes[account_num]))
+            await asyncio.to_thread(rate_manager.mark_rate_limited, account_num, until=until)
+            logger.info("🔄 Handing thread to the next account with capacity")
+            thread_data['failover_from'] = account_num
+            _requeue(thread_data, 'rate_limited')
+        elif "duplicate" in error_str:
+            # Checked before auth: X rejects duplicate content with a 403
+            logger.warning("Duplicate content detected - continuing with next post")
+            await _finish_job(thread_data, str(api_error))
+        elif "auth" in error_str or "401" in error_str or "403" in error_str:
+            account = x_accounts.get(account_num)
+            prefix = account.prefix if account else "X"
+            logger.error(f"❌ AUTHENTICATION ERROR - X API credentials for account {account_num} invalid!")
+            logger.error(f"🔑 Check your X API secrets: {prefix}_CONSUMER_KEY, {prefix}_CONSUMER_SECRET, "
+                         f"{prefix}_ACCESS_TOKEN, {prefix}_ACCESS_TOKEN_SECRET")
+            # Stop using the account and let the next one pick the thread up from its checkpoint
+            x_accounts.disable(account_num, f"Authentication failed: {str(api_error)[:100]}")
+            invalidate_x_clients(account_num)
+            thread_data['failover_from'] = account_num
+            _requeue(thread_data, 'auth_failed')
+            return False
+        elif _retry_transient(thread_data, api_error):
+            delay = get_policy('x_post').backoff(thread_data['transient_failures'])
+            logger.warning(f"🔁 Transient X error on account {account_num} - retrying thread "
+                           f"{thread_data.get('job_id')} from its checkpoint in {delay:.1f}s")
+            _requeue(thread_data, 'transient_error', delay=delay)
+        else:
+            logger.error(f"General API error: {api_error}")
+            await _finish_job(thread_data, str(api_error))
+
+    return True
+
+class XQueueService:
+    """Asyncio-native X posting queue that runs on the application's event loop.
+
+    A dispatcher takes the highest-priority thread (FIFO within a priority)
+    and hands it to the idle account with the best remaining rate-limit
+    capacity x health score (see x_accounts). Every configured account has
+    its own posting coroutine, so distinct threads post in parallel while
+    the replies within a thread stay in order. Threads
+    that pass their deadline before posting starts are re-rendered through
+    their refresh callback, or dropped if they have none. Every queued thread
+    gets a future that resolves when the thread is completed, failed or expired.
+
+    At most max_pending threads wait for dispatch; overflow_policy decides
+    what happens to new threads beyond that. A new thread whose posts cover
+    the same coins (at the same priority) as a thread still waiting replaces
+    it and takes over its place in the queue, so superseded updates are never
+    posted. Both default to X_QUEUE_MAX_PENDING and X_QUEUE_OVERFLOW_POLICY.
+    """
+
+    def __init__(self, max_pending: Optional[int] = None, overflow_policy: Optional[str] = None):
+        self.max_pending = max_pending
+        self.overflow_policy = overflow_policy
+        self._pending: Dict[int, Dict] = {}  # id(thread_data) -> thread waiting for dispatch
+        self._pending_by_coins: Dict[tuple, Dict] = {}  # (priority, coins) -> unstarted thread
+        self._room_available: Optional[asyncio.Event] = None
+        self.backpressure_stats = {'merged': 0, 'dropped': 0, 'rejected': 0, 'blocked': 0}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._entry_numbers = itertools.count()  # Breaks ties between a superseded thread and its replacement
+        self._wait_samples = defaultdict(lambda: deque(maxlen=500))
+        self._expired_counts = defaultdict(lambda: {'dropped': 0, 'refreshed': 0})
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._account_inboxes: Dict[int, asyncio.Queue] = {}
+        self._enabled_accounts = set()
+        self._idle_accounts = set()
+        self._account_available: Optional[asyncio.Condition] = None
+        self._deferred: Dict[int, tuple] = {}  # id(thread_data) -> (thread held back for its retry backoff, timer)
+        self._store_writes = set()  # Background job store writes for discarded threads
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._tasks[0].done()
+
+    def start(self):
+        """Start the dispatcher and account workers on the running loop and resume stored jobs."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._configure_backpressure()
+        self._queue = asyncio.PriorityQueue()
+        self._pending = {}
+        self._pending_by_coins = {}
+        self._deferred = {}
+        self._room_available = asyncio.Event()
+        self._room_available.set()
+        self._account_available = asyncio.Condition()
+        self._enabled_accounts = set(x_accounts.numbers())
+        self._idle_accounts = set(self._enabled_accounts)
+        self._account_inboxes = {account_num: asyncio.Queue(maxsize=1) for account_num in self._enabled_accounts}
+        self._resume_unfinished_jobs()
+        x_post_verifier.start()
+        notifier.start()
+        thread_export_log.start()
+        self._tasks = [self._loop.create_task(self._dispatcher(), name="x-queue-dispatcher")]
+        self._tasks += [
+            self._loop.create_task(self._account_worker(account_num), name=f"x-queue-account-{account_num}")
+            for account_num in sorted(self._enabled_accounts)
+        ]
+        logger.info(f"X queue worker started with {len(self._enabled_accounts)} account workers")
+
+    async def stop(self):
+        """Cancel the workers. Unfinished jobs stay in the job store for the next run."""
+        current_loop = asyncio.get_running_loop()
+        for task in self._tasks:
+            if not task.done() and task.get_loop() is current_loop:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._tasks = []
+        for thread_data, timer in self._deferred.values():
+            timer.cancel()
+            if thread_data.get('future') and not thread_data['future'].done():
+                thread_data['future'].cancel()
+        self._deferred = {}
+        if self._store_writes:
+            await asyncio.gather(*self._store_writes)
+        for pending in [self._queue] + list(self._account_inboxes.values()):
+            while pending and not pending.empty():
+                item = pending.get_nowait()
+                future = (item[-1] if isinstance(item, tuple) else item).get('future')
+                if future and not future.done():
+                    future.cancel()
+        try:
+            get_job_store().flush()
+        except Exception as e:
+            logger.error(f"Failed to flush X job store: {e}")
+        await x_post_verifier.stop()
+        await notifier.stop()
+        await thread_export_log.stop()
+        logger.info("X queue worker stopped")
+
+    def _configure_backpressure(self):
+        if self.max_pending is None:
+            self.max_pending = int(os.getenv("X_QUEUE_MAX_PENDING", "100"))
+        if self.overflow_policy is None:
+            self.overflow_policy = os.getenv("X_QUEUE_OVERFLOW_POLICY", OVERFLOW_DROP_OLDEST)
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            logger.error(f"Unknown X queue overflow policy {self.overflow_policy!r} - using {OVERFLOW_DROP_OLDEST}")
+            self.overflow_policy = OVERFLOW_DROP_OLDEST
+
+    def put(self, thread_data: Dict) -> Optional[asyncio.Future]:
+        """Queue a thread and return its completion future (None if the worker isn't running).
+
+        Used for threads already admitted (re-queues and resumed jobs), so it
+        never applies the overflow policy.
+        """
+        if not self.running:
+            return None
+        if 'future' not in thread_data:
+            thread_data['future'] = self._loop.create_future()
+        self._track(thread_data)
+        self._queue.put_nowait(self._entry(thread_data))
+        return thread_data['future']
 
-    while _worker_running:
+    def submit(self, thread_data: Dict) -> Optional[asyncio.Future]:
+        """Queue a new thread, replacing a waiting thread for the same coins."""
+        if not self.running:
+            return None
+        superseded = self._merge_target(thread_data)
+        if superseded:
+            # The newest content takes the superseded thread's place in the queue
+            thread_data['sequence'] = superseded['sequence']
+            self.backpressure_stats['merged'] += 1
+            self._discard(superseded, 'superseded', f"Superseded by newer thread {thread_data.get('job_id')}")
+            logger.info(f"🔀 Thread {thread_data.get('job_id')} replaces waiting thread {superseded.get('job_id')} for the same coins")
+        future = self.put(thread_data)
+        key = _coin_key(thread_data)
+        if key:
+            self._pending_by_coins[key] = thread_data
+        return future
+
+    def _merge_target(self, thread_data: Dict) -> Optional[Dict]:
+        key = _coin_key(thread_data)
+        return self._pending_by_coins.get(key) if key else None
+
+    def has_room(self, thread_data: Dict) -> bool:
+        """Whether a new thread can be queued without applying the overflow policy."""
+        return (not self.running or len(self._pending) < self.max_pending
+                or self._merge_target(thread_data) is not None)
+
+    def make_room(self, thread_data: Dict) -> bool:
+        """Apply the overflow policy for a new thread. Returns False if it must be rejected."""
+        if self.has_room(thread_data):
+            return True
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            # Never drop a half-posted thread or one more urgent than the newcomer
+            candidates = [pending for pending in self._pending.values()
+                          if pending.get('next_position', 0) == 0
+                          and pending['priority'] <= thread_data.get('priority', PRIORITY_NORMAL)]
+            if candidates:
+                oldest = min(candidates, key=lambda pending: (pending['priority'], pending['sequence']))
+                self.backpressure_stats['dropped'] += 1
+                self._discard(oldest, 'dropped', f"Dropped from a full X queue ({self.max_pending} waiting)")
+                logger.warning(f"🗑️ X queue full - dropped oldest waiting thread {oldest.get('job_id')}")
+                return True
+        return False
+
+    async def wait_for_room(self, thread_data: Dict):
+        """Wait until a new thread can be queued (the block overflow policy)."""
+        if not self.has_room(thread_data):
+            self.backpressure_stats['blocked'] += 1
+            logger.info(f"⏳ X queue full ({self.max_pending} waiting) - waiting for room")
+        while not self.has_room(thread_data):
+            self._room_available.clear()
+            await self._room_available.wait()
+
+    def reject(self, thread_data: Dict, reason: str) -> Optional[asyncio.Future]:
+        """Resolve a thread that was not admitted to the queue."""
+        self.backpressure_stats['rejected'] += 1
+        logger.warning(f"🚫 X queue full - thread with {len(thread_data.get('posts', []))} posts rejected")
+        if not self._loop:
+            return None
+        future = self._loop.create_future()
+        future.set_result({'job_id': None, 'status': 'rejected', 'main_tweet_id': None, 'error': reason})
+        return future
+
+    def _track(self, thread_data: Dict):
+        self._pending[id(thread_data)] = thread_data
+        key = _coin_key(thread_data)
+        if key:
+            self._pending_by_coins.setdefault(key, thread_data)
+
+    def _untrack(self, thread_data: Dict):
+        """Forget a thread that left the queue, freeing its slot."""
+        self._pending.pop(id(thread_data), None)
+        key = _coin_key(thread_data)
+        if key and self._pending_by_coins.get(key) is thread_data:
+            del self._pending_by_coins[key]
+        if len(self._pending) < self.max_pending:
+            self._room_available.set()
+
+    def _discard(self, thread_data: Dict, status: str, reason: str):
+        """Take a waiting thread out of the queue for good; the dispatcher skips its entry.
+
+        Called from sync code, so the job store write runs as a background
+        task; stop() waits for any still running.
+        """
+        thread_data['discarded'] = status
+        self._untrack(thread_data)
+        deferred = self._deferred.pop(id(thread_data), None)
+        if deferred:
+            deferred[1].cancel()
+            self._queue.task_done()  # The entry it was taken off the queue with
+        queue_metrics.job_finished(thread_data, status)
+        future = thread_data.get('future')
+        if future and not future.done():
+            future.set_result({'job_id': thread_data.get('job_id'), 'status': status,
+                               'main_tweet_id': None, 'error': reason})
+        job_id = thread_data.get('job_id')
+        if job_id:
+            mark = get_job_store().mark_superseded if status == 'superseded' else get_job_store().mark_dropped
+            task = self._loop.create_task(self._record_discard(mark, job_id, status, reason))
+            self._store_writes.add(task)
+            task.add_done_callback(self._store_writes.discard)
+
+    @staticmethod
+    async def _record_discard(mark: Callable, job_id: int, status: str, reason: str):
         try:
-            thread_data = await asyncio.to_thread(_post_queue.get, timeout=1.0)
-        except queue.Empty:
-            await asyncio.sleep(0.1)
-            continue
+            await asyncio.to_thread(mark, job_id, reason)
+        except Exception as e:
+            logger.error(f"Failed to record {status} thread {job_id}: {e}")
+
+    def _next_live(self) -> Optional[Dict]:
+        """Take the next queued thread that was not discarded, or None if there is none."""
+        while not self._queue.empty():
+            *_, thread_data = self._queue.get_nowait()
+            if thread_data.get('discarded'):
+                self._queue.task_done()
+            elif not self._defer(thread_data):
+                self._untrack(thread_data)
+                return thread_data
+        return None
+
+    def _defer(self, thread_data: Dict) -> bool:
+        """Hold back a thread taken off the queue before its retry backoff passed.
+
+        The thread stays pending and its queue entry unfinished (so join()
+        keeps waiting for it) until a timer puts it back on the queue.
+        """
+        wait = thread_data.get('not_before', 0) - time.monotonic()
+        if wait <= 0:
+            thread_data.pop('not_before', None)
+            return False
+        timer = self._loop.call_later(wait, self._undefer, thread_data)
+        self._deferred[id(thread_data)] = (thread_data, timer)
+        return True
+
+    def _undefer(self, thread_data: Dict):
+        self._deferred.pop(id(thread_data), None)
+        self._queue.put_nowait(self._entry(thread_data))
+        self._queue.task_done()  # The entry it was taken off the queue with
+
+    def _entry(self, thread_data: Dict) -> tuple:
+        """Priority-queue entry; a re-queued thread keeps its original place."""
+        thread_data.setdefault('priority', PRIORITY_NORMAL)
+        thread_data.setdefault('enqueued_at', time.monotonic())
+        queue_metrics.job_enqueued(thread_data)
+        if 'sequence' not in thread_data:
+            thread_data['sequence'] = next(self._sequence)
+        return (-thread_data['priority'], thread_data['sequence'], next(self._entry_numbers), thread_data)
 
-        main_post = thread_data.get('main_post', '')
-        posts = thread_data.get('posts', [])
-        timestamp = thread_data.get('timestamp', datetime.now())
+    async def join(self):
+        """Wait until every queued thread has been processed."""
+        if self._queue:
+            await self._queue.join()
 
-        logger.info(f"Processing queued thread with {len(posts)} posts from {timestamp}")
+    @property
+    def accounts(self) -> set:
+        """Accounts the running service may still post with."""
+        return set(self._enabled_accounts)
 
+    def qsize(self) -> int:
+        """Threads waiting for dispatch (discarded entries not counted)."""
+        return len(self._pending)
+
+    def get_backpressure_stats(self) -> Dict:
+        return {
+            'max_pending': self.max_pending,
+            'overflow_policy': self.overflow_policy,
+            'pending': len(self._pending),
+            **self.backpressure_stats
+        }
+
+    def _resume_unfinished_jobs(self):
+        """Re-queue threads left pending or half-posted by a previous run."""
         try:
-            from modules.api_clients import get_x_client_with_failover, get_notification_webhook_url
-            import aiohttp
-
-            logger.info("🔑 Attempting to get X client with failover...")
-            x_client, account_num = get_x_client_with_failover(posting_only=True)
-            if not x_client:
-                logger.error("❌ CRITICAL: Both X accounts failed - check API credentials!")
-                logger.error("Primary account variables: X_CONSUMER_KEY, X_CONSUMER_SECRET, X_ACCESS_TOKEN, X_ACCESS_TOKEN_SECRET")
-                logger.error("Failover account variables: X_CONSUMER_KEY_2, X_CONSUMER_SECRET_2, X_ACCESS_TOKEN_2, X_ACCESS_TOKEN_SECRET_2")
-                _post_queue.task_done()
+            jobs = get_job_store().load_unfinished()
+        except Exception as e:
+            logger.error(f"Could not load unfinished X threads: {e}")
+            return
+        for thread_data in jobs:
+            self.put(thread_data)
+        if jobs:
+            logger.info(f"Resuming {len(jobs)} unfinished X threads from the job store")
+
+    async def _acquire_account(self) -> Optional[int]:
+        """Wait for an idle account with capacity and claim it.
+
+        Picks the account with the best capacity x health score; returns None
+        once no account has a usable client.
+        """
+        async with self._account_available:
+            while self._enabled_accounts:
+                ready = [account_num for account_num in sorted(self._idle_accounts) if rate_manager.can_post(account_num)]
+                if ready:
+                    account_num = x_accounts.select(ready) or ready[0]
+                    self._idle_accounts.discard(account_num)
+                    return account_num
+
+                timeout = None
+                if self._idle_accounts:
+                    # Wake when the first idle account's limits reset, including X-reported windows
+                    next_available = min(rate_manager.next_available_time(account_num) for account_num in self._idle_accounts)
+                    timeout = max(1.0, (next_available - datetime.now()).total_seconds())
+                    logger.warning(f"All idle accounts rate limited - waiting up to {timeout/60:.1f} minutes")
+                try:
+                    await asyncio.wait_for(self._account_available.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return None
+
+    async def _release_account(self, account_num: int, usable: bool):
+        async with self._account_available:
+            if usable:
+                self._idle_accounts.add(account_num)
+            else:
+                self._enabled_accounts.discard(account_num)
+                logger.warning(f"X account #{account_num} disabled for this run")
+            self._account_available.notify_all()
+
+    async def _expire_if_stale(self, thread_data: Dict) -> bool:
+        """Handle a thread past its deadline. Returns True if it was dropped.
+
+        Only threads that have not started posting expire; a half-posted
+        thread is always finished so no dangling thread is left on X.
+        """
+        deadline = thread_data.get('deadline')
+        if not deadline or datetime.now() < deadline or thread_data.get('next_position', 0) > 0:
+            return False
+
+        priority = thread_data.get('priority', PRIORITY_NORMAL)
+        refresh = thread_data.get('refresh')
+        if refresh:
+            try:
+                fresh = refresh()
+                if asyncio.iscoroutine(fresh):
+                    fresh = await fresh
+                posts, main_post_text = fresh
+                ttl = max(deadline - thread_data.get('timestamp', deadline), MIN_REFRESH_TTL)
+                thread_data.update({
+                    'posts': posts,
+                    'main_post': main_post_text,
+                    'timestamp': datetime.now(),
+                    'deadline': datetime.now() + ttl
+                })
+                if thread_data.get('job_id'):
+                    await asyncio.to_thread(get_job_store().replace_content, thread_data['job_id'],
+                                            main_post_text, posts, thread_data['deadline'])
+                self._expired_counts[priority]['refreshed'] += 1
+                logger.info(f"♻️ Thread {thread_data.get('job_id')} passed its deadline - re-rendered with fresh data")
+                return False
+            except Exception as e:
+                logger.error(f"Failed to re-render expired thread {thread_data.get('job_id')}: {e}")
+
+        self._expired_counts[priority]['dropped'] += 1
+        queue_metrics.job_finished(thread_data, 'expired')
+        logger.warning(f"⌛ Dropping thread {thread_data.get('job_id')}: deadline {deadline.isoformat()} passed")
+        future = thread_data.get('future')
+        if future and not future.done():
+            future.set_result({
+                'job_id': thread_data.get('job_id'),
+                'status': 'expired',
+                'main_tweet_id': None,
+                'error': 'Deadline passed before posting'
+            })
+        if thread_data.get('job_id'):
+            try:
+                await asyncio.to_thread(get_job_store().mark_expired, thread_data['job_id'],
+                                        'Deadline passed before posting')
+            except Exception as e:
+                logger.error(f"Failed to record expiry of thread {thread_data['job_id']}: {e}")
+        return True
+
+    async def _dispatcher(self):
+        """Assign the highest-priority live thread to the best available account."""
+        logger.info("X queue dispatcher started successfully")
+        while True:
+            *_, thread_data = await self._queue.get()
+            if thread_data.get('discarded'):
+                self._queue.task_done()
+                continue
+            if self._defer(thread_data):
                 continue
+            account_num = await self._acquire_account()
 
-            logger.info(f"✅ Using X account #{account_num}")
-            logger.info("✅ X client obtained successfully")
+            # A more urgent or newer thread may have arrived while we waited for an account
+            if not thread_data.get('discarded'):
+                self._queue.put_nowait(self._entry(thread_data))
+            self._queue.task_done()
+            thread_data = self._next_live()
+            if thread_data is None:
+                if account_num is not None:
+                    await self._release_account(account_num, True)
+                continue
 
-            best_account = rate_manager.get_best_account()
-            if not best_account:
-                wait_time = rate_manager.get_wait_time()
-                logger.warning(f"All accounts rate limited - waiting {wait_time//60} minutes")
-                await asyncio.sleep(wait_time)
+            if account_num is None:
+                logger.error("❌ CRITICAL: No X account has usable API credentials!")
+                await _finish_job(thread_data, "No X account available - check API credentials")
+                self._queue.task_done()
                 continue
 
-            logger.info(f"🐦 POSTING MAIN TWEET: {main_post[:100]}...")
-            main_tweet = await asyncio.to_thread(x_client.create_tweet, text=main_post)
-            main_tweet_id = main_tweet.data['id']
-            rate_manager.record_post(account_num)
-            logger.info(f"✅ MAIN TWEET POSTED SUCCESSFULLY: https://twitter.com/user/status/{main_tweet_id}")
-
-            previous_tweet_id = main_tweet_id
-            for i, post in enumerate(posts):
-                post_text = post.get('text', '')
-                coin_name = post.get('coin_name', 'Unknown')
-                logger.info(f"Posting reply {i+1} for {coin_name}: {post_text[:50]}...")
-                reply_tweet = await asyncio.to_thread(
-                    x_client.create_tweet,
-                    text=post_text,
-                    in_reply_to_tweet_id=previous_tweet_id
-                )
-                previous_tweet_id = reply_tweet.data['id']
-                logger.info(f"Posted reply {i+1}: {previous_tweet_id}")
-                await asyncio.sleep(10 if i == 0 else 15 if len(posts) > 5 else 8)
-
-            thread_url = f"https://twitter.com/user/status/{main_tweet_id}"
-            verification_status = await verify_post_exists(main_tweet_id)
-
-            webhook_url = get_notification_webhook_url()
-            if webhook_url:
-                success_message = (
-                    f"🎉 X POSTING VERIFIED SUCCESS!\n✅ THREAD URL: {thread_url}\n✅ Posted {len(posts)} replies\n"
-                    f"🔍 VERIFIED: {verification_status.get('method')}\n🕒 {datetime.now().strftime('%H:%M:%S')}"
-                    if verification_status.get('exists') and verification_status.get('content_verified')
-                    else f"❌ X POSTING FAILED VERIFICATION!\n🚫 Could not verify: {verification_status.get('error')}\n"
-                    f"📍 Attempted: {thread_url}\n🕒 {datetime.now().strftime('%H:%M:%S')}"
+            if await self._expire_if_stale(thread_data):
+                self._queue.task_done()
+                await self._release_account(account_num, True)
+                continue
+
+            if 'dispatched_at' not in thread_data:
+                thread_data['dispatched_at'] = time.monotonic()
+                self._wait_samples[thread_data['priority']].append(
+                    thread_data['dispatched_at'] - thread_data['enqueued_at']
                 )
-                async with aiohttp.ClientSession() as session:
-                    await session.post(webhook_url, json={"content": success_message})
-
-            thread_export = {
-                "main_tweet": {
-                    "id": main_tweet_id,
-                    "url": thread_url,
-                    "text": main_post[:100] + "..." if len(main_post) > 100 else main_post,
-                    "timestamp": datetime.now().isoformat()
-                },
-                "replies": [
-                    {"text": post.get('text', '')[:100] + "..." if len(post.get('text', '')) > 100 else post.get('text', ''),
-                     "coin_name": post.get('coin_name', 'Unknown')}
-                    for post in posts
-                ],
-                "verification": verification_status,
-                "workflow_type": "x_queue_posting",
-                "posted_at": datetime.now().isoformat()
-            }
-
-            print("=" * 60)
-            print("🚀 X POSTING WORKFLOW RESULTS")
-            print("=" * 60)
-            print(f"📍 THREAD URL: {thread_url}")
-            print(f"📊 POSTS COUNT: {len(posts)} replies")
-            print(f"🔍 VERIFICATION: {'PASSED' if verification_status.get('exists') else 'FAILED'}")
-            print("📁 FULL JSON EXPORT:")
-            print(json.dumps(thread_export, indent=2))
-            print("=" * 60)
-
-            export_filename = f"x_thread_export_{main_tweet_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            try:
-                with open(export_filename, 'w') as f:
-                    json.dump(thread_export, f, indent=2)
-                print(f"💾 Thread data exported to: {export_filename}")
-            except Exception as e:
-                logger.error(f"Failed to save thread export: {e}")
-                print(f"❌ Export save failed: {e}")
+            self._account_inboxes[account_num].put_nowait(thread_data)
 
-            if verification_status.get('exists') and verification_status.get('content_verified', False):
-                logger.info(f"✅ X POSTING SUCCESS - VERIFIED: Main tweet: {main_tweet_id}, Replies: {len(posts)}")
-                print(f"✅ WORKFLOW RESULT: VERIFIED SUCCESS")
-            else:
-                logger.error(f"❌ X POSTING FAILED VERIFICATION: {verification_status.get('error', 'Unknown error')}")
-                print(f"❌ WORKFLOW RESULT: VERIFICATION FAILED")
-
-        except Exception as api_error:
-            logger.error(f"❌ REAL X API ERROR: {api_error}")
-            logger.error(f"Failed to post thread with {len(posts)} posts")
-
-            webhook_url = get_notification_webhook_url()
-            if webhook_url:
-                error_message = f"❌ X POSTING FAILED!\n💥 Error: {str(api_error)[:100]}\n🕒 {datetime.now().strftime('%H:%M:%S')}"
-                async with aiohttp.ClientSession() as session:
-                    await session.post(webhook_url, json={"content": error_message})
-
-            error_str = str(api_error).lower()
-            if "rate limit" in error_str or "429" in error_str:
-                logger.error(f"❌ RATE LIMIT HIT ON ACCOUNT {account_num}")
-                rate_manager.mark_rate_limited(account_num, duration_minutes=120)
-                alternative_client, alt_account_num = get_x_client_with_failover(posting_only=True)
-                if alternative_client and alt_account_num != account_num:
-                    logger.info(f"🔄 SWITCHING TO ACCOUNT {alt_account_num}")
-                    try:
-                        main_tweet = await asyncio.to_thread(alternative_client.create_tweet, text=main_post)
-                        main_tweet_id = main_tweet.data['id']
-                        rate_manager.record_post(alt_account_num)
-                        failover_url = f"https://twitter.com/user/status/{main_tweet_id}"
-                        logger.info(f"✅ FAILOVER SUCCESS: {failover_url}")
-                        previous_tweet_id = main_tweet_id
-                        for i, post in enumerate(posts):
-                            reply_tweet = await asyncio.to_thread(
-                                alternative_client.create_tweet,
-                                text=post.get('text', ''),
-                                in_reply_to_tweet_id=previous_tweet_id
-                            )
-                            previous_tweet_id = reply_tweet.data['id']
-                            await asyncio.sleep(15)
-                        failover_export = {
-                            "main_tweet": {"id": main_tweet_id, "url": failover_url},
-                            "replies": [{"coin_name": post.get('coin_name', 'Unknown')} for post in posts],
-                            "failover_account": alt_account_num,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        print("=" * 60)
-                        print("🔄 X FAILOVER POSTING RESULTS")
-                        print("=" * 60)
-                        print(f"📍 THREAD URL: {failover_url}")
-                        print(f"🔄 FAILOVER ACCOUNT: {alt_account_num}")
-                        print("📁 FAILOVER JSON EXPORT:")
-                        print(json.dumps(failover_export, indent=2))
-                        print("=" * 60)
-                    except Exception as failover_error:
-                        logger.error(f"❌ FAILOVER ALSO FAILED: {failover_error}")
-                else:
-                    logger.error("🚫 NO ALTERNATIVE ACCOUNT AVAILABLE")
-                    await asyncio.sleep(7200)
-            elif "auth" in error_str or "401" in error_str or "403" in error_str:
-                logger.error("❌ AUTHENTICATION ERROR - X API credentials invalid!")
-                logger.error("🔑 Check your X API secrets: X_CONSUMER_KEY, X_CONSUMER_SECRET, X_ACCESS_TOKEN, X_ACCESS_TOKEN_SECRET")
-                print("❌ X API AUTHENTICATION FAILED - CHECK YOUR SECRETS!")
-            elif "duplicate" in error_str:
-                logger.warning("Duplicate content detected - continuing with next post")
-            else:
-                logger.error(f"General API error: {api_error}")
-                print(f"❌ X API ERROR: {api_error}")
+    def get_wait_metrics(self) -> Dict:
+        """Queue wait (enqueue to first dispatch) and expiry counts per priority."""
+        metrics = {}
+        for priority in sorted(set(self._wait_samples) | set(self._expired_counts), reverse=True):
+            waits = sorted(self._wait_samples.get(priority, []))
+            entry = {'dispatched': len(waits), **self._expired_counts.get(priority, {'dropped': 0, 'refreshed': 0})}
+            if waits:
+                entry.update({
+                    'avg_wait_seconds': round(sum(waits) / len(waits), 3),
+                    'p95_wait_seconds': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3),
+                    'max_wait_seconds': round(waits[-1], 3)
+                })
+            metrics[priority] = entry
+        return metrics
 
-            _post_queue.task_done()
+    async def _account_worker(self, account_num: int):
+        """Post threads assigned to one account, one at a time."""
+        inbox = self._account_inboxes[account_num]
+        errors = 0  # Consecutive unexpected errors, for the backoff between them
+        while True:
+            thread_data = await inbox.get()
+            usable = True
+            try:
+                usable = await _process_thread(thread_data, account_num)
+                errors = 0
+            except Exception as e:
+                logger.error(f"Error in queue worker for account #{account_num}: {e}")
+                await _finish_job(thread_data, str(e))
+                errors += 1
+                await asyncio.sleep(get_policy('x_post').backoff(errors))
+            finally:
+                self._queue.task_done()
+                await self._release_account(account_num, usable)
 
-        except Exception as e:
-            logger.error(f"Error in queue worker: {e}")
-            await asyncio.sleep(5)
+# Global queue service
+x_queue_service = XQueueService()
 
 def start_x_queue():
-    """Start the X posting queue worker."""
-    global _worker_thread, _worker_running
-    if not _worker_running:
-        _worker_running = True
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        _worker_thread = threading.Thread(target=lambda: loop.run_until_complete(_queue_worker_async()), daemon=True)
-        _worker_thread.start()
-        logger.info("X queue worker started")
-
-def stop_x_queue():
+    """Start the X posting queue worker. Must be called from a running event loop."""
+    x_queue_service.start()
+
+async def stop_x_queue():
     """Stop the X posting queue worker."""
-    global _worker_running
-    _worker_running = False
-    if _worker_thread and _worker_thread.is_alive():
-        _worker_thread.join(timeout=5)
-    logger.info("X queue worker stopped")
-
-def queue_x_thread(posts: List[Dict], main_post_text: str = ""):
-    """Queue posts for X posting."""
+    await x_queue_service.stop()
+
+async def join_x_queue():
+    """Wait until all queued threads have been processed."""
+    await x_queue_service.join()
+
+def _coin_key(thread_data: Dict) -> Optional[tuple]:
+    """(priority, coins) identifying threads that supersede each other, or None for a started thread."""
+    if thread_data.get('next_position', 0) > 0:
+        return None
+    coins = frozenset(post.get('coin_name') for post in thread_data.get('posts', [])
+                      if post.get('coin_name') not in (None, '', 'Unknown'))
+    return (thread_data.get('priority', PRIORITY_NORMAL), coins) if coins else None
+
+def _enqueue(thread_data: Dict) -> Optional[asyncio.Future]:
+    """Admit, persist and queue a new thread."""
     try:
-        thread_data = {
-            'main_post': main_post_text,
-            'posts': posts,
-            'timestamp': datetime.now()
-        }
-        _post_queue.put(thread_data)
-        logger.info(f"Queued thread with {len(posts)} posts")
+        if not x_queue_service.make_room(thread_data):
+            return x_queue_service.reject(
+                thread_data, f"X queue full ({x_queue_service.max_pending} threads waiting)"
+            )
+        try:
+            thread_data['job_id'] = get_job_store().enqueue_thread(
+                thread_data['main_post'], thread_data['posts'], thread_data['priority'], thread_data['deadline']
+            )
+        except Exception as e:
+            logger.error(f"Could not persist queued thread, keeping it in memory only: {e}")
+        future = x_queue_service.submit(thread_data)
+        logger.info(f"Queued thread with {len(thread_data['posts'])} posts (priority {thread_data['priority']})")
+        return future
     except Exception as e:
         logger.error(f"Error queuing posts: {e}")
+        return None
+
+def queue_x_thread(posts: List[Dict], main_post_text: str = "", priority: int = PRIORITY_NORMAL,
+                   deadline: Optional[datetime] = None,
+                   refresh: Optional[Callable] = None) -> Optional[asyncio.Future]:
+    """Queue posts for X posting.
+
+    Args:
+        posts: Reply posts, each a dict with 'text' and optionally 'coin_name'
+        main_post_text: Text of the main tweet
+        priority: Higher priorities are posted first (see PRIORITY_* constants)
+        deadline: Latest time posting may start; stale threads are not posted
+        refresh: Optional callable (sync or async) returning fresh
+            (posts, main_post_text) for a thread that passed its deadline;
+            without it an expired thread is dropped
+
+    The thread is persisted before it is queued and replaces any waiting
+    thread for the same coins. When the queue is full the overflow policy
+    applies; under the block policy this function can't wait and rejects the
+    thread instead (use queue_x_thread_async). Returns a future resolving to
+    the job result, or None when no worker is running in this process (the job
+    store still holds the thread and the next worker will pick it up).
+    """
+    return _enqueue(_new_thread(posts, main_post_text, priority, deadline, refresh))
+
+async def queue_x_thread_async(posts: List[Dict], main_post_text: str = "", priority: int = PRIORITY_NORMAL,
+                               deadline: Optional[datetime] = None,
+                               refresh: Optional[Callable] = None) -> Optional[asyncio.Future]:
+    """Like queue_x_thread, but waits for room under the block overflow policy."""
+    thread_data = _new_thread(posts, main_post_text, priority, deadline, refresh)
+    if x_queue_service.overflow_policy == OVERFLOW_BLOCK:
+        await x_queue_service.wait_for_room(thread_data)
+    return _enqueue(thread_data)
+
+def _new_thread(posts: List[Dict], main_post_text: str, priority: int,
+                deadline: Optional[datetime], refresh: Optional[Callable]) -> Dict:
+    return {
+        'main_post': main_post_text,
+        'posts': posts,
+        'timestamp': datetime.now(),
+        'next_position': 0,
+        'priority': priority,
+        'deadline': deadline,
+        'refresh': refresh
+    }
+
+def _client_pool_stats() -> Dict:
+    try:
+        from modules.api_clients import x_client_pool
+        return x_client_pool.get_stats()
+    except Exception as e:
+        return {'error': str(e)}
 
 def get_x_queue_status() -> Dict:
-    """Get current queue status."""
+    """Get live queue status: backlog, rate-limit availability and pipeline metrics."""
+    accounts = x_queue_service.accounts or set(x_accounts.numbers())
+    last_posts = [rate_manager.account_limits[account_num]['last_post'] for account_num in accounts]
+    last_posts = [last_post for last_post in last_posts if last_post]
+    next_available = min((rate_manager.next_available_time(account_num) for account_num in accounts), default=None)
+    oldest_job_age = queue_metrics.oldest_job_age()
     return {
-        'queue_size': _post_queue.qsize(),
-        'worker_running': _worker_running,
-        'last_post_time': None,
-        'next_post_available': True
-    }
\ No newline at end of file
+        'queue_size': x_queue_service.qsize(),
+        'worker_running': x_queue_service.running,
+        'last_post_time': max(last_posts).isoformat() if last_posts else None,
+        'next_post_available': bool(next_available) and next_available <= datetime.now(),
+        'next_post_available_at': next_available.isoformat() if next_available else None,
+        'oldest_job_age_seconds': oldest_job_age,
+        'latency': queue_metrics.latency_summary(),
+        'throughput': queue_metrics.throughput(),
+        'posts_per_account': queue_metrics.posts_per_account(),
+        'counters': queue_metrics.get_counters(),
+        'pacing': reply_pacer.get_stats(),
+        'verification': x_post_verifier.get_stats(),
+        'notifications': notifier.get_stats(),
+        'export_log': thread_export_log.get_stats(),
+        'dedup': get_dedup_index().get_stats(),
+        'accounts': x_accounts.get_stats(),
+        'client_pool': _client_pool_stats(),
+        'retry_policies': get_retry_stats(),
+        'backpressure': x_queue_service.get_backpressure_stats(),
+        'queue_wait_by_priority': x_queue_service.get_wait_metrics()
+    }
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import aiohttp
+from modules.retry_policy import with_retries
+
+logger = logging.getLogger('CryptoBot')
+
+LOOKUP_BATCH_SIZE = 100  # Maximum IDs per GET /2/tweets request
+VERIFIER_DB_FILE = "crypto_bot.db"
+
+class XLookupError(Exception):
+    """A tweet lookup request failed as a whole (auth, rate limit, network)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_at: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_at = retry_at
+
+async def lookup_tweets(session: aiohttp.ClientSession, tweet_ids: List[str], bearer_token: str,
+                        base_url: str) -> Dict[str, Dict]:
+    """Look up to 100 tweets in one request.
+
+    Returns {tweet_id: {'exists': bool, 'error': str or None}}. Tweets missing
+    from the response's data are reported with the detail X gave for them.
+    """
+    if len(tweet_ids) > LOOKUP_BATCH_SIZE:
+        raise ValueError(f"At most {LOOKUP_BATCH_SIZE} tweet IDs per lookup")
+
+    try:
+        async with session.get(
+            f"{base_url}/2/tweets",
+            params={'ids': ','.join(tweet_ids)},
+            headers={'Authorization': f"Bearer {bearer_token}"},
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as response:
+            if response.status == 429:
+                reset = response.headers.get('x-rate-limit-reset')
+                raise XLookupError("Lookup rate limited", 429, float(reset) if reset else None)
+            if response.status != 200:
+                raise XLookupError(f"Lookup failed: HTTP {response.status}", response.status)
+            payload = await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise XLookupError(f"Lookup request failed: {e}") from e
+
+    results = {tweet_id: {'exists': False, 'error': 'Not returned by lookup'} for tweet_id in tweet_ids}
+    for tweet in payload.get('data') or []:
+        results[tweet['id']] = {'exists': True, 'error': None}
+    for error in payload.get('errors') or []:
+        tweet_id = error.get('resource_id') or error.get('value')
+        if tweet_id in results and not results[tweet_id]['exists']:
+            results[tweet_id]['error'] = error.get('detail') or error.get('title')
+    return results
+
+async def verify_tweets(tweet_ids: List[str]) -> Dict[str, Dict]:
+    """One-off verification of a few tweets, in the result format of verify_post_exists."""
+    from modules.api_clients import get_x_api_base_url, get_x_bearer_token
+
+    bearer_token = get_x_bearer_token()
+    if not bearer_token:
+        return {tweet_id: {"exists": False, "content_verified": False, "status_code": None,
+                           "error": "No X bearer token configured", "method": "lookup_unavailable"}
+                for tweet_id in tweet_ids}
+
+    results = {}
+    async with aiohttp.ClientSession() as session:
+        for start in range(0, len(tweet_ids), LOOKUP_BATCH_SIZE):
+            batch = tweet_ids[start:start + LOOKUP_BATCH_SIZE]
+            try:
+                found = await with_retries('x_lookup', lookup_tweets, session, batch, bearer_token,
+                                           get_x_api_base_url())
+            except XLookupError as e:
+                for tweet_id in batch:
+                    results[tweet_id] = {"exists": False, "content_verified": False, "status_code": e.status_code,
+                                         "error": str(e), "method": "lookup_failed"}
+                continue
+            for tweet_id, result in found.items():
+                results[tweet_id] = {
+                    "exists": result['exists'],
+                    "content_verified": result['exists'],
+                    "status_code": 200,
+                    "error": result['error'],
+                    "method": "lookup_api",
+                    "url": f"https://twitter.com/user/status/{tweet_id}"
+                }
+    return results
+
+class XPostVerifier:
+    """Background verification of posted tweets through the X lookup API.
+
+    Posted tweet IDs are submitted without waiting and recorded in
+    x_post_history. The verifier looks them up in batches of up to 100 once
+    batch_size tweets are waiting or the oldest has waited max_wait seconds
+    (tweets younger than min_age are held back, since a fresh tweet can take a
+    moment to become readable). Results are written back to x_post_history and
+    threads with missing tweets trigger a webhook alert.
+    """
+
+    def __init__(self, batch_size: int = LOOKUP_BATCH_SIZE, max_wait: float = 30.0, min_age: float = 5.0,
+                 max_attempts: int = 5, db_file: str = VERIFIER_DB_FILE):
+        self.batch_size = min(batch_size, LOOKUP_BATCH_SIZE)
+        self.max_wait = max_wait
+        self.min_age = min_age
+        self.max_attempts = max_attempts
+        self.db_file = db_file
+        self._db = None
+        self._pending: Dict[str, Dict] = {}  # tweet_id -> {'submitted_at', 'attempts', 'thread_url'}
+        self._unrecorded = []  # (tweet_id, content_preview, post_type, content_hash) not yet in x_post_history
+        self._retry_at = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._warned_no_token = False
+        self.stats = {'submitted': 0, 'batches': 0, 'verified': 0, 'missing': 0,
+                      'lookup_failures': 0, 'abandoned': 0, 'last_batch_seconds': None}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the verification loop on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="x-post-verifier")
+
+    async def stop(self):
+        """Verify whatever is still pending, then stop the loop."""
+        if not self.running:
+            return
+        # Let an in-flight batch finish rather than cancelling it mid-write
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        try:
+            async with aiohttp.ClientSession() as session:
+                await self._record_new_posts()
+                await self._verify_due(session, final=True)
+        except Exception as e:
+            logger.error(f"Final X post verification failed: {e}")
+
+    def submit(self, tweets: List[tuple], thread_url: Optional[str] = None):
+        """Queue posted tweets, as (tweet_id, text, post_type, content_hash) tuples, for verification."""
+        now = time.monotonic()
+        for tweet_id, text, post_type, content_hash in tweets:
+            self._unrecorded.append((tweet_id, text[:100], post_type, content_hash))
+            self._pending[tweet_id] = {'submitted_at': now, 'attempts': 0, 'thread_url': thread_url}
+        self.stats['submitted'] += len(tweets)
+        if self._wakeup:
+            self._wakeup.set()
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'pending': len(self._pending)}
+
+    def _get_db(self):
+        if self._db is None:
+            from modules.database import Database
+            self._db = Database(self.db_file)
+        return self._db
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the next batch is due, or None if nothing is pending."""
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        submitted = sorted(entry['submitted_at'] for entry in self._pending.values())
+        due_at = submitted[0] + self.max_wait
+        if len(submitted) >= self.batch_size:
+            due_at = min(due_at, submitted[self.batch_size - 1] + self.min_age)
+        return max(0.0, due_at - now, self._retry_at - time.time())
+
+    async def _run(self):
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_delay())
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if self._stopping:
+                    return
+                try:
+                    await self._record_new_posts()
+                    if self._next_delay() == 0:
+                        await self._verify_due(session)
+                except Exception as e:
+                    logger.error(f"Error in X post verifier: {e}")
+                    await asyncio.sleep(5)
+
+    async def _record_new_posts(self):
+        if self._unrecorded:
+            rows, self._unrecorded = self._unrecorded, []
+            await asyncio.to_thread(self._get_db().add_x_posts, rows)
+
+    async def _verify_due(self, session: aiohttp.ClientSession, final: bool = False):
+        """Look up every pending tweet older than min_age, batch_size IDs per request."""
+        from modules.api_clients import get_x_api_base_url, get_x_bearer_token
+
+        now = time.monotonic()
+        due = [tweet_id for tweet_id, entry in self._pending.items()
+               if final or now - entry['submitted_at'] >= self.min_age]
+        if not due:
+            return
+
+        bearer_token = get_x_bearer_token()
+        if not bearer_token:
+            if not self._warned_no_token:
+                logger.warning("⚠️ No X bearer token configured - posted tweets cannot be verified")
+                self._warned_no_token = True
+            await self._store_results([(tweet_id, None, "No X bearer token configured") for tweet_id in due])
+            return
+
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            batch_start = time.monotonic()
+            try:
+                found = await lookup_tweets(session, batch, bearer_token, get_x_api_base_url())
+            except XLookupError as e:
+                self.stats['lookup_failures'] += 1
+                logger.warning(f"X post verification batch of {len(batch)} failed: {e}")
+                if e.retry_at:
+                    self._retry_at = e.retry_at
+                    return
+                await self._count_failed_attempt(batch, str(e))
+                continue
+
+            self.stats['batches'] += 1
+            self.stats['last_batch_seconds'] = round(time.monotonic() - batch_start, 3)
+            await self._store_results([(tweet_id, result['exists'], result['error'])
+                                       for tweet_id, result in found.items()])
+
+    async def _count_failed_attempt(self, tweet_ids: List[str], error: str):
+        abandoned = []
+        for tweet_id in tweet_ids:
+            self._pending[tweet_id]['attempts'] += 1
+            if self._pending[tweet_id]['attempts'] >= self.max_attempts:
+                abandoned.append((tweet_id, None, error))
+        if abandoned:
+            self.stats['abandoned'] += len(abandoned)
+            logger.error(f"Giving up verifying {len(abandoned)} tweets after {self.max_attempts} attempts")
+            await self._store_results(abandoned)
+
+    async def _store_results(self, results: List[tuple]):
+        """Write (tweet_id, verified, error) results to x_post_history and alert on missing tweets."""
+        missing_by_thread = {}
+        for tweet_id, verified, _ in results:
+            entry = self._pending.pop(tweet_id, {})
+            if verified:
+                self.stats['verified'] += 1
+            elif verified is False:
+                self.stats['missing'] += 1
+                missing_by_thread.setdefault(entry.get('thread_url'), []).append(tweet_id)
+
+        await asyncio.to_thread(self._get_db().update_x_post_verification, results)
+
+        verified_count = sum(1 for _, verified, _ in results if verified)
+        if verified_count:
+            logger.info(f"✅ Verified {verified_count} posted tweets via X lookup")
+        for thread_url, tweet_ids in missing_by_thread.items():
+            logger.error(f"❌ X POSTING FAILED VERIFICATION: {len(tweet_ids)} tweets not found ({', '.join(tweet_ids)})")
+            self._alert_missing(thread_url, tweet_ids)
+
+    def _alert_missing(self, thread_url: Optional[str], tweet_ids: List[str]):
+        from modules.notifier import notifier
+
+        notifier.notify(
+            f"❌ X POSTING FAILED VERIFICATION!\n🚫 {len(tweet_ids)} tweets not found: {', '.join(tweet_ids)}\n"
+            f"📍 Thread: {thread_url or 'unknown'}\n🕒 {datetime.now().strftime('%H:%M:%S')}",
+            key=f"x_verification:{thread_url}"
+        )
+
+# Global verifier instance
+x_post_verifier = XPostVerifier()
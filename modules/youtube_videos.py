@@ -0,0 +1,373 @@
+import os
+import html
+import json
+import sqlite3
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import aiohttp
+from modules.error_handler import APIError
+from modules.circuit_breaker import CircuitOpenError, get_breaker
+from modules.retry_policy import with_retries
+
+logger = logging.getLogger('CryptoBot')
+
+YOUTUBE_DB_FILE = "crypto_bot.db"
+YOUTUBE_API_DEFAULT_BASE_URL = "https://www.googleapis.com"
+
+# Quota units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+SEARCH_COST = 100
+VIDEOS_LIST_COST = 1
+VIDEOS_LIST_MAX_IDS = 50
+
+QUOTA_NORMAL = "normal"        # Search whenever a coin's cache is stale
+QUOTA_CONSERVE = "conserve"    # Serve stale cache where there is one; search only uncached coins
+QUOTA_EXHAUSTED = "exhausted"  # No API calls until the quota resets
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+def _connect(db_file: str) -> sqlite3.Connection:
+    """Connection to db_file, creating youtube_quota and the cache index first on older databases."""
+    if db_file not in _schema_ready:
+        with _schema_lock:
+            if db_file not in _schema_ready:
+                from modules.database import Database
+                Database(db_file)
+                _schema_ready.add(db_file)
+    return sqlite3.connect(db_file, timeout=10)
+
+class YouTubeAPIError(APIError):
+    """The YouTube Data API returned an error."""
+
+class YouTubeQuotaExceeded(YouTubeAPIError):
+    """The daily quota is spent (reported by YouTube or by the local ledger)."""
+
+class YouTubeQuotaRefused(YouTubeQuotaExceeded):
+    """The local ledger had no units left to reserve for a call, so it was not made."""
+
+class YouTubeQuotaLedger:
+    """Quota units spent today, shared by every process through the youtube_quota table.
+
+    YouTube resets quotas at midnight Pacific time, so that is when the
+    ledger's day rolls over. try_spend() reserves units atomically before a
+    call and refuses once the daily limit would be passed; past conserve_at
+    of the limit the fetcher stops refreshing coins it has cached results for.
+    """
+
+    def __init__(self, daily_limit: int = 10000, conserve_at: float = 0.8, db_file: str = YOUTUBE_DB_FILE):
+        self.daily_limit = daily_limit
+        self.conserve_at = conserve_at
+        self.db_file = db_file
+
+    @staticmethod
+    def today() -> str:
+        import pytz
+        return datetime.now(pytz.timezone("America/Los_Angeles")).strftime("%Y-%m-%d")
+
+    def _connect(self) -> sqlite3.Connection:
+        return _connect(self.db_file)
+
+    def used(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT units_used FROM youtube_quota WHERE day = ?", (self.today(),)).fetchone()
+        return row[0] if row else 0
+
+    def try_spend(self, units: int) -> bool:
+        """Reserve units for a call; False if that would pass the daily limit."""
+        day = self.today()
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO youtube_quota (day, units_used) VALUES (?, 0)", (day,))
+            spent = conn.execute(
+                "UPDATE youtube_quota SET units_used = units_used + ?, updated_at = CURRENT_TIMESTAMP "
+                "WHERE day = ? AND units_used + ? <= ?",
+                (units, day, units, self.daily_limit)
+            ).rowcount
+        return spent == 1
+
+    def refund(self, units: int):
+        """Give back units reserved for a call that was never sent."""
+        with self._connect() as conn:
+            conn.execute("UPDATE youtube_quota SET units_used = MAX(0, units_used - ?), "
+                         "updated_at = CURRENT_TIMESTAMP WHERE day = ?", (units, self.today()))
+
+    def mark_exhausted(self):
+        """Record that YouTube refused a call for quota, whatever the ledger thought was left."""
+        day = self.today()
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO youtube_quota (day, units_used) VALUES (?, 0)", (day,))
+            conn.execute("UPDATE youtube_quota SET units_used = MAX(units_used, ?), updated_at = CURRENT_TIMESTAMP "
+                         "WHERE day = ?", (self.daily_limit, day))
+        logger.warning("📺 YouTube quota exhausted for today - serving cached videos only")
+
+    def mode(self) -> str:
+        used = self.used()
+        if used + SEARCH_COST > self.daily_limit:
+            return QUOTA_EXHAUSTED
+        if used >= self.conserve_at * self.daily_limit:
+            return QUOTA_CONSERVE
+        return QUOTA_NORMAL
+
+    def get_stats(self) -> Dict:
+        used = self.used()
+        return {'day': self.today(), 'units_used': used, 'daily_limit': self.daily_limit,
+                'remaining': max(0, self.daily_limit - used), 'mode': self.mode()}
+
+class YouTubeVideoFetcher:
+    """Finds recent YouTube videos about each coin within the Data API quota.
+
+    Search results (100 units per search) are cached per coin in
+    youtube_cache for cache_ttl_hours. Details for every new candidate,
+    across all coins searched together, come from videos.list in batches of
+    up to 50 IDs (1 unit per batch). Videos in used_videos are never
+    returned. As the quota ledger fills up the fetcher degrades instead of
+    failing: first it serves stale cache (up to stale_ttl_hours old) rather
+    than searching again, then it stops calling the API and serves
+    whatever cache it has. Candidates are dicts in the video_data format
+    ContentVerifier.verify_video_content expects. Cache and ledger queries
+    run in worker threads so they never hold up the event loop.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = YOUTUBE_API_DEFAULT_BASE_URL,
+                 db_file: str = YOUTUBE_DB_FILE, cache_ttl_hours: float = 6.0, stale_ttl_hours: float = 48.0,
+                 max_results: int = 10, published_within_hours: float = 48.0,
+                 quota: Optional[YouTubeQuotaLedger] = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.db_file = db_file
+        self.cache_ttl_seconds = cache_ttl_hours * 3600
+        self.stale_ttl_seconds = stale_ttl_hours * 3600
+        self.max_results = max_results
+        self.published_within = timedelta(hours=published_within_hours)
+        self.quota = quota or YouTubeQuotaLedger(db_file=db_file)
+        self.stats = {'cache_hits': 0, 'stale_served': 0, 'searches': 0, 'videos_list_calls': 0,
+                      'used_filtered': 0, 'api_errors': 0, 'quota_skips': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        return _connect(self.db_file)
+
+    # Cache
+
+    def _cached(self, coin: str) -> tuple:
+        """(candidates, age in seconds) of a coin's latest cached search, or (None, None)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT video_data, (julianday('now') - julianday(timestamp)) * 86400 FROM youtube_cache "
+                "WHERE coin = ? ORDER BY timestamp DESC, id DESC LIMIT 1", (coin,)
+            ).fetchone()
+        if not row:
+            return None, None
+        try:
+            return json.loads(row[0]), row[1]
+        except (TypeError, ValueError):
+            return None, None
+
+    def _store(self, coin: str, candidates: List[Dict]):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO youtube_cache (coin, video_data) VALUES (?, ?)",
+                         (coin, json.dumps(candidates)))
+            conn.execute("DELETE FROM youtube_cache WHERE coin = ? AND timestamp < datetime('now', ?)",
+                         (coin, f"-{int(self.stale_ttl_seconds)} seconds"))
+
+    def _used_ids(self, video_ids: List[str]) -> set:
+        """Which of video_ids are already in used_videos, in one query."""
+        if not video_ids:
+            return set()
+        with self._connect() as conn:
+            placeholders = ','.join('?' * len(video_ids))
+            rows = conn.execute(f"SELECT video_id FROM used_videos WHERE video_id IN ({placeholders})",
+                                list(video_ids)).fetchall()
+        return {row[0] for row in rows}
+
+    # API
+
+    async def _get(self, session: aiohttp.ClientSession, endpoint: str, params: Dict, cost: int) -> Dict:
+        """Call an endpoint, reserving cost quota units for every attempt (retries are charged too).
+
+        Attempts the open circuit breaker rejects are refunded.
+        """
+        url = f"{self.base_url}/youtube/v3/{endpoint}"
+
+        async def get():
+            if not await asyncio.to_thread(self.quota.try_spend, cost):
+                raise YouTubeQuotaRefused(f"No quota left for YouTube {endpoint} ({cost} units)")
+            try:
+                async with get_breaker('youtube').protect():
+                    async with session.get(url, params={**params, 'key': self.api_key}) as response:
+                        if response.status == 429 or response.status >= 500:
+                            response.raise_for_status()
+                        return response.status, await response.json(content_type=None)
+            except CircuitOpenError:
+                # Rejected before a request went out, so YouTube charged nothing
+                await asyncio.to_thread(self.quota.refund, cost)
+                raise
+
+        status, payload = await with_retries('youtube', get)
+        if status == 200:
+            return payload
+        error = (payload or {}).get('error', {})
+        reasons = {item.get('reason') for item in error.get('errors', [])}
+        if status == 403 and reasons & {'quotaExceeded', 'dailyLimitExceeded'}:
+            await asyncio.to_thread(self.quota.mark_exhausted)
+            raise YouTubeQuotaExceeded(error.get('message', 'Quota exceeded'))
+        raise YouTubeAPIError(f"YouTube {endpoint} failed: HTTP {status} {error.get('message', '')}".strip())
+
+    async def _search(self, session: aiohttp.ClientSession, query: str) -> Optional[List[Dict]]:
+        """Search items for a query, or None if the quota ledger refused the call."""
+        published_after = (datetime.now(timezone.utc) - self.published_within).strftime('%Y-%m-%dT%H:%M:%SZ')
+        try:
+            payload = await self._get(session, 'search', {
+                'part': 'snippet', 'q': query, 'type': 'video', 'order': 'date',
+                'publishedAfter': published_after, 'maxResults': self.max_results, 'relevanceLanguage': 'en'
+            }, SEARCH_COST)
+        except YouTubeQuotaRefused:
+            self.stats['quota_skips'] += 1
+            return None
+        self.stats['searches'] += 1
+        return [item for item in payload.get('items', []) if item.get('id', {}).get('videoId')]
+
+    async def _video_details(self, session: aiohttp.ClientSession, video_ids: List[str]) -> Dict[str, Dict]:
+        """videos.list items by ID, VIDEOS_LIST_MAX_IDS per call; IDs the quota can't cover are left out."""
+        details = {}
+        for start in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+            batch = video_ids[start:start + VIDEOS_LIST_MAX_IDS]
+            try:
+                payload = await self._get(session, 'videos', {'part': 'snippet,statistics,contentDetails',
+                                                              'id': ','.join(batch)}, VIDEOS_LIST_COST)
+            except YouTubeQuotaRefused:
+                self.stats['quota_skips'] += 1
+                break
+            self.stats['videos_list_calls'] += 1
+            details.update({item['id']: item for item in payload.get('items', [])})
+        return details
+
+    @staticmethod
+    def _candidate(video_id: str, snippet: Dict, details: Optional[Dict]) -> Dict:
+        """A search result (plus its videos.list details, if any) as ContentVerifier video_data."""
+        if details:
+            snippet = details.get('snippet', snippet)
+        published_at = snippet.get('publishedAt', '')
+        candidate = {
+            'video_id': video_id,
+            # search.list HTML-escapes titles, videos.list doesn't
+            'title': html.unescape(snippet.get('title', '')),
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'platform': 'youtube',
+            'channel': snippet.get('channelTitle', ''),
+            'published_at': published_at,
+            'content_date': published_at[:10],
+            'live': snippet.get('liveBroadcastContent', 'none') != 'none'
+        }
+        if details:
+            statistics = details.get('statistics', {})
+            candidate.update({
+                'view_count': int(statistics.get('viewCount', 0)),
+                'like_count': int(statistics.get('likeCount', 0)),
+                'duration': details.get('contentDetails', {}).get('duration')
+            })
+        return candidate
+
+    # Discovery
+
+    async def fetch_candidates(self, coins: List[str], queries: Optional[Dict[str, str]] = None,
+                               session: Optional[aiohttp.ClientSession] = None) -> Dict[str, List[Dict]]:
+        """Unused candidate videos for each coin, newest first.
+
+        queries overrides the search query per coin (default "<coin> crypto").
+        Coins are searched concurrently and all new candidates share the
+        videos.list batches.
+        """
+        queries = queries or {}
+        mode = await asyncio.to_thread(self.quota.mode)
+        results: Dict[str, List[Dict]] = {}
+        stale: Dict[str, List[Dict]] = {}
+        to_search = []
+        for coin in coins:
+            cached, age = await asyncio.to_thread(self._cached, coin)
+            if cached is not None and age < self.cache_ttl_seconds:
+                self.stats['cache_hits'] += 1
+                results[coin] = cached
+                continue
+            if cached is not None and age < self.stale_ttl_seconds:
+                stale[coin] = cached
+                if mode != QUOTA_NORMAL:
+                    self.stats['stale_served'] += 1
+                    results[coin] = cached
+                    continue
+            if mode == QUOTA_EXHAUSTED or not self.api_key:
+                results[coin] = stale.get(coin, [])
+                continue
+            to_search.append(coin)
+
+        if to_search:
+            own_session = session is None
+            session = session or aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+            try:
+                await self._search_and_store(session, to_search, queries, results, stale)
+            finally:
+                if own_session:
+                    await session.close()
+
+        used = await asyncio.to_thread(self._used_ids, list({video['video_id'] for videos in results.values()
+                                                             for video in videos}))
+        if used:
+            self.stats['used_filtered'] += sum(video['video_id'] in used for videos in results.values() for video in videos)
+        return {coin: [video for video in results.get(coin, []) if video['video_id'] not in used] for coin in coins}
+
+    async def _search_and_store(self, session: aiohttp.ClientSession, coins: List[str], queries: Dict[str, str],
+                                results: Dict[str, List[Dict]], stale: Dict[str, List[Dict]]):
+        searches = await asyncio.gather(*(self._search(session, queries.get(coin) or f"{coin} crypto")
+                                          for coin in coins), return_exceptions=True)
+        found = {}
+        for coin, items in zip(coins, searches):
+            if isinstance(items, Exception) or items is None:
+                if isinstance(items, (CircuitOpenError, YouTubeQuotaExceeded)):
+                    logger.debug(f"Skipping YouTube search for {coin}: {items}")
+                elif isinstance(items, Exception):
+                    self.stats['api_errors'] += 1
+                    logger.error(f"YouTube search failed for {coin}: {items}")
+                results[coin] = stale.get(coin, [])
+            else:
+                found[coin] = items
+        if not found:
+            return
+
+        # One videos.list pass covers every coin's new candidates; used videos aren't worth a lookup
+        video_ids = list(dict.fromkeys(item['id']['videoId'] for items in found.values() for item in items))
+        used = await asyncio.to_thread(self._used_ids, video_ids)
+        try:
+            details = await self._video_details(session, [video_id for video_id in video_ids if video_id not in used])
+        except (YouTubeAPIError, CircuitOpenError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"YouTube video details unavailable, using search snippets: {e}")
+            details = {}
+
+        for coin, items in found.items():
+            candidates = [self._candidate(item['id']['videoId'], item.get('snippet', {}),
+                                          details.get(item['id']['videoId']))
+                          for item in items if item['id']['videoId'] not in used]
+            await asyncio.to_thread(self._store, coin, candidates)
+            results[coin] = candidates
+
+    async def find_videos(self, coin: str, query: Optional[str] = None) -> List[Dict]:
+        """Unused candidate videos for one coin."""
+        return (await self.fetch_candidates([coin], {coin: query} if query else None))[coin]
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'quota': self.quota.get_stats()}
+
+_youtube_fetcher = None
+
+def get_youtube_fetcher() -> YouTubeVideoFetcher:
+    """Get the shared fetcher, configured from YOUTUBE_API_KEY, YOUTUBE_API_BASE_URL,
+    YOUTUBE_DAILY_QUOTA and YOUTUBE_CACHE_TTL_HOURS."""
+    global _youtube_fetcher
+    if _youtube_fetcher is None:
+        _youtube_fetcher = YouTubeVideoFetcher(
+            api_key=os.getenv("YOUTUBE_API_KEY"),
+            base_url=os.getenv("YOUTUBE_API_BASE_URL") or YOUTUBE_API_DEFAULT_BASE_URL,
+            cache_ttl_hours=float(os.getenv("YOUTUBE_CACHE_TTL_HOURS", "6")),
+            quota=YouTubeQuotaLedger(daily_limit=int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000")))
+        )
+    return _youtube_fetcher
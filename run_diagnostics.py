@@ -78,6 +78,7 @@ def run_comprehensive_diagnostics():
         queue_status = get_x_queue_status()
         print(f"✅ Queue status: {queue_status['queue_size']} pending")
         print(f"   Worker: {'Running' if queue_status['worker_running'] else 'Stopped'}")
+        print(f"   Next post available: {queue_status['next_post_available_at'] or 'unknown'}")
     except Exception as e:
         print(f"❌ Queue system check failed: {e}")
         error_handler.handle_error(e, "Queue system diagnostics")
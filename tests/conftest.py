@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+@pytest.fixture(autouse=True)
+def scratch_cwd(tmp_path, monkeypatch):
+    """Run every test in its own directory so crypto_bot.db, caches and exports never touch the repo."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
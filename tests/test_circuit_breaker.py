@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from modules.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+def fail(breaker: CircuitBreaker):
+    with pytest.raises(ValueError):
+        with breaker.protect():
+            raise ValueError("provider error")
+
+def cancel_inside(breaker: CircuitBreaker):
+    async def call():
+        async with breaker.protect():
+            await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(call())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(main())
+
+def test_opens_at_the_failure_threshold_and_rejects_calls():
+    breaker = CircuitBreaker('test', failure_threshold=0.5, min_calls=4, open_seconds=60)
+    with breaker.protect():
+        pass
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED  # Only 3 calls so far
+    fail(breaker)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker.protect():
+            pass
+    assert breaker.stats['rejected'] == 1
+
+def test_half_open_probe_closes_or_reopens_for_longer():
+    breaker = CircuitBreaker('test', min_calls=1, open_seconds=0.01)
+    fail(breaker)
+    time.sleep(0.02)
+    fail(breaker)  # The probe fails
+    assert breaker.state == OPEN and breaker.open_seconds == 0.02
+
+    time.sleep(0.03)
+    with breaker.protect():
+        pass
+    assert breaker.state == CLOSED and breaker.open_seconds == 0.01
+
+def test_cancelled_calls_are_not_failures():
+    breaker = CircuitBreaker('test', min_calls=1)
+    cancel_inside(breaker)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats['calls'] == 0 and breaker.stats['failures'] == 0
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker('test', min_calls=1, open_seconds=0.01)
+    fail(breaker)
+    time.sleep(0.02)
+    cancel_inside(breaker)
+
+    assert breaker.state == HALF_OPEN
+    with breaker.protect():
+        pass
+    assert breaker.state == CLOSED
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from modules.content_dedup import (ContentDedupIndex, DuplicateContentError, MAX_TWEET_LENGTH,
+                                   content_fingerprint, normalize_content)
+from modules.database import Database
+
+def test_fingerprint_ignores_case_whitespace_and_unicode_forms():
+    assert normalize_content("  Bitcoin\n\tUP  5% ") == "bitcoin up 5%"
+    assert content_fingerprint("𝐁𝐢𝐭𝐜𝐨𝐢𝐧 up") == content_fingerprint("bitcoin   UP")
+    assert content_fingerprint("Bitcoin up") != content_fingerprint("Bitcoin down")
+
+def test_reject_policy_refuses_a_repeat(tmp_path):
+    index = ContentDedupIndex(policy="reject", db_file=str(tmp_path / 'bot.db'))
+    assert index.reserve("Bitcoin is up 5%") == "Bitcoin is up 5%"
+    with pytest.raises(DuplicateContentError):
+        index.reserve("bitcoin IS up 5%")
+    assert index.get_stats()['rejected'] == 1
+
+def test_mutate_policy_makes_each_repeat_unique(tmp_path):
+    index = ContentDedupIndex(policy="mutate", db_file=str(tmp_path / 'bot.db'))
+    text = "x" * MAX_TWEET_LENGTH
+    posted = [index.reserve(text) for _ in range(3)]
+
+    assert posted[0] == text
+    assert len({content_fingerprint(post) for post in posted}) == 3
+    assert all(len(post) <= MAX_TWEET_LENGTH for post in posted)
+    assert index.get_stats()['mutated'] == 2
+
+def test_released_text_can_be_posted_again(tmp_path):
+    index = ContentDedupIndex(policy="reject", db_file=str(tmp_path / 'bot.db'))
+    index.reserve("Ethereum update")
+    index.release("Ethereum update")
+    assert index.reserve("Ethereum update") == "Ethereum update"
+
+def test_recent_history_is_loaded_from_the_database(tmp_path):
+    db_file = str(tmp_path / 'bot.db')
+    Database(db_file)
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("INSERT INTO x_post_history (tweet_id, content_preview, content_hash, timestamp) "
+                     "VALUES ('1', 'Solana update', ?, datetime('now', '-1 hours'))",
+                     (content_fingerprint('Solana update'),))
+        conn.execute("INSERT INTO x_post_history (tweet_id, content_preview, content_hash, timestamp) "
+                     "VALUES ('2', 'Old update', ?, datetime('now', '-3 days'))",
+                     (content_fingerprint('Old update'),))
+
+    index = ContentDedupIndex(lookback_hours=24, db_file=db_file)
+
+    assert index.is_duplicate("solana  UPDATE")
+    assert not index.is_duplicate("Old update")
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import benchmark_content_verifier as bench
+from modules.content_verification import ContentVerifier, TitleMatcher
+
+CATEGORIES = {
+    'coin': ['sol', 'solana', 'solana pay', 'ana'],
+    'analysis': ['analysis', 'ta', 'technical analysis', 'price'],
+    'hype': ['100x', 'moon', 'pump!', '!!!', 'sol'],  # 'sol' listed in two categories
+    'empty': []
+}
+ALPHABET = list('solanapy !xmt1') + ['solana', 'analysis', 'pump!', ' ', '100x', 'é']
+
+def naive_count(title: str) -> dict:
+    return {category: sum(term in title for term in terms) for category, terms in CATEGORIES.items()}
+
+def test_title_matcher_counts_like_substring_checks():
+    matcher = TitleMatcher(CATEGORIES)
+    rng = random.Random(7)
+    for _ in range(4000):
+        title = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+        assert matcher.count(title) == naive_count(title), title
+
+def test_title_matcher_handles_overlapping_and_prefix_terms():
+    matcher = TitleMatcher(CATEGORIES)
+    assert matcher.count('solana pay!!!!') == {'coin': 4, 'analysis': 0, 'hype': 2, 'empty': 0}
+    assert matcher.count('technical analysis') == naive_count('technical analysis')
+    assert TitleMatcher({'empty': []}).count('anything') == {'empty': 0}
+
+@pytest.fixture
+def baseline_module():
+    revision = bench.default_baseline_rev()
+    source = bench.git('show', f"{revision}:{bench.MODULE_PATH}") if revision else ''
+    if not source:
+        pytest.skip("git history with the pre-TitleMatcher content_verification.py is not available")
+    return bench.load_module('content_verification_baseline', source)
+
+def test_scores_unchanged_from_the_baseline(baseline_module):
+    videos = bench.synthetic_videos(4000, ContentVerifier.COIN_SYMBOLS, random.Random(20261018))
+    with open(f"{bench.REPO_DIR}/{bench.MODULE_PATH}") as f:
+        current_module = bench.load_module('content_verification_current', f.read())
+
+    _, baseline_results = bench.run(baseline_module, videos, rounds=1)
+    _, current_results = bench.run(current_module, videos, rounds=1)
+
+    mismatches = [(video['title'], coin_name, old, new)
+                  for (video, coin_name), old, new in zip(videos, baseline_results, current_results) if old != new]
+    assert not mismatches, mismatches[:5]
+
+def test_rank_videos_matches_individual_scores():
+    verifier = ContentVerifier()
+    verifier.verification_cache = {}
+    verifier._save_verification_cache = lambda prune=False: None
+    videos = [video for video, coin_name in bench.synthetic_videos(300, {'bitcoin': 'BTC'}, random.Random(3))]
+
+    ranked = verifier.rank_videos(videos, 'bitcoin', top_k=10)
+
+    scores = {video['video_id']: verifier.score_video(video, 'bitcoin')[:2] for video in videos}
+    best = sorted(scores.values(), key=lambda result: (result[0], result[1]), reverse=True)[:10]
+    assert [(video['verified'], video['verification_score']) for video in ranked] == best
+    assert all(scores[video['video_id']] == (video['verified'], video['verification_score']) for video in ranked)
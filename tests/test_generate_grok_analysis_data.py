@@ -0,0 +1,60 @@
+import json
+import sqlite3
+import time
+
+import generate_grok_analysis_data as grok
+
+def test_failed_and_hung_gatherers_leave_clean_results(monkeypatch):
+    monkeypatch.setitem(grok.GATHERER_TIMEOUTS, 'hangs', 0.2)
+
+    def fails():
+        raise RuntimeError("boom")
+
+    results, errors, timings = grok.run_gatherers([
+        ('works', lambda: {'a': 1}, ()),
+        ('fails', fails, ()),
+        ('hangs', time.sleep, (30,)),
+    ])
+
+    assert results == {'works': {'a': 1}, 'fails': {}, 'hangs': {}}
+    assert errors == {'fails': 'boom', 'hangs': 'Timed out after 0.2s'}
+    assert [timings[name]['status'] for name in ('works', 'fails', 'hangs')] == ['ok', 'error', 'timeout']
+    # Time of the failed gatherer itself, not since all gatherers started
+    assert timings['fails']['seconds'] < 0.1
+
+def test_manifest_ignores_failed_gatherers():
+    manifest = grok.build_manifest(None, {}, {}, {}, {})
+    assert manifest == {'files': {}, 'logs': {}, 'db_rowids': {}, 'exports': {}}
+
+    manifest = grok.build_manifest(None, {'./a.py': {'modified': 'm', 'size': 3}, 'error': 'Timed out'},
+                                   {'bot.log': {'error': 'unreadable'}}, {}, {})
+    assert manifest['files'] == {'./a.py': {'modified': 'm', 'size': 3}}
+    assert manifest['logs'] == {}
+
+def export_rows(baseline_manifest):
+    """Exported id values per run of gather_database_data + build_manifest, going through JSON like --since."""
+    database_data = grok.gather_database_data(baseline_manifest.get('db_rowids') if baseline_manifest else None)
+    manifest = grok.build_manifest(baseline_manifest, {}, {}, database_data, {})
+    with open('export.json', 'w') as f:
+        json.dump({'manifest': manifest}, f)
+    return [row[0] for row in database_data['tables']['events']['data']], grok.load_baseline('export.json')
+
+def test_chained_deltas_export_every_row_once():
+    with sqlite3.connect('crypto_bot.db') as conn:
+        conn.execute("CREATE TABLE events (id INTEGER)")
+        conn.executemany("INSERT INTO events VALUES (?)", [(n,) for n in range(50)])
+
+    exported, manifest = export_rows(None)
+    assert exported == list(range(50))
+
+    with sqlite3.connect('crypto_bot.db') as conn:
+        conn.executemany("INSERT INTO events VALUES (?)", [(n,) for n in range(50, 300)])
+    seen = []
+    while True:
+        exported, manifest = export_rows(manifest)
+        if not exported:
+            break
+        assert len(exported) <= 100
+        seen += exported
+
+    assert seen == list(range(50, 300))
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from modules.rate_limit_manager import RateLimit, RateLimitManager, parse_rate_limits
+
+def test_parse_rate_limits():
+    limits = parse_rate_limits("15m:10, 24h:100,30d:3000")
+    assert [(limit.name, limit.count, limit.period) for limit in limits.values()] == [
+        ('15m', 10, 900.0), ('24h', 100, 86400.0), ('30d', 3000, 2592000.0)]
+    with pytest.raises(ValueError):
+        parse_rate_limits("15 minutes:10")
+
+def test_earliest_is_when_the_post_count_places_back_leaves_the_window():
+    limit = RateLimit('1m', 3, 60)
+    now = 1000.0
+    assert limit.earliest([950.0, 990.0], now) == now
+    assert limit.earliest([900.0, 950.0, 990.0], now) == now  # 900 already left the window
+    assert limit.earliest([950.0, 960.0, 990.0], now) == 1010.0
+    assert limit.in_window([900.0, 950.0, 960.0, 990.0], now) == 3
+
+def test_next_post_waits_for_the_strictest_of_several_windows(tmp_path):
+    manager = RateLimitManager(db_file=str(tmp_path / 'limits.db'), limits=parse_rate_limits("1m:2,1h:3"))
+    now = time.time()
+    manager.account_limits[1]['post_log'] = [now - 1800, now - 50, now - 10]
+
+    assert not manager.can_post(1)
+    # 1m:2 frees up at now+10, but 1h:3 only once the post from 30 minutes ago turns an hour old
+    assert manager.next_available_time(1).timestamp() == pytest.approx(now + 1800, abs=1)
+    # Two more posts: the second also has to wait for the 1h window to drop the post at now-50
+    assert manager.next_available_time(1, posts=2).timestamp() == pytest.approx(now + 3550, abs=1)
+
+def test_posts_and_cooldowns_are_shared_between_processes(tmp_path):
+    db_file = str(tmp_path / 'limits.db')
+    # Separate managers have separate connections, like separate processes
+    first = RateLimitManager(db_file=db_file, refresh_interval=0, limits=parse_rate_limits("1h:3"))
+    second = RateLimitManager(db_file=db_file, refresh_interval=0, limits=parse_rate_limits("1h:3"))
+
+    first.record_post(1)
+    second.record_post(1)
+    assert second.can_post(1)
+    first.record_post(1)
+
+    assert not second.can_post(1)
+    assert len(second.account_limits[1]['post_log']) == 3
+
+    second.mark_rate_limited(2, duration_minutes=5)
+    assert not first.can_post(2)
+
+def test_posts_are_rows_pruned_after_the_longest_window(tmp_path):
+    db_file = str(tmp_path / 'limits.db')
+    manager = RateLimitManager(db_file=db_file, limits=parse_rate_limits("1m:5,1h:10"))
+    manager.record_post(1)
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("UPDATE x_rate_limit_posts SET posted_at = posted_at - 7200")
+    manager.record_post(1)
+
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM x_rate_limit_posts").fetchone()[0] == 1
+        assert conn.execute("SELECT post_log FROM x_rate_limits").fetchone()[0] is None
+
+def test_json_post_logs_from_older_versions_are_migrated(tmp_path):
+    db_file = str(tmp_path / 'limits.db')
+    posted = [time.time() - 30, time.time() - 20]
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("CREATE TABLE x_rate_limits (account_num INTEGER PRIMARY KEY, last_post REAL, "
+                     "rate_limited_until REAL, post_log TEXT, api_windows TEXT)")
+        conn.execute("INSERT INTO x_rate_limits VALUES (1, ?, NULL, ?, '{}')", (posted[-1], json.dumps(posted)))
+
+    manager = RateLimitManager(db_file=db_file, limits=parse_rate_limits("1m:2"))
+
+    assert not manager.can_post(1)
+    assert manager.account_limits[1]['post_log'] == posted
+
+def test_refresh_reads_only_post_rows_added_since_the_last_one(tmp_path):
+    db_file = str(tmp_path / 'limits.db')
+    first = RateLimitManager(db_file=db_file, refresh_interval=0, limits=parse_rate_limits("1h:10"))
+    second = RateLimitManager(db_file=db_file, refresh_interval=0, limits=parse_rate_limits("1h:10"))
+    for _ in range(3):
+        first.record_post(1)
+    second.can_post(1)
+    with sqlite3.connect(db_file) as conn:
+        # Rows already merged are not read again, so second keeps them
+        conn.execute("UPDATE x_rate_limit_posts SET posted_at = 0")
+
+    first.record_post(2)
+    second.record_post(1)
+    first.can_post(1)
+
+    assert len(second.account_limits[1]['post_log']) == 4
+    assert 0 not in second.account_limits[1]['post_log']
+    assert first.account_limits[1]['post_log'] == second.account_limits[1]['post_log']
+    assert len(second.account_limits[2]['post_log']) == 1
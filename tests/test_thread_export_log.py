@@ -0,0 +1,55 @@
+import os
+from datetime import datetime, timedelta
+
+from modules.thread_export_log import ThreadExportLog
+
+def record(n: int, posted_at: datetime = None) -> dict:
+    return {'main_tweet': {'id': f"{n}00"}, 'replies': [{'id': f"{n}01"}],
+            'posted_at': (posted_at or datetime.now()).isoformat(), 'padding': 'x' * 200}
+
+def export_log(tmp_path, **kwargs) -> ThreadExportLog:
+    return ThreadExportLog(directory=str(tmp_path / 'exports'), index_db_file=str(tmp_path / 'index.db'), **kwargs)
+
+def test_every_tweet_of_a_thread_is_indexed(tmp_path):
+    log = export_log(tmp_path)
+    log.append(record(1), ['100', '101'])
+    log.append(record(2), ['200', '201'])
+
+    assert log.lookup('101')['main_tweet']['id'] == '100'
+    assert log.lookup('200')['main_tweet']['id'] == '200'
+    assert log.lookup('999') is None
+
+def test_rotation_by_size_keeps_old_threads_readable(tmp_path):
+    log = export_log(tmp_path, max_bytes=600, compress=True)
+    for n in range(1, 6):
+        log.append(record(n), [f"{n}00", f"{n}01"])
+
+    files = log.log_files()
+    assert log.stats['rotations'] >= 2
+    assert all(path.endswith('.ndjson.gz') for path in files[:-1])
+    assert files[-1] == log.active_path
+    assert all(os.path.getsize(path) <= 600 for path in files if not path.endswith('.gz'))
+    # Index entries follow their records into the rotated, compressed files
+    for n in range(1, 6):
+        assert log.lookup(f"{n}01")['main_tweet']['id'] == f"{n}00"
+    assert [r['main_tweet']['id'] for r in log.iter_records()] == [f"{n}00" for n in range(1, 6)]
+
+def test_rotation_by_age(tmp_path):
+    log = export_log(tmp_path, max_age=timedelta(hours=1), compress=False)
+    log.append(record(1, datetime.now() - timedelta(hours=2)), ['100'])
+    # A fresh instance reads the active file's age from its first record
+    log = export_log(tmp_path, max_age=timedelta(hours=1), compress=False)
+    log.append(record(2), ['200'])
+
+    assert log.stats['rotations'] == 1
+    assert len(log.log_files()) == 2
+    assert log.lookup('100')['main_tweet']['id'] == '100'
+
+def test_iter_records_since(tmp_path):
+    log = export_log(tmp_path)
+    start = datetime(2026, 1, 1, 12, 0)
+    for n in range(3):
+        log.append(record(n, start + timedelta(minutes=n)), [f"{n}00"])
+
+    since = (start + timedelta(seconds=30)).isoformat()
+    assert [r['main_tweet']['id'] for r in log.iter_records(since=since)] == ['100', '200']
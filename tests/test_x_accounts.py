@@ -0,0 +1,22 @@
+from modules.x_accounts import XAccountRegistry
+
+CREDENTIALS = ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET')
+
+def set_account(monkeypatch, prefix: str, secret: str):
+    for field in CREDENTIALS:
+        monkeypatch.setenv(f"{prefix}_{field}", f"{secret}-{field.lower()}")
+
+def test_rediscovery_only_re_enables_accounts_with_new_credentials(monkeypatch):
+    set_account(monkeypatch, 'X', 'one')
+    set_account(monkeypatch, 'X2', 'two')
+    set_account(monkeypatch, 'X3', 'three')
+    registry = XAccountRegistry()
+    registry.discover()
+    registry.disable(1, "Authentication failed")
+    registry.disable(2, "Authentication failed")
+
+    set_account(monkeypatch, 'X2', 'two-rotated')
+    registry.discover()
+
+    assert registry.is_disabled(1)
+    assert registry.numbers() == [2, 3]
@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+
+from modules import x_thread_queue
+from modules.content_dedup import ContentDedupIndex
+from modules.rate_limit_manager import RateLimitManager
+from modules.x_job_store import XJobStore
+
+POSTS = [{'text': 'Bitcoin is up 3%', 'coin_name': 'bitcoin'},
+         {'text': 'Ethereum is down 1%', 'coin_name': 'ethereum'},
+         {'text': 'Solana is flat', 'coin_name': 'solana'}]
+
+class FakeXClient:
+    """create_tweet stand-in recording what was posted and what it replied to."""
+
+    def __init__(self, first_id: int = 200):
+        self.next_id = first_id
+        self.calls = []
+
+    def create_tweet(self, text, in_reply_to_tweet_id=None):
+        self.calls.append((text, in_reply_to_tweet_id))
+        self.next_id += 1
+        return SimpleNamespace(data={'id': str(self.next_id)})
+
+def interrupted_job(db_file: str) -> int:
+    """A thread whose main tweet and first reply were posted before the process died."""
+    store = XJobStore(db_file)
+    job_id = store.enqueue_thread('Top movers', POSTS, priority=0)
+    store.mark_in_progress(job_id, 1)
+    store.mark_posted(job_id, 0, '100')
+    store.mark_posted(job_id, 1, '101')
+    store.close()
+    return job_id
+
+def test_load_unfinished_resumes_from_checkpoint(tmp_path):
+    job_id = interrupted_job(str(tmp_path / 'jobs.db'))
+
+    jobs = XJobStore(str(tmp_path / 'jobs.db')).load_unfinished()
+
+    assert len(jobs) == 1
+    job = jobs[0]
+    assert job['job_id'] == job_id
+    assert job['next_position'] == 2
+    assert job['main_tweet_id'] == '100'
+    assert job['last_tweet_id'] == '101'
+    assert job['tweet_ids'] == {0: '100', 1: '101'}
+    assert [post['text'] for post in job['posts']] == [post['text'] for post in POSTS]
+
+def test_finished_threads_are_not_resumed(tmp_path):
+    store = XJobStore(str(tmp_path / 'jobs.db'))
+    completed = store.enqueue_thread('Done', POSTS[:1])
+    dropped = store.enqueue_thread('Dropped', POSTS[:1])
+    pending = store.enqueue_thread('Pending', POSTS[:1])
+    store.mark_completed(completed)
+    store.mark_dropped(dropped, 'queue full')
+
+    assert [job['job_id'] for job in store.load_unfinished()] == [pending]
+    assert store.pending_count() == 1
+
+def posting_setup(tmp_path, monkeypatch, store: XJobStore) -> ContentDedupIndex:
+    """Point _post_thread at store and throwaway rate-limit and dedup state, without reply pacing."""
+    monkeypatch.setattr(x_thread_queue, 'get_job_store', lambda: store)
+    monkeypatch.setattr(x_thread_queue, 'rate_manager', RateLimitManager(db_file=str(tmp_path / 'limits.db')))
+    dedup_index = ContentDedupIndex(db_file=str(tmp_path / 'dedup.db'))
+    monkeypatch.setattr(x_thread_queue, 'get_dedup_index', lambda: dedup_index)
+
+    async def no_pacing(account_num, posts_left):
+        return 0.0
+    monkeypatch.setattr(x_thread_queue.reply_pacer, 'pace', no_pacing)
+    return dedup_index
+
+def test_post_thread_continues_after_last_posted_reply(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'jobs.db')
+    interrupted_job(db_file)
+    store = XJobStore(db_file)
+    posting_setup(tmp_path, monkeypatch, store)
+
+    job = store.load_unfinished()[0]
+    client = FakeXClient()
+    main_tweet_id = asyncio.run(x_thread_queue._post_thread(client, 1, job))
+
+    # Only the replies after the checkpoint are posted, chained onto the last posted tweet
+    assert main_tweet_id == '100'
+    assert client.calls == [('Ethereum is down 1%', '101'), ('Solana is flat', '201')]
+    assert store.load_unfinished()[0]['next_position'] == 4
+
+def test_resumed_thread_sees_the_text_dedup_made_unique(tmp_path, monkeypatch):
+    store = XJobStore(str(tmp_path / 'jobs.db'))
+    job_id = store.enqueue_thread('Top movers', POSTS)
+    dedup_index = posting_setup(tmp_path, monkeypatch, store)
+    dedup_index.reserve('Bitcoin is up 3%')  # Posted by an earlier thread
+
+    client = FakeXClient()
+    asyncio.run(x_thread_queue._post_thread(client, 1, store.load_unfinished()[0]))
+
+    posted_reply = client.calls[1][0]
+    assert posted_reply != 'Bitcoin is up 3%'
+    job = store.load_unfinished()[0]
+    assert job['job_id'] == job_id
+    assert [post['text'] for post in job['posts']] == [posted_reply, 'Ethereum is down 1%', 'Solana is flat']
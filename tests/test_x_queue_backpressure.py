@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from modules import x_thread_queue
+from modules.x_job_store import XJobStore
+from modules.x_thread_queue import (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT, PRIORITY_LOW,
+                                    PRIORITY_NORMAL, XQueueService, queue_x_thread)
+
+def posts_for(*coins):
+    return [{'text': f"{coin} update", 'coin_name': coin} for coin in coins]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = XJobStore(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(x_thread_queue, 'get_job_store', lambda: store)
+    return store
+
+def run_queue(monkeypatch, max_pending: int, overflow_policy: str, scenario):
+    """Run scenario(service) against a started queue whose dispatcher never gets an account.
+
+    Every queued thread therefore stays waiting, which is what the overflow
+    policies act on.
+    """
+    service = XQueueService(max_pending=max_pending, overflow_policy=overflow_policy)
+    monkeypatch.setattr(x_thread_queue, 'x_queue_service', service)
+
+    async def no_account():
+        await asyncio.Event().wait()
+    monkeypatch.setattr(service, '_acquire_account', no_account)
+
+    async def main():
+        service.start()
+        try:
+            result = scenario(service)
+            if asyncio.iscoroutine(result):
+                result = await result
+            await asyncio.sleep(0)
+            return result
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+def status(future):
+    return future.result()['status'] if future.done() and not future.cancelled() else None
+
+def test_drop_oldest_drops_the_oldest_least_urgent_thread(store, monkeypatch):
+    def scenario(service):
+        low = queue_x_thread(posts_for('bitcoin'), 'low', priority=PRIORITY_LOW)
+        first = queue_x_thread(posts_for('ethereum'), 'first')
+        newest = queue_x_thread(posts_for('solana'), 'newest')
+        return low, first, newest, service.qsize(), dict(service.backpressure_stats)
+
+    low, first, newest, waiting, stats = run_queue(monkeypatch, 2, OVERFLOW_DROP_OLDEST, scenario)
+
+    assert status(low) == 'dropped'
+    assert status(first) is None and status(newest) is None
+    assert waiting == 2
+    assert stats['dropped'] == 1
+    assert [job['main_post'] for job in store.load_unfinished()] == ['first', 'newest']
+
+def test_drop_oldest_never_drops_a_more_urgent_thread(store, monkeypatch):
+    def scenario(service):
+        queue_x_thread(posts_for('bitcoin'), 'normal 1')
+        queue_x_thread(posts_for('ethereum'), 'normal 2')
+        return queue_x_thread(posts_for('solana'), 'low', priority=PRIORITY_LOW)
+
+    rejected = run_queue(monkeypatch, 2, OVERFLOW_DROP_OLDEST, scenario)
+
+    assert status(rejected) == 'rejected'
+
+def test_reject_policy_rejects_new_threads_once_full(store, monkeypatch):
+    def scenario(service):
+        futures = [queue_x_thread(posts_for(coin), coin) for coin in ('bitcoin', 'ethereum', 'solana')]
+        return futures, service.qsize(), dict(service.backpressure_stats)
+
+    futures, waiting, stats = run_queue(monkeypatch, 2, OVERFLOW_REJECT, scenario)
+
+    assert [status(future) for future in futures] == [None, None, 'rejected']
+    assert futures[2].result()['job_id'] is None
+    assert waiting == 2
+    assert stats['rejected'] == 1
+    # A rejected thread is never persisted
+    assert len(store.load_unfinished()) == 2
+
+def test_block_policy_rejects_from_sync_callers(store, monkeypatch):
+    def scenario(service):
+        return [queue_x_thread(posts_for(coin), coin) for coin in ('bitcoin', 'ethereum')]
+
+    futures = run_queue(monkeypatch, 1, OVERFLOW_BLOCK, scenario)
+
+    assert status(futures[1]) == 'rejected'
+
+def test_block_policy_waits_for_room(store, monkeypatch):
+    async def scenario(service):
+        oldest = queue_x_thread(posts_for('bitcoin'), 'oldest')
+        waiting = asyncio.ensure_future(x_thread_queue.queue_x_thread_async(posts_for('ethereum'), 'waiting'))
+        await asyncio.sleep(0.01)
+        blocked = not waiting.done()
+        service._discard(next(iter(service._pending.values())), 'dropped', 'Dropped to make room')
+        admitted = await asyncio.wait_for(waiting, 1)
+        return oldest, blocked, admitted, dict(service.backpressure_stats)
+
+    oldest, blocked, admitted, stats = run_queue(monkeypatch, 1, OVERFLOW_BLOCK, scenario)
+
+    assert blocked
+    assert status(oldest) == 'dropped'
+    assert status(admitted) is None
+    assert stats['blocked'] == 1
+
+def test_newer_thread_for_the_same_coins_replaces_the_waiting_one(store, monkeypatch):
+    def scenario(service):
+        older = queue_x_thread(posts_for('bitcoin', 'ethereum'), 'older')
+        other = queue_x_thread(posts_for('solana'), 'other')
+        newer = queue_x_thread(posts_for('ethereum', 'bitcoin'), 'newer')
+        queued = sorted((thread['sequence'], thread['main_post']) for thread in service._pending.values())
+        return older, other, newer, queued, dict(service.backpressure_stats)
+
+    older, other, newer, queued, stats = run_queue(monkeypatch, 2, OVERFLOW_REJECT, scenario)
+
+    assert status(older) == 'superseded'
+    assert status(newer) is None and status(other) is None
+    # The replacement takes over the superseded thread's place, ahead of 'other'
+    assert [main_post for _, main_post in queued] == ['newer', 'other']
+    assert stats['merged'] == 1 and stats['rejected'] == 0
+    assert {job['main_post'] for job in store.load_unfinished()} == {'newer', 'other'}
+
+def test_threads_at_different_priorities_are_not_merged(store, monkeypatch):
+    def scenario(service):
+        return [queue_x_thread(posts_for('bitcoin'), 'normal', priority=PRIORITY_NORMAL),
+                queue_x_thread(posts_for('bitcoin'), 'low', priority=PRIORITY_LOW)], service.qsize()
+
+    futures, waiting = run_queue(monkeypatch, 5, OVERFLOW_REJECT, scenario)
+
+    assert [status(future) for future in futures] == [None, None]
+    assert waiting == 2
+
+def test_discarding_a_deferred_thread_cancels_its_retry(store, monkeypatch):
+    queue_metrics = x_thread_queue.queue_metrics
+    monkeypatch.setattr(queue_metrics, 'open_jobs', {})
+
+    async def scenario(service):
+        retrying = queue_x_thread(posts_for('bitcoin'), 'retrying')
+        thread_data = next(iter(service._pending.values()))
+        thread_data['not_before'] = x_thread_queue.time.monotonic() + 0.05
+        await asyncio.sleep(0.01)  # The dispatcher takes it and holds it back
+        deferred = id(thread_data) in service._deferred
+        service._discard(thread_data, 'dropped', 'Dropped to make room')
+        await asyncio.wait_for(service.join(), 1)
+        await asyncio.sleep(0.1)  # Past the retry time
+        return retrying, deferred, dict(queue_metrics.open_jobs)
+
+    retrying, deferred, open_jobs = run_queue(monkeypatch, 2, OVERFLOW_REJECT, scenario)
+
+    assert deferred
+    assert status(retrying) == 'dropped'
+    assert open_jobs == {}
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import REPO_DIR
+
+def run_benchmark(tmp_path, *args) -> dict:
+    """Post through the whole queue against the fake X API (in its own process, so no global state leaks)."""
+    out = tmp_path / 'bench.json'
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, 'benchmark_x_queue.py'), '--json', str(out),
+                    '--latency', '0.01', '--jitter', '0', '--timeout', '60', *args],
+                   check=True, capture_output=True, timeout=120)
+    return json.loads(out.read_text())
+
+def test_threads_post_in_parallel_across_accounts(tmp_path):
+    result = run_benchmark(tmp_path, '--threads', '6', '--replies', '2', '--accounts', '2')
+
+    assert result['outcomes'] == {'completed': 6}
+    assert result['server']['created'] == 18
+    assert set(result['posts_per_account']) == {'1', '2'}
+    assert result['verification']['verified'] == 18
+    # Pooled clients: one connection per account
+    assert result['server']['connections'] == 2
+
+def test_rejected_credentials_fail_over_to_another_account(tmp_path):
+    result = run_benchmark(tmp_path, '--threads', '4', '--replies', '1', '--accounts', '2',
+                           '--auth-fail-account', '2')
+
+    assert result['outcomes'] == {'completed': 4}
+    assert result['posts_per_account'].get('2', 0) == 0
+    assert result['accounts']['2']['disabled']
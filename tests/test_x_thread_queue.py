@@ -0,0 +1,65 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from modules import x_thread_queue
+from modules.rate_limit_manager import RateLimitManager
+from modules.x_job_store import XJobStore
+from modules.x_thread_queue import MIN_REFRESH_TTL, XQueueService, queue_x_thread
+
+def test_transient_retry_waits_in_the_dispatcher_not_the_account(tmp_path, monkeypatch):
+    store = XJobStore(str(tmp_path / 'jobs.db'))
+    service = XQueueService(max_pending=10, overflow_policy='reject')
+    monkeypatch.setattr(x_thread_queue, 'get_job_store', lambda: store)
+    monkeypatch.setattr(x_thread_queue, 'x_queue_service', service)
+    monkeypatch.setattr(x_thread_queue, 'rate_manager', RateLimitManager(db_file=str(tmp_path / 'limits.db')))
+    monkeypatch.setattr(x_thread_queue.x_accounts, 'numbers', lambda: [1])
+    monkeypatch.setattr(x_thread_queue.x_accounts, 'select', lambda candidates=None: None)
+
+    attempts = []
+
+    async def process(thread_data, account_num):
+        attempts.append((thread_data['main_post'], time.monotonic()))
+        if thread_data['main_post'] == 'flaky' and len(attempts) == 1:
+            x_thread_queue._requeue(thread_data, 'transient_error', delay=0.3)
+        else:
+            await x_thread_queue._finish_job(thread_data)
+        return True
+    monkeypatch.setattr(x_thread_queue, '_process_thread', process)
+
+    async def main():
+        service.start()
+        try:
+            futures = [queue_x_thread([{'text': 'a', 'coin_name': 'bitcoin'}], 'flaky'),
+                       queue_x_thread([{'text': 'b', 'coin_name': 'ethereum'}], 'steady')]
+            await asyncio.wait_for(service.join(), 5)
+            return [future.result()['status'] for future in futures]
+        finally:
+            await service.stop()
+    statuses = asyncio.run(main())
+
+    assert statuses == ['completed', 'completed']
+    # The only account posted 'steady' while 'flaky' sat out its backoff
+    assert [main_post for main_post, _ in attempts] == ['flaky', 'steady', 'flaky']
+    assert attempts[1][1] - attempts[0][1] < 0.3
+    assert attempts[2][1] - attempts[0][1] >= 0.3
+
+def test_refreshed_thread_gets_a_positive_lifetime():
+    now = datetime.now()
+    thread_data = {'deadline': now - timedelta(minutes=1), 'timestamp': now,
+                   'refresh': lambda: ([{'text': 'fresh'}], 'fresh main')}
+
+    expired = asyncio.run(XQueueService()._expire_if_stale(thread_data))
+
+    assert not expired
+    assert thread_data['main_post'] == 'fresh main'
+    assert abs(thread_data['deadline'] - thread_data['timestamp'] - MIN_REFRESH_TTL) < timedelta(seconds=1)
+
+def test_refreshed_thread_keeps_its_original_lifetime():
+    queued_at = datetime.now() - timedelta(hours=2)
+    thread_data = {'deadline': queued_at + timedelta(hours=1), 'timestamp': queued_at,
+                   'refresh': lambda: ([{'text': 'fresh'}], 'fresh main')}
+
+    asyncio.run(XQueueService()._expire_if_stale(thread_data))
+
+    assert abs(thread_data['deadline'] - thread_data['timestamp'] - timedelta(hours=1)) < timedelta(seconds=1)
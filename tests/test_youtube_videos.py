@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from modules.circuit_breaker import circuit_breakers
+from modules.fake_youtube_api import FakeYouTubeAPI
+from modules.retry_policy import get_policy
+from modules.youtube_videos import (QUOTA_CONSERVE, QUOTA_EXHAUSTED, QUOTA_NORMAL, SEARCH_COST,
+                                    VIDEOS_LIST_COST, YouTubeQuotaLedger, YouTubeVideoFetcher)
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breakers, '_breakers', {})
+    monkeypatch.setattr(get_policy('youtube'), 'base_delay', 0.01)
+
+def test_ledger_refuses_spending_past_the_daily_limit(tmp_path):
+    ledger = YouTubeQuotaLedger(daily_limit=250, db_file=str(tmp_path / 'bot.db'))
+    assert ledger.try_spend(SEARCH_COST)
+    assert ledger.try_spend(SEARCH_COST)
+    assert not ledger.try_spend(SEARCH_COST)
+    assert ledger.try_spend(50)
+    assert ledger.used() == 250
+
+def test_ledger_is_shared_through_the_database(tmp_path):
+    db_file = str(tmp_path / 'bot.db')
+    first = YouTubeQuotaLedger(daily_limit=10000, conserve_at=0.5, db_file=db_file)
+    second = YouTubeQuotaLedger(daily_limit=10000, conserve_at=0.5, db_file=db_file)
+
+    assert second.mode() == QUOTA_NORMAL
+    first.try_spend(5000)
+    assert second.mode() == QUOTA_CONSERVE
+    first.mark_exhausted()
+    assert second.mode() == QUOTA_EXHAUSTED
+    assert second.get_stats()['remaining'] == 0
+
+def fetch(api: FakeYouTubeAPI, tmp_path, coins, daily_limit: int = 10000, rounds: int = 1):
+    """Run fetch_candidates rounds times against the fake API; returns (results per round, fetcher)."""
+    async def main():
+        base_url = await api.start()
+        try:
+            fetcher = YouTubeVideoFetcher(api_key='test-key', base_url=base_url, db_file=str(tmp_path / 'bot.db'),
+                                          quota=YouTubeQuotaLedger(daily_limit, db_file=str(tmp_path / 'bot.db')))
+            return [await fetcher.fetch_candidates(coins) for _ in range(rounds)], fetcher
+        finally:
+            await api.stop()
+    return asyncio.run(main())
+
+def test_fetch_charges_the_ledger_what_youtube_charges(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key')
+    api.add_sample_videos('bitcoin', 'BTC')
+    api.add_sample_videos('ethereum', 'ETH')
+
+    (results,), fetcher = fetch(api, tmp_path, ['bitcoin', 'ethereum'])
+
+    assert results['bitcoin'] and results['ethereum']
+    assert all(video['platform'] == 'youtube' and 'view_count' in video for video in results['bitcoin'])
+    # Two searches, and one shared videos.list batch for both coins' candidates
+    assert api.counters['search_requests'] == 2 and api.counters['videos_requests'] == 1
+    assert fetcher.quota.used() == api.quota_used == 2 * SEARCH_COST + VIDEOS_LIST_COST
+
+def test_cached_results_cost_nothing(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key')
+    api.add_sample_videos('bitcoin', 'BTC')
+    (first, second), fetcher = fetch(api, tmp_path, ['bitcoin'], rounds=2)
+
+    assert second == first
+    assert api.counters['search_requests'] == 1
+    assert fetcher.stats['cache_hits'] == 1
+
+def test_every_retried_attempt_is_charged(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key', error_rate=1.0)
+    api.add_sample_videos('bitcoin', 'BTC')
+
+    (results,), fetcher = fetch(api, tmp_path, ['bitcoin'])
+
+    assert results == {'bitcoin': []}
+    attempts = api.counters['search_requests']
+    assert attempts == get_policy('youtube').max_attempts
+    assert fetcher.quota.used() == attempts * SEARCH_COST
+
+def test_calls_the_ledger_cannot_cover_are_skipped(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key')
+    api.add_sample_videos('bitcoin', 'BTC')
+
+    (results,), fetcher = fetch(api, tmp_path, ['bitcoin'], daily_limit=SEARCH_COST)
+
+    # The search fits the quota; the videos.list call after it doesn't, so snippets are used as they are
+    assert results['bitcoin'] and 'view_count' not in results['bitcoin'][0]
+    assert api.counters['videos_requests'] == 0
+    assert fetcher.stats['quota_skips'] == 1
+    assert fetcher.quota.used() == SEARCH_COST
+
+def test_quota_error_from_youtube_exhausts_the_ledger(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key', daily_quota=50)
+    api.add_sample_videos('bitcoin', 'BTC')
+
+    (results,), fetcher = fetch(api, tmp_path, ['bitcoin'])
+
+    assert results == {'bitcoin': []}
+    assert api.counters['quota_exceeded'] == 1
+    assert fetcher.quota.mode() == QUOTA_EXHAUSTED
+
+def test_open_circuit_costs_no_quota(tmp_path):
+    api = FakeYouTubeAPI(api_key='test-key')
+    api.add_sample_videos('bitcoin', 'BTC')
+    breaker = circuit_breakers.get('youtube')
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.0)
+
+    (results,), fetcher = fetch(api, tmp_path, ['bitcoin'])
+
+    assert results == {'bitcoin': []}
+    assert api.counters['search_requests'] == 0
+    assert fetcher.quota.used() == 0 and fetcher.quota.mode() == QUOTA_NORMAL